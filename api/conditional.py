@@ -0,0 +1,78 @@
+# =================================================================
+# api/conditional.py
+# =================================================================
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from starlette.config import Config
+
+config = Config(".env")
+# Mixed into every ETag; change it when a deploy changes how responses are
+# rendered so that clients do not keep 304s for an old representation.
+ETAG_SALT = config("ETAG_SALT", cast=str, default="1")
+
+# Authenticated content may be stored by the browser, never by shared caches,
+# and must be revalidated (cheaply, via If-None-Match) before each reuse.
+AUTHENTICATED_CACHE_CONTROL = "private, no-cache"
+AUTHENTICATED_VARY = "Cookie, Authorization, X-Auth-Provider"
+
+
+def _normalize(part: Any) -> Any:
+    if isinstance(part, BaseModel):
+        return (type(part).__name__, tuple((k, _normalize(v)) for k, v in part.__dict__.items()))
+    if isinstance(part, dict):
+        return tuple((k, _normalize(v)) for k, v in part.items())
+    if isinstance(part, (list, tuple)):
+        return tuple(_normalize(v) for v in part)
+    return part
+
+
+def etag_for(*parts: Any) -> str:
+    """
+    Computes a strong ETag from everything a representation is rendered from
+    (route, models, projection, ...), without rendering it.
+    """
+    digest = hashlib.blake2b(
+        repr((ETAG_SALT, _normalize(parts))).encode(), digest_size=16
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+class ConditionalGet:
+    """
+    Dependency implementing ETag validation for GET endpoints.
+
+        async def read_thing(conditional: Annotated[ConditionalGet, Depends()]):
+            etag = etag_for("thing", thing, fields)
+            return conditional.respond(etag, lambda: FastJSONResponse(thing))
+
+    When the request's If-None-Match matches, `respond` returns a bodiless
+    304 and the `build` callable (and so serialization) is never invoked.
+    """
+
+    def __init__(self, request: Request):
+        self.if_none_match = request.headers.get("if-none-match")
+
+    def matches(self, etag: str) -> bool:
+        """Weak comparison, as RFC 9110 requires for If-None-Match."""
+        if not self.if_none_match:
+            return False
+        if self.if_none_match.strip() == "*":
+            return True
+        opaque = etag.removeprefix("W/")
+        return any(
+            candidate.strip().removeprefix("W/") == opaque
+            for candidate in self.if_none_match.split(",")
+        )
+
+    def respond(self, etag: str, build: Callable[[], Response]) -> Response:
+        if self.matches(etag):
+            response = Response(status_code=304)
+        else:
+            response = build()
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = AUTHENTICATED_CACHE_CONTROL
+        response.headers["Vary"] = AUTHENTICATED_VARY
+        return response
@@ -0,0 +1,75 @@
+# =================================================================
+# api/fieldsets.py
+# =================================================================
+from functools import lru_cache
+from typing import Annotated
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+# A pydantic `include` spec, e.g. {"owner_email": True, "retrieved_by": {"email": True}}
+IncludeSpec = dict[str, "bool | IncludeSpec"]
+
+
+class FieldSelector:
+    """
+    Dependency that turns a `fields=` query parameter into a pydantic
+    `include` spec for one response model.
+
+    `fields` is a comma separated list of top-level field names; fields of a
+    nested model can be selected with a dot, e.g. `retrieved_by.email`.
+    Names are checked against the model's fields, so a typo is a 400 before
+    the endpoint runs. Parsed specs are memoized per distinct `fields` value,
+    which keeps repeated client queries to a dict lookup.
+    """
+
+    def __init__(self, model: type[BaseModel], cache_size: int = 256):
+        self.model = model
+        self.allowed = self._allowed_paths(model)
+        self._parse = lru_cache(maxsize=cache_size)(self._parse_uncached)
+
+    @staticmethod
+    def _allowed_paths(model: type[BaseModel]) -> dict[str, frozenset[str]]:
+        """Maps each field to the names selectable beneath it (empty if none)."""
+        allowed = {}
+        for name, field in model.model_fields.items():
+            annotation = field.annotation
+            if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+                allowed[name] = frozenset(annotation.model_fields)
+            else:
+                allowed[name] = frozenset()
+        return allowed
+
+    def __call__(
+        self,
+        fields: Annotated[
+            str | None,
+            Query(
+                description="Comma separated list of fields to return, e.g. 'id,email'. "
+                "Nested fields use a dot, e.g. 'retrieved_by.email'.",
+            ),
+        ] = None,
+    ) -> IncludeSpec | None:
+        if not fields:
+            return None
+        return self._parse(fields)
+
+    def _parse_uncached(self, fields: str) -> IncludeSpec:
+        include: IncludeSpec = {}
+        unknown = []
+        for path in filter(None, (part.strip() for part in fields.split(","))):
+            name, _, child = path.partition(".")
+            if name not in self.allowed or (child and child not in self.allowed[name]):
+                unknown.append(path)
+            elif not child:
+                include[name] = True
+            elif include.get(name) is not True:
+                include.setdefault(name, {})[child] = True
+        if unknown or not include:
+            rejected = ", ".join(unknown) or repr(fields)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s) in 'fields': {rejected}. "
+                f"Allowed: {', '.join(self.allowed)}.",
+            )
+        return include
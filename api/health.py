@@ -0,0 +1,185 @@
+# =================================================================
+# File: api/health.py
+# =================================================================
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
+
+from auth.dependencies import auth_registry
+from logging_config import log_queue_stats
+
+log = logging.getLogger(__name__)
+
+config = Config(".env")
+# Seconds between two rounds of readiness checks.
+READINESS_INTERVAL = config("READINESS_INTERVAL", cast=float, default=30.0)
+# Seconds each check may take, unless READINESS_TIMEOUTS sets its own.
+READINESS_TIMEOUT = config("READINESS_TIMEOUT", cast=float, default=5.0)
+# Per-check timeouts, e.g. "google=3,log_writer=1".
+READINESS_TIMEOUTS = config("READINESS_TIMEOUTS", cast=str, default="log_writer=1")
+# Auth providers whose dependencies must be reachable, e.g. "google,okta".
+READINESS_PROVIDERS = config(
+    "READINESS_PROVIDERS", cast=CommaSeparatedStrings, default=""
+)
+
+
+class HealthCheck:
+    """A named probe that raises when what it checks is unhealthy."""
+
+    __slots__ = ("name", "probe", "timeout")
+
+    def __init__(self, name: str, probe: Callable[[], Awaitable[None]], timeout: float):
+        self.name = name
+        self.probe = probe
+        self.timeout = timeout
+
+
+class CheckResult:
+    __slots__ = ("error", "checked_at", "duration")
+
+    def __init__(self, error: str | None, checked_at: float, duration: float):
+        self.error = error
+        self.checked_at = checked_at
+        self.duration = duration
+
+
+class ReadinessMonitor:
+    """
+    Runs health checks in a background task every `interval` seconds and
+    keeps their latest results, so that a readiness probe only reads them.
+
+    The checks of a round run concurrently, each bounded by its own timeout.
+    The service is ready once every check has passed in its latest round.
+    A result older than `stale_after` (three intervals by default, i.e. the
+    background task has stopped) counts as a failure.
+    """
+
+    def __init__(
+        self,
+        checks: list[HealthCheck],
+        interval: float = 30.0,
+        stale_after: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.checks = checks
+        self.interval = interval
+        self.stale_after = stale_after if stale_after is not None else 3 * interval
+        self._clock = clock
+        self.results: dict[str, CheckResult] = {}
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> None:
+        """Runs every check once and stores the results."""
+        await asyncio.gather(*(self._run(check) for check in self.checks))
+
+    async def _run(self, check: HealthCheck) -> None:
+        started = self._clock()
+        try:
+            await asyncio.wait_for(check.probe(), check.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"timed out after {check.timeout:g}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished = self._clock()
+
+        previous = self.results.get(check.name)
+        if error is not None and (previous is None or previous.error is None):
+            log.warning(f"Readiness check '{check.name}' failed: {error}")
+        elif error is None and previous is not None and previous.error is not None:
+            log.info(f"Readiness check '{check.name}' recovered.")
+        self.results[check.name] = CheckResult(error, finished, finished - started)
+
+    def start(self) -> None:
+        """Starts the background task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_forever())
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def report(self) -> tuple[bool, dict]:
+        """Whether the service is ready, and the latest result of every check."""
+        now = self._clock()
+        ready = True
+        checks = {}
+        for check in self.checks:
+            result = self.results.get(check.name)
+            if result is None:
+                ready = False
+                checks[check.name] = {"status": "pending"}
+                continue
+            age = now - result.checked_at
+            if age > self.stale_after:
+                status = "stale"
+            else:
+                status = "ok" if result.error is None else "failing"
+            ready = ready and status == "ok"
+            entry = {
+                "status": status,
+                "age_seconds": round(age, 3),
+                "duration_ms": round(result.duration * 1000, 3),
+            }
+            if result.error is not None:
+                entry["error"] = result.error
+            checks[check.name] = entry
+        return ready, {"status": "ready" if ready else "not_ready", "checks": checks}
+
+
+async def check_log_writer() -> None:
+    stats = log_queue_stats()
+    if not stats["running"]:
+        raise RuntimeError("the log writer thread is not running")
+    if stats["capacity"] and stats["queued"] >= stats["capacity"]:
+        raise RuntimeError(f"the log queue is full ({stats['dropped']} records dropped)")
+
+
+def provider_check(name: str) -> Callable[[], Awaitable[None]]:
+    if name not in auth_registry.names:
+        raise ValueError(
+            f"Unknown readiness provider '{name}'. Use {auth_registry.describe_choices()}."
+        )
+
+    async def check() -> None:
+        await auth_registry.get(name).check_ready()
+
+    return check
+
+
+def parse_timeouts(spec: str) -> dict[str, float]:
+    """Parses "check=seconds,other=seconds" into {"check": seconds, ...}."""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+def default_checks() -> list[HealthCheck]:
+    """The log writer, plus the dependencies of each of READINESS_PROVIDERS."""
+    timeouts = parse_timeouts(READINESS_TIMEOUTS)
+    probes = {"log_writer": check_log_writer}
+    probes.update((name, provider_check(name)) for name in READINESS_PROVIDERS)
+    return [
+        HealthCheck(name, probe, timeouts.get(name, READINESS_TIMEOUT))
+        for name, probe in probes.items()
+    ]
+
+
+readiness_monitor = ReadinessMonitor(default_checks(), interval=READINESS_INTERVAL)
@@ -0,0 +1,85 @@
+# =================================================================
+# api/items.py
+# =================================================================
+from typing import Annotated
+
+from fastapi import HTTPException, Query, status
+
+from models.item import ITEM_BATCH_MAX, ItemDetails
+
+# Characters one ID may take in `ids=`, a separator included: int64 is 20.
+ID_QUERY_CHARS = 21
+
+
+def find_item(item_id: int) -> ItemDetails | None:
+    """
+    Looks up a single item, returning None if it does not exist.
+    Items are synthesised from their ID until there is a real item store.
+    """
+    return ItemDetails(id=item_id, description="This is a V2 item.")
+
+
+def find_items(item_ids: list[int]) -> tuple[list[ItemDetails], list[int]]:
+    """Looks up many items; returns (found items, IDs that were not found)."""
+    found, missing = [], []
+    for item_id in item_ids:
+        item = find_item(item_id)
+        if item is None:
+            missing.append(item_id)
+        else:
+            found.append(item)
+    return found, missing
+
+
+def get_item_or_404(item_id: int) -> ItemDetails:
+    item = find_item(item_id)
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Item {item_id} not found."
+        )
+    return item
+
+
+def check_batch(item_ids: list[int]) -> list[int]:
+    """De-duplicates a batch (keeping order) and enforces ITEM_BATCH_MAX."""
+    unique_ids = list(dict.fromkeys(item_ids))
+    if not unique_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one item ID is required.",
+        )
+    if len(unique_ids) > ITEM_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many item IDs: {len(unique_ids)} requested, at most {ITEM_BATCH_MAX} allowed.",
+        )
+    return unique_ids
+
+
+def item_ids_from_query(
+    ids: Annotated[
+        str, Query(description="Comma separated item IDs, e.g. '1,2,3'.")
+    ],
+) -> list[int]:
+    """Dependency that parses and checks the `ids=` query parameter."""
+    # Checked before splitting, so a huge value is never turned into a list.
+    if len(ids) > ITEM_BATCH_MAX * ID_QUERY_CHARS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many item IDs: at most {ITEM_BATCH_MAX} allowed.",
+        )
+    try:
+        item_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'ids' must be a comma separated list of integers.",
+        )
+    return check_batch(item_ids)
+
+
+def batch_include(fields: dict | None) -> dict | None:
+    """Applies a single-item include spec to every item of a batch response."""
+    if fields is None:
+        return None
+    return {"items": {"__all__": fields}, "missing": True}
@@ -0,0 +1,98 @@
+# api/test_conditional.py
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from .conditional import ConditionalGet, etag_for
+from app.main import app
+from auth.dependencies import get_current_active_user
+from models.user import User
+
+fake_user = User(
+    id="google-fakeuser123",
+    provider="google",
+    email="fake.user@example.com",
+    display_name="Fake User",
+)
+
+
+def conditional_with(if_none_match: str | None) -> ConditionalGet:
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return ConditionalGet(Request({"type": "http", "headers": headers}))
+
+
+# --- Unit Tests ---
+
+
+def test_etag_is_stable_and_sensitive_to_inputs():
+    other_user = fake_user.model_copy(update={"display_name": "Renamed"})
+
+    assert etag_for("user", fake_user, None) == etag_for("user", fake_user, None)
+    assert etag_for("user", fake_user, None) != etag_for("user", other_user, None)
+    assert etag_for("user", fake_user, None) != etag_for("user", fake_user, {"id": True})
+    assert etag_for("user", fake_user, None).startswith('"')
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+    ],
+)
+def test_if_none_match_comparison(header, expected):
+    assert conditional_with(header).matches('"abc"') is expected
+
+
+def test_not_modified_skips_building_the_body():
+    def build():
+        raise AssertionError("The body must not be built for a 304.")
+
+    response = conditional_with('"abc"').respond('"abc"', build)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == '"abc"'
+
+
+# --- Integration Tests through the endpoints ---
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides = {get_current_active_user: lambda: fake_user}
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides = {}
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/users/me", "/api/v1/items/5", "/api/v2/items/5", "/api/v2/items?ids=1,2"],
+)
+def test_conditional_get_round_trip(client: TestClient, path: str):
+    first = client.get(path)
+    etag = first.headers["etag"]
+
+    second = client.get(path, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert "Cookie" in first.headers["vary"]
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_projection_changes_the_etag(client: TestClient):
+    full = client.get("/users/me")
+    partial = client.get("/users/me?fields=id")
+
+    assert full.headers["etag"] != partial.headers["etag"]
+    stale = client.get("/users/me?fields=id", headers={"If-None-Match": full.headers["etag"]})
+    assert stale.status_code == 200
@@ -0,0 +1,105 @@
+# api/test_fieldsets.py
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from .fieldsets import FieldSelector
+from app.main import app
+from auth.dependencies import get_current_active_user
+from models.item import ItemV2
+from models.user import User
+
+fake_user = User(
+    id="google-fakeuser123",
+    provider="google",
+    email="fake.user@example.com",
+    display_name="Fake User",
+)
+
+
+# --- Unit Tests for FieldSelector ---
+
+
+def test_no_fields_means_everything():
+    assert FieldSelector(User)() is None
+    assert FieldSelector(User)("") is None
+
+
+def test_top_level_and_nested_fields():
+    selector = FieldSelector(ItemV2)
+
+    include = selector("owner_email, item_details, retrieved_by.email,retrieved_by.id")
+
+    assert include == {
+        "owner_email": True,
+        "item_details": True,
+        "retrieved_by": {"email": True, "id": True},
+    }
+
+
+def test_whole_nested_field_wins_over_its_children():
+    selector = FieldSelector(ItemV2)
+
+    assert selector("retrieved_by.email,retrieved_by") == {"retrieved_by": True}
+    assert selector("retrieved_by,retrieved_by.email") == {"retrieved_by": True}
+
+
+@pytest.mark.parametrize("fields", ["nope", "email,nope", "email.domain", ",,"])
+def test_unknown_fields_are_rejected(fields: str):
+    with pytest.raises(HTTPException) as excinfo:
+        FieldSelector(User)(fields)
+
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail.startswith("Unknown field(s) in 'fields'")
+
+
+def test_parsed_specs_are_memoized():
+    selector = FieldSelector(User)
+
+    assert selector("id,email") is selector("id,email")
+
+
+# --- Integration Tests through the endpoints ---
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides = {get_current_active_user: lambda: fake_user}
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides = {}
+
+
+def test_users_me_projection(client: TestClient):
+    response = client.get("/users/me?fields=id,email")
+
+    assert response.status_code == 200
+    assert response.json() == {"id": fake_user.id, "email": fake_user.email}
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_item_projection(client: TestClient, version: str):
+    response = client.get(f"/api/{version}/items/7?fields=version,item_details")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "version": version,
+        "item_details": {"id": 7, "description": "This is a V2 item."},
+    }
+
+
+def test_v2_nested_projection(client: TestClient):
+    response = client.get("/api/v2/items/7?fields=retrieved_by.email")
+
+    assert response.json() == {"retrieved_by": {"email": fake_user.email}}
+
+
+@pytest.mark.parametrize(
+    "path", ["/users/me", "/api/v1/items/7", "/api/v2/items/7"]
+)
+def test_invalid_fields_are_rejected_consistently(client: TestClient, path: str):
+    response = client.get(f"{path}?fields=bogus")
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Unknown field(s) in 'fields': bogus.")
@@ -0,0 +1,119 @@
+# api/test_health.py
+
+import asyncio
+
+import pytest
+
+from .health import HealthCheck, ReadinessMonitor, default_checks, parse_timeouts, provider_check
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def passes():
+    pass
+
+
+async def fails():
+    raise ConnectionError("refused")
+
+
+async def hangs():
+    await asyncio.sleep(10)
+
+
+def test_pending_until_the_first_round():
+    monitor = ReadinessMonitor([HealthCheck("db", passes, timeout=1)])
+
+    assert monitor.report() == (False, {"status": "not_ready", "checks": {"db": {"status": "pending"}}})
+
+
+def test_ready_when_every_check_passes_with_ages():
+    clock = FakeClock()
+    monitor = ReadinessMonitor(
+        [HealthCheck("a", passes, timeout=1), HealthCheck("b", passes, timeout=1)],
+        interval=10,
+        clock=clock,
+    )
+    asyncio.run(monitor.refresh())
+    clock.now += 4.5
+
+    ready, report = monitor.report()
+
+    assert ready is True
+    assert report["status"] == "ready"
+    assert report["checks"]["a"] == {"status": "ok", "age_seconds": 4.5, "duration_ms": 0.0}
+
+
+def test_failures_and_timeouts_are_reported_per_check():
+    monitor = ReadinessMonitor(
+        [
+            HealthCheck("ok", passes, timeout=1),
+            HealthCheck("down", fails, timeout=1),
+            HealthCheck("slow", hangs, timeout=0.05),
+        ]
+    )
+
+    asyncio.run(monitor.refresh())
+    ready, report = monitor.report()
+
+    assert ready is False
+    assert report["checks"]["ok"]["status"] == "ok"
+    assert report["checks"]["down"]["error"] == "ConnectionError: refused"
+    assert report["checks"]["slow"]["error"] == "timed out after 0.05s"
+
+
+def test_old_results_go_stale():
+    clock = FakeClock()
+    monitor = ReadinessMonitor([HealthCheck("a", passes, timeout=1)], interval=10, clock=clock)
+    asyncio.run(monitor.refresh())
+    clock.now += 31
+
+    ready, report = monitor.report()
+
+    assert ready is False
+    assert report["checks"]["a"]["status"] == "stale"
+
+
+def test_background_task_refreshes_until_stopped():
+    calls = []
+
+    async def counted():
+        calls.append(1)
+
+    monitor = ReadinessMonitor([HealthCheck("a", counted, timeout=1)], interval=0.01)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        stopped_at = len(calls)
+        await asyncio.sleep(0.05)
+        return stopped_at
+
+    stopped_at = asyncio.run(scenario())
+
+    assert stopped_at >= 3
+    assert len(calls) == stopped_at
+
+
+def test_configured_checks(monkeypatch):
+    from . import health
+
+    monkeypatch.setattr(health, "READINESS_PROVIDERS", ["mock"])
+    monkeypatch.setattr(health, "READINESS_TIMEOUTS", "mock=2,log_writer=1")
+
+    checks = {check.name: check.timeout for check in default_checks()}
+
+    assert checks == {"log_writer": 1.0, "mock": 2.0}
+    assert parse_timeouts(" a=1.5, b=3 ") == {"a": 1.5, "b": 3.0}
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError):
+        provider_check("made-up")
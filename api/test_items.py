@@ -0,0 +1,128 @@
+# api/test_items.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+from . import items
+from app.main import app
+from auth.dependencies import get_current_active_user
+from models.item import ItemDetails
+from models.user import User
+
+fake_user = User(
+    id="google-fakeuser123",
+    provider="google",
+    email="fake.user@example.com",
+    display_name="Fake User",
+)
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides = {get_current_active_user: lambda: fake_user}
+    with TestClient(app) as c:
+        yield c
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def odd_items_only(monkeypatch):
+    """Pretend only odd item IDs exist."""
+
+    def find_item(item_id: int):
+        if item_id % 2:
+            return ItemDetails(id=item_id, description="This is a V2 item.")
+        return None
+
+    monkeypatch.setattr(items, "find_item", find_item)
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_batch_items_match_single_item_shape(client: TestClient, version: str):
+    single = client.get(f"/api/{version}/items/3").json()
+
+    response = client.get(f"/api/{version}/items?ids=3,5")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"][0] == single
+    assert [item["item_details"]["id"] for item in body["items"]] == [3, 5]
+    assert body["missing"] == []
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_post_batch_variant(client: TestClient, version: str):
+    response = client.post(f"/api/{version}/items/batch", json={"ids": [1, 2, 1]})
+
+    assert response.status_code == 200
+    # Duplicates are collapsed, order is kept.
+    assert [item["item_details"]["id"] for item in response.json()["items"]] == [1, 2]
+
+
+def test_partial_results_list_missing_ids(client: TestClient, odd_items_only):
+    response = client.get("/api/v2/items?ids=1,2,3,4")
+
+    body = response.json()
+    assert [item["item_details"]["id"] for item in body["items"]] == [1, 3]
+    assert body["missing"] == [2, 4]
+
+
+def test_single_missing_item_is_404(client: TestClient, odd_items_only):
+    response = client.get("/api/v1/items/2")
+
+    assert response.status_code == 404
+
+
+def test_batch_fields_apply_to_each_item(client: TestClient):
+    response = client.get("/api/v2/items?ids=1,2&fields=item_details.id")
+
+    assert response.json() == {
+        "items": [{"item_details": {"id": 1}}, {"item_details": {"id": 2}}],
+        "missing": [],
+    }
+
+
+def test_batch_size_is_capped(client: TestClient, monkeypatch):
+    monkeypatch.setattr(items, "ITEM_BATCH_MAX", 3)
+
+    response = client.post("/api/v1/items/batch", json={"ids": [1, 2, 3, 4]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Too many item IDs: 4 requested, at most 3 allowed."
+    )
+
+
+def test_oversized_post_body_is_rejected_while_parsing(client: TestClient):
+    response = client.post(
+        "/api/v1/items/batch", json={"ids": list(range(items.ITEM_BATCH_MAX + 1))}
+    )
+
+    # A validation error from the model, not check_batch's 400.
+    assert response.status_code == 422
+
+
+def test_oversized_ids_query_is_rejected_before_splitting(client: TestClient, monkeypatch):
+    monkeypatch.setattr(items, "ITEM_BATCH_MAX", 3)
+
+    within = client.get("/api/v1/items?ids=" + ",".join(["1"] * 3))
+    too_long = client.get("/api/v1/items?ids=" + "1" * (3 * items.ID_QUERY_CHARS + 1))
+
+    assert within.status_code == 200
+    assert too_long.status_code == 400
+    assert too_long.json()["detail"] == "Too many item IDs: at most 3 allowed."
+
+
+@pytest.mark.parametrize("ids", ["1,x", ""])
+def test_bad_ids_are_rejected(client: TestClient, ids: str):
+    response = client.get(f"/api/v1/items?ids={ids}")
+
+    assert response.status_code == 400
+
+
+def test_batch_requires_authentication():
+    app.dependency_overrides = {}
+    with TestClient(app) as c:
+        response = c.get("/api/v1/items?ids=1,2")
+
+    assert response.status_code == 401
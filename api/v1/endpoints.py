@@ -3,12 +3,46 @@
 # =================================================================
 from typing import Annotated
 from fastapi import APIRouter, Depends
-from api.v1.healthcheck import perform_healthcheck
+from api.v1.healthcheck import perform_healthcheck, perform_readiness_check
+from api.conditional import ConditionalGet, etag_for
+from api.fieldsets import FieldSelector, IncludeSpec
+from api.items import (
+    batch_include,
+    check_batch,
+    find_items,
+    get_item_or_404,
+    item_ids_from_query,
+)
+from app.responses import FastJSONResponse
 from auth.dependencies import get_current_active_user
+from models.item import ItemBatchRequest, ItemBatchV1, ItemDetails, ItemV1
 from models.user import User
-from metrics.app import app_counter
 
 router = APIRouter()
+item_fields = FieldSelector(ItemV1)
+
+
+def build_item(details: ItemDetails, current_user: User) -> ItemV1:
+    """Builds the v1 representation of an item for the current user."""
+    return ItemV1(
+        item_details=details,
+        owner_email=current_user.email,
+        owner_provider=current_user.provider,
+        owner_display_name=current_user.display_name,
+    )
+
+
+def batch_response(
+    found: list[ItemDetails],
+    missing: list[int],
+    current_user: User,
+    fields: IncludeSpec | None,
+) -> FastJSONResponse:
+    batch = ItemBatchV1(
+        items=[build_item(details, current_user) for details in found],
+        missing=missing,
+    )
+    return FastJSONResponse(batch, include=batch_include(fields))
 
 
 # Healthcheck endpoint
@@ -17,23 +51,82 @@ async def healthcheck():
     return await perform_healthcheck()
 
 
+@router.get("/health/live", description="Liveness: the process is up and serving requests")
+async def liveness():
+    return await perform_healthcheck()
+
+
 @router.get(
-    "/items/{item_id}", description="Get an item by its ID", response_model=dict
+    "/health/ready",
+    description="Readiness: the latest results of the background dependency checks",
+    responses={503: {"description": "A check is failing, stale or has not run yet"}},
+)
+async def readiness():
+    return await perform_readiness_check()
+
+
+@router.get(
+    "/items/{item_id}", description="Get an item by its ID", response_model=ItemV1
 )
 async def read_item_v1(
     item_id: int,
     # This is the key change: Depend on the new function to get the user
     current_user: Annotated[User, Depends(get_current_active_user)],
+    fields: Annotated[IncludeSpec | None, Depends(item_fields)],
+    conditional: Annotated[ConditionalGet, Depends()],
 ):
     """
     This endpoint is now protected. To access it, you must provide:
     - 'X-Auth-Provider': 'google' or 'okta'
     - 'Authorization': 'google-someuserid'
+
+    Use `fields=` to return only some of the item's fields.
+    Honors If-None-Match with a 304 when the item has not changed.
     """
-    return {
-        "version": "v1",
-        "item_details": {"id": item_id, "description": "This is a V2 item."},
-        "owner_email": current_user.email,
-        "owner_provider": current_user.provider,
-        "owner_display_name": current_user.display_name,
-    }
+    details = get_item_or_404(item_id)
+    etag = etag_for("v1-item", details, current_user, fields)
+    # Returning the response directly skips FastAPI's re-validation of a
+    # model we just built; FastJSONResponse encodes it straight to bytes.
+    return conditional.respond(
+        etag,
+        lambda: FastJSONResponse(build_item(details, current_user), include=fields),
+    )
+
+
+@router.get(
+    "/items",
+    description="Get many items by ID in one call, e.g. ?ids=1,2,3",
+    response_model=ItemBatchV1,
+)
+async def read_items_v1(
+    item_ids: Annotated[list[int], Depends(item_ids_from_query)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    fields: Annotated[IncludeSpec | None, Depends(item_fields)],
+    conditional: Annotated[ConditionalGet, Depends()],
+):
+    """
+    Batch variant of `/items/{item_id}`: authenticates once and returns every
+    item found, in request order, plus the IDs that were not found.
+    `fields=` applies to each item.
+    """
+    found, missing = find_items(item_ids)
+    etag = etag_for("v1-items", found, missing, current_user, fields)
+    return conditional.respond(
+        etag, lambda: batch_response(found, missing, current_user, fields)
+    )
+
+
+@router.post(
+    "/items/batch",
+    description="Get many items by ID in one call, with the IDs in the body",
+    response_model=ItemBatchV1,
+)
+async def read_items_batch_v1(
+    batch: ItemBatchRequest,
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    fields: Annotated[IncludeSpec | None, Depends(item_fields)],
+):
+    """Same as `GET /items?ids=...`, for batches too long for a query string."""
+    found, missing = find_items(check_batch(batch.ids))
+    return batch_response(found, missing, current_user, fields)
+
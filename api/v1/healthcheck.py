@@ -1,3 +1,21 @@
+from api.health import readiness_monitor
+from app.responses import FastJSONResponse
+
+
+# What a healthy instance answers; also served by the probe fast path.
+HEALTHY = {"status": "ok"}
+
+
 # Define the healthcheck logic once
 async def perform_healthcheck():
-    return {"status": "ok"}
+    return HEALTHY
+
+
+async def perform_readiness_check() -> FastJSONResponse:
+    # Only reads the results the background checks left behind.
+    ready, report = readiness_monitor.report()
+    return FastJSONResponse(
+        report,
+        status_code=200 if ready else 503,
+        headers={"Cache-Control": "no-store"},
+    )
@@ -1,5 +1,7 @@
 # tests/v1/test_endpoint.py
 
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -38,3 +40,27 @@ def test_health_check(client: TestClient):
 
     # 4. (Optional but good practice) Assert the content-type header
     assert response.headers["content-type"] == "application/json"
+
+
+def test_liveness(client: TestClient):
+    response = client.get("/api/v1/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.parametrize("version", ["v1", "v2"])
+def test_readiness_reports_the_background_checks(client: TestClient, version: str):
+    # The lifespan started the checks; wait for their first round.
+    for _ in range(100):
+        response = client.get(f"/api/{version}/health/ready")
+        if response.status_code == 200:
+            break
+        time.sleep(0.01)
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["checks"]["log_writer"]["status"] == "ok"
+    assert body["checks"]["log_writer"]["age_seconds"] >= 0
@@ -6,6 +6,8 @@ from fastapi.testclient import TestClient
 # You'll need a main 'app' instance that includes your router.
 # Let's assume you have a file 'main.py' that creates the app.
 from app.main import app
+from auth.dependencies import get_current_active_user
+from models.user import User
 
 
 @pytest.fixture(scope="module")
@@ -38,3 +40,39 @@ def test_health_check(client: TestClient):
 
     # 4. (Optional but good practice) Assert the content-type header
     assert response.headers["content-type"] == "application/json"
+
+
+fake_user = User(
+    id="google-fakeuser123",
+    provider="google",
+    email="fake.user@example.com",
+    display_name="Fake User",
+    disabled=False,
+)
+
+
+async def override_get_current_active_user():
+    """A mock dependency that returns a predefined user."""
+    return fake_user
+
+
+def test_read_item_as_authenticated_user(client: TestClient):
+    """
+    Tests GET /api/v2/items/{item_id}; v2 embeds the retrieving user.
+    """
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+
+    response = client.get("/api/v2/items/42")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "version": "v2",
+        "item_details": {"id": 42, "description": "This is a V2 item."},
+        "owner_email": fake_user.email,
+        "owner_provider": fake_user.provider,
+        "owner_display_name": fake_user.display_name,
+        "retrieved_by": fake_user.model_dump(),
+    }
+
+    app.dependency_overrides = {}
@@ -0,0 +1,322 @@
+# =================================================================
+# File: app/compression.py
+# =================================================================
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings, Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+config = Config(".env")
+COMPRESSION_MINIMUM_SIZE = config("COMPRESSION_MINIMUM_SIZE", cast=int, default=500)
+# Path prefixes that are never compressed.
+COMPRESSION_EXCLUDE_PATHS = config(
+    "COMPRESSION_EXCLUDE_PATHS", cast=CommaSeparatedStrings, default=""
+)
+# Paths whose (static) bodies are compressed once and served from a cache.
+COMPRESSION_CACHE_PATHS = config(
+    "COMPRESSION_CACHE_PATHS", cast=CommaSeparatedStrings, default="/,/openapi.json"
+)
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def stream(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self, quality: int):
+        self.quality = quality
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.quality)
+
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.quality)
+        return (
+            lambda chunk: compressor.process(chunk) + compressor.flush(),
+            compressor.finish,
+        )
+
+
+class _ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (
+            lambda chunk: compressor.compress(chunk)
+            + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+
+def available_encoders(gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3) -> list:
+    """The encoders this process can use, in server preference order."""
+    encoders = []
+    if brotli is not None:
+        encoders.append(_BrotliEncoder(brotli_quality))
+    if zstandard is not None:
+        encoders.append(_ZstdEncoder(zstd_level))
+    encoders.append(_GzipEncoder(gzip_level))
+    return encoders
+
+
+def negotiate(accept_encoding: str, encoders: list):
+    """
+    Picks the encoder for an Accept-Encoding header: the highest q-value
+    wins, ties go to server preference. Returns None for identity.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoder in encoders:
+        q = weights.get(encoder.name, wildcard)
+        if q > best_q:
+            best, best_q = encoder, q
+    return best
+
+
+class CompressedBodyCache:
+    """A small LRU of compressed bodies keyed by encoding and body digest."""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, encoder, body: bytes) -> bytes:
+        key = (encoder.name, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = encoder.compress(body)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compressed
+
+
+class CompressionMiddleware:
+    """
+    Negotiated response compression: brotli and zstd when their packages are
+    installed, gzip always.
+
+    Bodies below `minimum_size`, non-text content types and responses that
+    already have a Content-Encoding are sent as they are. A route opts out
+    by setting `Cache-Control: no-transform`; whole path prefixes can be
+    excluded with `exclude_paths`. Streaming responses are compressed chunk
+    by chunk. For `cache_paths` (static bodies such as the root page and
+    the OpenAPI document) compressed bytes are cached by body digest.
+
+    When an encoding is negotiated, compressible responses carry
+    `Vary: Accept-Encoding`, and those actually encoded carry a weak ETag, as
+    the bytes differ per encoding. A 304 repeats the ETag in the form the
+    client sent it in If-None-Match.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        exclude_paths: tuple[str, ...] | list[str] = (),
+        cache_paths: tuple[str, ...] | list[str] = (),
+        cache_size: int = 64,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.exclude_paths = tuple(exclude_paths)
+        self.cache_paths = frozenset(cache_paths)
+        self.cache = CompressedBodyCache(cache_size)
+        self.encoders = available_encoders(gzip_level, brotli_quality, zstd_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        headers = Headers(scope=scope)
+        encoder = None
+        if not (self.exclude_paths and path.startswith(self.exclude_paths)):
+            encoder = negotiate(headers.get("accept-encoding", ""), self.encoders)
+        if encoder is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(
+            send,
+            encoder,
+            self.minimum_size,
+            self.cache if path in self.cache_paths else None,
+            headers.get("if-none-match", ""),
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        send: Send,
+        encoder,
+        minimum_size: int,
+        cache: CompressedBodyCache | None,
+        if_none_match: str = "",
+    ):
+        self._send = send
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.start_message: Message | None = None
+        self.passthrough = False
+        self.stream = None
+        self.if_none_match = if_none_match
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if message["status"] == 304:
+                # Whether the 200 was encoded depends on its size, which a 304
+                # does not tell: answer with the ETag the client holds.
+                headers = MutableHeaders(raw=message["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if self._client_holds_weak(headers.get("etag")):
+                    self._weaken(headers)
+                self.passthrough = True
+                await self._send(message)
+                return
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or "no-transform" in headers.get("cache-control", "")
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None and not more_body:
+            await self._send_whole(body)
+        else:
+            await self._send_chunk(body, more_body)
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self._send(self.start_message)
+            self.start_message = None
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoder.name
+        headers.add_vary_header("Accept-Encoding")
+        self._weaken(headers)
+
+    @staticmethod
+    def _weaken(headers: MutableHeaders) -> None:
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    def _client_holds_weak(self, etag: str | None) -> bool:
+        if not etag:
+            return False
+        opaque = etag.removeprefix("W/")
+        return any(
+            candidate.strip() == f"W/{opaque}" for candidate in self.if_none_match.split(",")
+        )
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.minimum_size:
+            # Still varies with Accept-Encoding (a larger body would have been
+            # encoded); sent as it is, so the ETag stays strong.
+            MutableHeaders(raw=self.start_message["headers"]).add_vary_header("Accept-Encoding")
+            await self._flush_start()
+            await self._send({"type": "http.response.body", "body": body})
+            return
+        if self.cache is not None:
+            compressed = self.cache.get_or_compress(self.encoder, body)
+        else:
+            compressed = self.encoder.compress(body)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        self._mark_encoded(headers)
+        headers["Content-Length"] = str(len(compressed))
+        await self._flush_start()
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _send_chunk(self, body: bytes, more_body: bool) -> None:
+        if self.stream is None:
+            self.stream = self.encoder.stream()
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            self._mark_encoded(headers)
+            del headers["Content-Length"]
+            await self._flush_start()
+        compress, finish = self.stream
+        data = compress(body) if body else b""
+        if not more_body:
+            data += finish()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
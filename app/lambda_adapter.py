@@ -0,0 +1,200 @@
+# =================================================================
+# File: app/lambda_adapter.py
+# =================================================================
+import asyncio
+import atexit
+import base64
+import logging
+from typing import Any
+from urllib.parse import unquote
+
+log = logging.getLogger(__name__)
+
+# Response content types that can be returned to API Gateway as plain text.
+TEXT_CONTENT_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/vnd.api+json",
+    "application/problem+json",
+)
+
+
+class LambdaAdapter:
+    """
+    Runs an ASGI application inside AWS Lambda for API Gateway HTTP API
+    (payload format 2.0) events.
+
+    Create the adapter at module level. Lambda then runs its constructor in
+    the init phase: the event loop is created and the application's lifespan
+    startup (provider pre-warming, clients, caches) runs before the first
+    request. The loop, the lifespan task and everything the app keeps in
+    memory stay alive between warm invocations of the same environment.
+    """
+
+    def __init__(self, app, lifespan: bool = True):
+        self.app = app
+        self.loop = asyncio.new_event_loop()
+        self._lifespan_queue: asyncio.Queue | None = None
+        self._lifespan_task: asyncio.Task | None = None
+        if lifespan:
+            self.loop.run_until_complete(self._startup())
+        atexit.register(self.shutdown)
+
+    def __call__(self, event: dict, context: Any = None) -> dict:
+        scope, body = self.build_scope(event, context)
+        status, headers, chunks = self.loop.run_until_complete(
+            self._run_http(scope, body)
+        )
+        return self.build_response(status, headers, b"".join(chunks))
+
+    # --- Lifespan ---
+
+    async def _startup(self) -> None:
+        self._lifespan_queue = asyncio.Queue()
+        startup_done = self.loop.create_future()
+
+        async def receive():
+            return await self._lifespan_queue.get()
+
+        async def send(message):
+            message_type = message["type"]
+            if message_type == "lifespan.startup.complete":
+                startup_done.set_result(None)
+            elif message_type == "lifespan.startup.failed":
+                startup_done.set_exception(
+                    RuntimeError(f"Lifespan startup failed: {message.get('message')}")
+                )
+
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}}
+        self._lifespan_task = self.loop.create_task(self.app(scope, receive, send))
+        await self._lifespan_queue.put({"type": "lifespan.startup"})
+        await startup_done
+        log.info("Lambda adapter: lifespan startup complete.")
+
+    def shutdown(self) -> None:
+        """Runs the lifespan shutdown and closes the event loop."""
+        if self.loop.is_closed():
+            return
+        if self._lifespan_task is not None and not self._lifespan_task.done():
+            self._lifespan_queue.put_nowait({"type": "lifespan.shutdown"})
+            self.loop.run_until_complete(self._lifespan_task)
+        self.loop.close()
+
+    # --- HTTP ---
+
+    async def _run_http(
+        self, scope: dict, body: bytes
+    ) -> tuple[int, list[tuple[bytes, bytes]], list[bytes]]:
+        response_start: dict = {}
+        chunks: list[bytes] = []
+        request_sent = False
+        response_done = asyncio.Event()
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await response_done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_done.set()
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            # Starlette's ServerErrorMiddleware sends its 500 response and then
+            # re-raises for the server to log; return what was sent instead.
+            log.exception(f"Lambda adapter: unhandled error in {scope['method']} {scope['path']}")
+            if not response_start:
+                return 500, [(b"content-type", b"text/plain; charset=utf-8")], [b"Internal Server Error"]
+        finally:
+            response_done.set()
+        return response_start["status"], response_start.get("headers", []), chunks
+
+    @staticmethod
+    def build_scope(event: dict, context: Any = None) -> tuple[dict, bytes]:
+        """Translates an HTTP API v2 event into an ASGI HTTP scope and body."""
+        if event.get("version") != "2.0":
+            raise ValueError(
+                "Unsupported Lambda event: only API Gateway HTTP API "
+                "payload format 2.0 events are handled."
+            )
+        http = event["requestContext"]["http"]
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in (event.get("headers") or {}).items()
+        ]
+        if event.get("cookies"):
+            headers.append((b"cookie", "; ".join(event["cookies"]).encode("latin-1")))
+
+        body = event.get("body") or b""
+        if isinstance(body, str):
+            body = (
+                base64.b64decode(body)
+                if event.get("isBase64Encoded")
+                else body.encode("utf-8")
+            )
+
+        raw_path = event.get("rawPath") or http.get("path") or "/"
+        host = (event.get("headers") or {}).get("host", "lambda")
+        port = int((event.get("headers") or {}).get("x-forwarded-port", 443))
+        scheme = (event.get("headers") or {}).get("x-forwarded-proto", "https")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": http.get("protocol", "HTTP/1.1").split("/")[-1],
+            "method": http["method"],
+            "scheme": scheme,
+            "path": unquote(raw_path),
+            "raw_path": raw_path.encode("latin-1"),
+            "root_path": "",
+            "query_string": (event.get("rawQueryString") or "").encode("latin-1"),
+            "headers": headers,
+            "client": (http.get("sourceIp", "0.0.0.0"), 0),
+            "server": (host, port),
+            "aws.event": event,
+            "aws.context": context,
+        }
+        return scope, body
+
+    @staticmethod
+    def build_response(
+        status: int, headers: list[tuple[bytes, bytes]], body: bytes
+    ) -> dict:
+        """Translates an ASGI response into an HTTP API v2 result."""
+        response_headers: dict[str, str] = {}
+        cookies: list[str] = []
+        for raw_name, raw_value in headers:
+            name = raw_name.decode("latin-1").lower()
+            value = raw_value.decode("latin-1")
+            if name == "set-cookie":
+                cookies.append(value)
+            elif name in response_headers:
+                response_headers[name] = f"{response_headers[name]},{value}"
+            else:
+                response_headers[name] = value
+
+        content_type = response_headers.get("content-type", "")
+        is_text = "content-encoding" not in response_headers and (
+            content_type.startswith(TEXT_CONTENT_TYPES)
+        )
+        result = {
+            "statusCode": status,
+            "headers": response_headers,
+            "cookies": cookies,
+            "isBase64Encoded": not is_text and bool(body),
+        }
+        if result["isBase64Encoded"]:
+            result["body"] = base64.b64encode(body).decode("ascii")
+        else:
+            result["body"] = body.decode("utf-8")
+        return result
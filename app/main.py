@@ -2,6 +2,7 @@
 # File: testAuth.py (Main Application)
 # =================================================================
 import logging
+from contextlib import asynccontextmanager
 
 import uvicorn
 import logging_config
@@ -21,11 +22,44 @@ from fastapi.responses import HTMLResponse
 
 # Import all services and the base class/model
 from auth.dependencies import (
+    AUTH_PREWARM_PROVIDERS,
+    auth_registry,
     get_auth_service_from_query,
     get_auth_service_from_header,
     get_current_active_user,
 )
 from auth.authService import AuthService
+from api.health import readiness_monitor
+from api.v1.healthcheck import HEALTHY
+from api.conditional import ConditionalGet, etag_for
+from api.fieldsets import FieldSelector, IncludeSpec
+from app.compression import (
+    COMPRESSION_CACHE_PATHS,
+    COMPRESSION_EXCLUDE_PATHS,
+    COMPRESSION_MINIMUM_SIZE,
+    CompressionMiddleware,
+)
+from app.ratelimit import (
+    RATE_LIMIT,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_EXEMPT_PATHS,
+    RATE_LIMIT_KEY,
+    RATE_LIMIT_MAX_KEYS,
+    InMemoryRateLimitStore,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+)
+from app.probes import HEALTH_PROBE_METRICS, HEALTH_PROBE_PATHS, install_health_probes
+from app.profiling import (
+    PROFILE_DIR,
+    PROFILE_MAX_CONCURRENT,
+    PROFILE_MAX_FILES,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SECRET,
+    ProfilingMiddleware,
+)
+from app.responses import FastJSONResponse
+from metrics.app import probe_metrics
 from metrics.instrument import instrument_app
 from models.user import User
 
@@ -38,6 +72,20 @@ logging_config.setup_logging()
 logger = logging.getLogger(__name__)
 logger.info("Starting FastAPI application...")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Providers are built once and reused; pre-warm the configured ones now,
+    # the rest are built on their first request.
+    await auth_registry.startup(AUTH_PREWARM_PROVIDERS)
+    readiness_monitor.start()
+    yield
+    await readiness_monitor.stop()
+    await auth_registry.shutdown()
+
+
+user_fields = FieldSelector(User)
+
 # --- FastAPI App Initialization ---
 app = FastAPI(
     title="usvc_fastapi_docker API",
@@ -45,10 +93,50 @@ app = FastAPI(
     version="1.0.0",
     contact={"name": "Slats", "email": "test@sncsoftware.com"},
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 # --- Apply Instrumentation ---
 instrument_app(app)
 
+# --- Response Compression ---
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    exclude_paths=list(COMPRESSION_EXCLUDE_PATHS),
+    cache_paths=list(COMPRESSION_CACHE_PATHS),
+)
+
+# --- Request Profiling (opt-in; not installed unless configured) ---
+if str(PROFILE_SECRET) or PROFILE_SAMPLE_RATE:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=PROFILE_DIR,
+        secret=str(PROFILE_SECRET),
+        sample_rate=PROFILE_SAMPLE_RATE,
+        max_files=PROFILE_MAX_FILES,
+        max_concurrent=PROFILE_MAX_CONCURRENT,
+    )
+
+# --- Rate Limiting (outermost, so rejected requests cost as little as possible) ---
+if RATE_LIMIT:
+    app.add_middleware(
+        RateLimitMiddleware,
+        policy=RateLimitPolicy.parse(RATE_LIMIT, burst=RATE_LIMIT_BURST),
+        key=RATE_LIMIT_KEY,
+        store=InMemoryRateLimitStore(max_keys=RATE_LIMIT_MAX_KEYS),
+        exempt_paths=list(RATE_LIMIT_EXEMPT_PATHS),
+    )
+
+# --- Health Probe Fast Path (ahead of everything above, instrumentation included) ---
+if HEALTH_PROBE_PATHS:
+    install_health_probes(
+        app,
+        list(HEALTH_PROBE_PATHS),
+        HEALTHY,
+        metrics=probe_metrics if HEALTH_PROBE_METRICS else None,
+    )
+
 # --- Include the API Router ---
 app.include_router(v1_endpoints.router, prefix="/api/v1", tags=["v1"])
 app.include_router(v2_endpoints.router, prefix="/api/v2", tags=["v2"])
@@ -73,20 +161,28 @@ async def callback(
 
 @app.get("/auth/logout", tags=["Authentication"])
 async def logout(
+    request: Request,
     auth_service: Annotated[AuthService, Depends(get_auth_service_from_query)],
 ) -> FastAPIResponse:
-    return await auth_service.auth_logout()
+    return await auth_service.auth_logout(request)
 
 
 @app.get("/users/me", response_model=User, tags=["User"])
 async def read_current_user(
     current_user: Annotated[User, Depends(get_current_active_user)],
+    fields: Annotated[IncludeSpec | None, Depends(user_fields)],
+    conditional: Annotated[ConditionalGet, Depends()],
 ):
     """
     Get the current authenticated user's details.
     This endpoint is protected and requires 'X-Auth-Provider' and 'Authorization' headers.
+    Use `fields=` to return only some of the user's fields.
+    Honors If-None-Match with a 304 when the profile has not changed.
     """
-    return current_user
+    return conditional.respond(
+        etag_for("user", current_user, fields),
+        lambda: FastJSONResponse(current_user, include=fields),
+    )
 
 
 # --- Root Endpoint ---
@@ -0,0 +1,86 @@
+# =================================================================
+# File: app/probes.py
+# =================================================================
+from typing import Any, Callable
+
+from starlette.applications import Starlette
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.responses import FastJSONResponse
+
+config = Config(".env")
+# Paths answered ahead of the middleware stack. Empty routes them normally.
+HEALTH_PROBE_PATHS = config(
+    "HEALTH_PROBE_PATHS", cast=CommaSeparatedStrings, default="/api/v1/health,/api/v2/health"
+)
+# Count the fast-path probes (health_probes_total) on the metrics endpoint.
+HEALTH_PROBE_METRICS = config("HEALTH_PROBE_METRICS", cast=bool, default=False)
+
+
+class HealthProbeMiddleware:
+    """
+    Answers GET and HEAD on `paths` with a response built once from
+    `content`, before any other middleware, routing or dependency runs.
+    Everything else is passed to `app`.
+
+    The bytes and headers are those the app's own route would send for
+    `content`, so the fast path is indistinguishable from it to a load
+    balancer. `metrics`, if given, is asked once per path for a zero-argument
+    recorder that is called for every probe (see ProbeMetrics).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: tuple[str, ...] | list[str],
+        content: Any,
+        metrics=None,
+    ):
+        self.app = app
+        response = FastJSONResponse(content)
+        self.start = {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": response.raw_headers,
+        }
+        self.body = {"type": "http.response.body", "body": response.body}
+        self.empty_body = {"type": "http.response.body", "body": b""}
+        self.recorders: dict[str, Callable[[], None] | None] = {
+            path: metrics.bind(path) if metrics is not None else None for path in paths
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.recorders:
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        if method != "GET" and method != "HEAD":
+            await self.app(scope, receive, send)
+            return
+        record = self.recorders[scope["path"]]
+        if record is not None:
+            record()
+        await send(self.start)
+        await send(self.body if method == "GET" else self.empty_body)
+
+
+def install_health_probes(
+    app: Starlette,
+    paths: tuple[str, ...] | list[str],
+    content: Any,
+    metrics=None,
+) -> None:
+    """
+    Puts a HealthProbeMiddleware in front of the app's whole middleware
+    stack. `add_middleware` cannot: Starlette keeps its error middleware
+    outermost, and FastAPIInstrumentor wraps the stack it builds. Call this
+    after `instrument_app`.
+    """
+    build = app.build_middleware_stack
+
+    def build_middleware_stack() -> ASGIApp:
+        return HealthProbeMiddleware(build(), paths, content, metrics)
+
+    app.build_middleware_stack = build_middleware_stack
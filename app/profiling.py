@@ -0,0 +1,259 @@
+# =================================================================
+# File: app/profiling.py
+# =================================================================
+"""
+Opt-in profiling of single requests.
+
+A request is profiled when it carries a valid signed token in the
+X-Profile-Token header, or when it is picked by PROFILE_SAMPLE_RATE. The
+profile covers that request only: cProfile runs while the request's own
+coroutine is running on the event loop, and in the worker threads it hands
+synchronous work to (sync dependencies such as get_current_active_user,
+sync routes). Time spent waiting on I/O is not included. The result is a
+pstats file in PROFILE_DIR, which snakeviz, flameprof and gprof2dot read;
+its name is returned in the X-Profile response header.
+
+At most PROFILE_MAX_CONCURRENT requests are profiled at once (others run
+normally) and only the newest PROFILE_MAX_FILES profiles are kept. Without a
+secret or a sample rate the middleware is not installed at all.
+
+Worker threads are followed by wrapping FastAPI's run_in_threadpool, and only
+while a profiled request is in flight. Work that other middleware hands to
+threads (e.g. the per-user rate limiter authenticating the request) happens
+outside the profiled app and is not included.
+
+On Python 3.12 and later cProfile is built on sys.monitoring, which allows
+one active profiler per process and sees every thread. There, one request
+is profiled at a time whatever PROFILE_MAX_CONCURRENT says, and a profile
+may include work done by other requests while it was being taken.
+
+Create a token for a path (valid for --ttl seconds):
+
+    python -m app.profiling /users/me --ttl 300
+"""
+import argparse
+import cProfile
+import hashlib
+import hmac
+import os
+import pstats
+import random
+import re
+import sys
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+import fastapi.dependencies.utils
+import fastapi.routing
+from starlette.concurrency import run_in_threadpool
+from starlette.config import Config
+from starlette.datastructures import Headers, MutableHeaders, Secret
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+config = Config(".env")
+# Signs X-Profile-Token headers. Empty disables header-triggered profiling.
+PROFILE_SECRET = config("PROFILE_SECRET", cast=Secret, default="")
+# Fraction of requests profiled without a token (0 = none).
+PROFILE_SAMPLE_RATE = config("PROFILE_SAMPLE_RATE", cast=float, default=0.0)
+PROFILE_DIR = config("PROFILE_DIR", cast=str, default="profiles")
+PROFILE_MAX_FILES = config("PROFILE_MAX_FILES", cast=int, default=20)
+PROFILE_MAX_CONCURRENT = config("PROFILE_MAX_CONCURRENT", cast=int, default=1)
+
+TOKEN_HEADER = "x-profile-token"
+
+# The profile of the request whose task (or worker thread) is running.
+_current_profile: ContextVar["RequestProfile | None"] = ContextVar("profile", default=None)
+# Where FastAPI hands sync dependencies and sync routes to worker threads.
+_THREADPOOL_CALLERS = (fastapi.dependencies.utils, fastapi.routing)
+# Profiled requests in flight; the threadpool hook is installed while > 0.
+_hook_users = 0
+# cProfile allows only one active profiler per process from 3.12 on.
+_ONE_PROFILER_PER_PROCESS = sys.version_info >= (3, 12)
+
+
+def profile_token(secret: str, path: str, expires: int) -> str:
+    """A token that allows profiling requests to `path` until `expires`."""
+    signature = hmac.new(secret.encode(), f"{expires}:{path}".encode(), hashlib.sha256)
+    return f"{expires}.{signature.hexdigest()}"
+
+
+def verify_profile_token(secret: str, path: str, token: str, now: float) -> bool:
+    expires = token.partition(".")[0]
+    if not expires.isdigit() or int(expires) < now:
+        return False
+    return hmac.compare_digest(token, profile_token(secret, path, int(expires)))
+
+
+async def _run_in_threadpool_profiled(func, *args, **kwargs):
+    profile = _current_profile.get()
+    if profile is not None:
+        func = profile.in_worker(func)
+    return await run_in_threadpool(func, *args, **kwargs)
+
+
+def _hook_threadpool() -> None:
+    global _hook_users
+    if _hook_users == 0:
+        for module in _THREADPOOL_CALLERS:
+            module.run_in_threadpool = _run_in_threadpool_profiled
+    _hook_users += 1
+
+
+def _unhook_threadpool() -> None:
+    global _hook_users
+    _hook_users -= 1
+    if _hook_users == 0:
+        for module in _THREADPOOL_CALLERS:
+            module.run_in_threadpool = run_in_threadpool
+
+
+class _ProfiledCoroutine:
+    """Awaits `coroutine` with `profiler` enabled only while it is running."""
+
+    def __init__(self, coroutine, profiler: cProfile.Profile):
+        self.coroutine = coroutine
+        self.profiler = profiler
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            self.profiler.enable()
+            try:
+                if error is None:
+                    yielded = self.coroutine.send(value)
+                else:
+                    yielded = self.coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                self.coroutine.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+class RequestProfile:
+    """The profilers of one request: its event loop part and worker threads."""
+
+    def __init__(self):
+        self.loop_profiler = cProfile.Profile()
+        self.worker_profilers: list[cProfile.Profile] = []
+
+    def run(self, coroutine) -> _ProfiledCoroutine:
+        return _ProfiledCoroutine(coroutine, self.loop_profiler)
+
+    def in_worker(self, func: Callable) -> Callable:
+        def profiled(*args, **kwargs):
+            profiler = cProfile.Profile()
+            self.worker_profilers.append(profiler)
+            return profiler.runcall(func, *args, **kwargs)
+
+        return profiled
+
+    def save(self, path: str) -> None:
+        stats = pstats.Stats(self.loop_profiler)
+        for profiler in self.worker_profilers:
+            stats.add(profiler)
+        stats.dump_stats(path)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry a valid X-Profile-Token (when `secret` is
+    set) or are picked at `sample_rate`, and writes one pstats file per
+    profiled request to `directory` (see the module docstring).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        secret: str = "",
+        sample_rate: float = 0.0,
+        max_files: int = 20,
+        max_concurrent: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.app = app
+        self.directory = directory
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        # A second profiler would fail to enable (see the module docstring).
+        self.max_concurrent = 1 if _ONE_PROFILER_PER_PROCESS else max_concurrent
+        self.clock = clock
+        self.running = 0
+
+    def wanted(self, scope: Scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if not self.secret:
+            return False
+        token = Headers(scope=scope).get(TOKEN_HEADER)
+        return token is not None and verify_profile_token(
+            self.secret, scope["path"], token, self.clock()
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self.running >= self.max_concurrent
+            or not self.wanted(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        name = self.file_name(scope)
+
+        async def send_with_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile"] = name
+            await send(message)
+
+        profile = RequestProfile()
+        self.running += 1
+        _hook_threadpool()
+        reset = _current_profile.set(profile)
+        try:
+            await profile.run(self.app(scope, receive, send_with_header))
+        finally:
+            _current_profile.reset(reset)
+            _unhook_threadpool()
+            self.running -= 1
+            await run_in_threadpool(self.save, profile, name)
+
+    def file_name(self, scope: Scope) -> str:
+        route = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        return f"{time.time_ns()}-{os.getpid()}-{scope['method']}-{route}.prof"
+
+    def save(self, profile: RequestProfile, name: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profile.save(os.path.join(self.directory, name))
+        # Names start with the time they were taken, so they sort oldest first.
+        profiles = sorted(name for name in os.listdir(self.directory) if name.endswith(".prof"))
+        for old in profiles[: max(0, len(profiles) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:  # removed by another worker
+                pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Creates an X-Profile-Token header value.")
+    parser.add_argument("path", help="Request path to profile, e.g. /users/me")
+    parser.add_argument("--ttl", type=int, default=300, help="Seconds the token stays valid.")
+    args = parser.parse_args(argv)
+    if not str(PROFILE_SECRET):
+        print("PROFILE_SECRET is not set.", file=sys.stderr)
+        return 1
+    print(profile_token(str(PROFILE_SECRET), args.path, int(time.time()) + args.ttl))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# =================================================================
+# File: app/ratelimit.py
+# =================================================================
+import inspect
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings, MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth.dependencies import get_current_active_user
+from models.user import User
+
+config = Config(".env")
+# e.g. "5/second", "100/minute", "1000/hour". Empty disables rate limiting.
+RATE_LIMIT = config("RATE_LIMIT", cast=str, default="")
+# Requests allowed back to back before the rate applies; defaults to the limit.
+RATE_LIMIT_BURST = config("RATE_LIMIT_BURST", cast=int, default=0)
+# ip | user | provider
+RATE_LIMIT_KEY = config("RATE_LIMIT_KEY", cast=str, default="ip")
+# Path prefixes that are never limited.
+RATE_LIMIT_EXEMPT_PATHS = config(
+    "RATE_LIMIT_EXEMPT_PATHS", cast=CommaSeparatedStrings, default=""
+)
+RATE_LIMIT_MAX_KEYS = config("RATE_LIMIT_MAX_KEYS", cast=int, default=100_000)
+
+TOO_MANY_REQUESTS_BODY = b'{"detail":"Too Many Requests"}'
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+
+class RateLimitPolicy:
+    """
+    `limit` requests per `period` seconds, enforced with GCRA: one request is
+    earned back every `period / limit` seconds, and up to `burst` may be
+    spent at once.
+    """
+
+    __slots__ = ("limit", "period", "burst", "emission_interval", "tolerance")
+
+    def __init__(self, limit: int, period: float, burst: int | None = None):
+        if limit <= 0 or period <= 0:
+            raise ValueError("A rate limit needs a positive limit and period.")
+        self.limit = limit
+        self.period = period
+        self.burst = burst or limit
+        self.emission_interval = period / limit
+        self.tolerance = self.emission_interval * self.burst
+
+    @classmethod
+    def parse(cls, spec: str, burst: int | None = None) -> "RateLimitPolicy":
+        """Parses "<limit>/<second|minute|hour|day>", e.g. "100/minute"."""
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*", spec)
+        if match is None:
+            raise ValueError(
+                f"Invalid rate limit {spec!r}. Use <limit>/<{'|'.join(PERIODS)}>."
+            )
+        return cls(int(match.group(1)), PERIODS[match.group(2)], burst)
+
+    def __repr__(self):
+        return f"RateLimitPolicy(limit={self.limit}, period={self.period}, burst={self.burst})"
+
+
+class RateLimitDecision:
+    """The outcome of one acquire: whether to serve, and the header values."""
+
+    __slots__ = ("allowed", "limit", "remaining", "reset_after", "retry_after")
+
+    def __init__(
+        self, allowed: bool, limit: int, remaining: int, reset_after: float, retry_after: float
+    ):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_after = reset_after
+        self.retry_after = retry_after
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+class RateLimitStore:
+    """
+    Interface for rate limit state.
+
+    A store keeps one GCRA "theoretical arrival time" per key and must apply
+    `acquire` atomically per key. The in-memory store serves one process; a
+    shared store (e.g. Redis) can implement the same interface so that all
+    workers of a deployment draw from the same buckets.
+    """
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """Spends one request from `key`'s bucket, if it has one to spend."""
+        raise NotImplementedError
+
+    async def reset(self, key: str) -> None:
+        """Forgets `key`'s bucket, so it starts full again."""
+        raise NotImplementedError
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> theoretical arrival time, least recently used first
+        self.buckets: OrderedDict[str, float] = OrderedDict()
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process GCRA buckets, sharded by key so that concurrent requests for
+    different keys rarely contend for the same lock.
+
+    A bucket whose arrival time has passed is full again and carries no
+    state, so it is evicted; eviction is done a few entries at a time from
+    the least recently used end of the shard, keeping each acquire O(1).
+    `max_keys` bounds memory if many keys are active at once.
+    """
+
+    def __init__(
+        self,
+        shards: int = 16,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._shards = [_Shard() for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+        self._clock = clock
+        self.evictions = 0
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        return self.take(key, policy)
+
+    async def reset(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.buckets.pop(key, None)
+
+    def take(self, key: str, policy: RateLimitPolicy) -> RateLimitDecision:
+        """The synchronous body of `acquire`."""
+        now = self._clock()
+        shard = self._shard(key)
+        with shard.lock:
+            buckets = shard.buckets
+            tat = max(buckets.get(key, now), now)
+            new_tat = tat + policy.emission_interval
+            allow_at = new_tat - policy.tolerance
+            # (with a nanosecond of slack for float rounding in the arrival times)
+            if allow_at - now > 1e-9:
+                return RateLimitDecision(
+                    False, policy.limit, 0, tat - now, allow_at - now
+                )
+            buckets[key] = new_tat
+            buckets.move_to_end(key)
+            self._evict(buckets, now)
+        remaining = int((now - allow_at) / policy.emission_interval + 1e-9)
+        return RateLimitDecision(True, policy.limit, remaining, new_tat - now, 0.0)
+
+    def _evict(self, buckets: OrderedDict, now: float) -> None:
+        for _ in range(2):
+            oldest_key, oldest_tat = next(iter(buckets.items()))
+            if oldest_tat > now and len(buckets) <= self._max_per_shard:
+                return
+            del buckets[oldest_key]
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+# --- Keys ---
+
+
+def client_ip_key(request: Request) -> str:
+    """The client address as seen by the server (see uvicorn --proxy-headers)."""
+    client = request.client
+    return f"ip:{client.host if client else 'unknown'}"
+
+
+async def _current_user(request: Request) -> User | None:
+    # In a worker thread, as FastAPI runs the route's own sync dependency:
+    # header authentication may verify a token or fetch signing keys.
+    try:
+        return await run_in_threadpool(
+            get_current_active_user,
+            request,
+            request.headers.get("x-auth-provider"),
+            request.headers.get("authorization"),
+        )
+    except HTTPException:
+        return None
+
+
+async def user_key(request: Request) -> str:
+    """The authenticated user; anonymous requests are limited per client IP."""
+    user = await _current_user(request)
+    if user is None:
+        return client_ip_key(request)
+    return f"user:{user.provider}:{user.id}"
+
+
+async def provider_key(request: Request) -> str:
+    """The user's auth provider; anonymous requests are limited per client IP."""
+    user = await _current_user(request)
+    if user is None:
+        return client_ip_key(request)
+    return f"provider:{user.provider}"
+
+
+KEY_FUNCTIONS: dict[str, Callable[[Request], str | Awaitable[str]]] = {
+    "ip": client_ip_key,
+    "user": user_key,
+    "provider": provider_key,
+}
+
+
+class RateLimitMiddleware:
+    """
+    Rejects requests over `policy` with a 429 before they reach the app.
+
+    Every limited response carries RateLimit-Limit, RateLimit-Remaining and
+    RateLimit-Reset headers; a 429 also carries Retry-After. `key` selects
+    whose bucket a request is drawn from (see KEY_FUNCTIONS); a key function
+    may be a coroutine function. The `user` and `provider` keys resolve the
+    user through `get_current_active_user` in a worker thread, which keeps
+    the outcome on the request state, so the route does not authenticate the
+    request a second time.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        policy: RateLimitPolicy,
+        key: str | Callable[[Request], str | Awaitable[str]] = "ip",
+        store: RateLimitStore | None = None,
+        exempt_paths: tuple[str, ...] | list[str] = (),
+    ):
+        self.app = app
+        self.policy = policy
+        if isinstance(key, str):
+            if key not in KEY_FUNCTIONS:
+                raise ValueError(
+                    f"Unknown rate limit key {key!r}. Use one of: {', '.join(KEY_FUNCTIONS)}."
+                )
+            key = KEY_FUNCTIONS[key]
+        self.key_function = key
+        self.store = store if store is not None else InMemoryRateLimitStore()
+        self.exempt_paths = tuple(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (
+            self.exempt_paths and scope["path"].startswith(self.exempt_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = self.key_function(Request(scope))
+        if inspect.isawaitable(key):
+            key = await key
+        decision = await self.store.acquire(key, self.policy)
+        headers = decision.headers()
+        if not decision.allowed:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 429,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(TOO_MANY_REQUESTS_BODY)).encode()),
+                        *((k.lower().encode(), v.encode()) for k, v in headers.items()),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": TOO_MANY_REQUESTS_BODY})
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
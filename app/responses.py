@@ -0,0 +1,52 @@
+# =================================================================
+# File: app/responses.py
+# =================================================================
+from typing import Any, Mapping
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    The application's default JSON response class.
+
+    Pydantic models are serialized straight to bytes by pydantic-core, with
+    no intermediate dict and no `jsonable_encoder` walk. Anything else is
+    serialized with orjson when it is installed, falling back to the
+    standard JSONResponse encoder otherwise.
+
+    `include` is a pydantic include spec applied to model content, so that
+    fields left out of a sparse fieldset are never encoded at all.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+        include: dict | None = None,
+    ):
+        self.include = include
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, include=self.include)
+        if orjson is not None:
+            return orjson.dumps(content, default=_orjson_default)
+        return super().render(content)
@@ -0,0 +1,399 @@
+# =================================================================
+# File: app/server.py
+# =================================================================
+"""
+Production launcher: one listening socket shared by N forked uvicorn workers.
+
+    python -m app.server
+    python -m app.server --workers 4 --port 8989
+
+The master binds the socket, imports the app once (so workers share its
+memory copy-on-write) and forks the workers. It replaces workers that exit,
+which is how workers recycled after SERVER_MAX_REQUESTS come back.
+
+Signals to the master:
+  SIGHUP          rolling restart: each worker is replaced by a new one,
+                  and retired only once its replacement is serving
+  SIGTERM/SIGINT  graceful shutdown: workers finish in-flight requests
+                  (up to SERVER_GRACEFUL_TIMEOUT) and exit
+
+With SERVER_PRELOAD the new workers of a rolling restart are forked from the
+already-imported app, so they do not pick up code changes; set it to false
+to have every worker import the app itself.
+"""
+import argparse
+import atexit
+import importlib.util
+import logging
+import math
+import os
+import select
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import uvicorn
+from starlette.config import Config
+
+import logging_config
+
+config = Config(".env")
+SERVER_HOST = config("SERVER_HOST", cast=str, default="0.0.0.0")
+SERVER_PORT = config("SERVER_PORT", cast=int, default=8989)
+# 0 sizes the pool from the CPUs this container may use (see cpu_limit).
+WEB_CONCURRENCY = config("WEB_CONCURRENCY", cast=int, default=0)
+SERVER_BACKLOG = config("SERVER_BACKLOG", cast=int, default=2048)
+# Keep above the idle timeout of any load balancer in front (ALB: 60s).
+SERVER_KEEPALIVE_TIMEOUT = config("SERVER_KEEPALIVE_TIMEOUT", cast=int, default=65)
+# Recycle a worker after this many requests (0 = never), plus up to
+# SERVER_MAX_REQUESTS_JITTER more so workers do not all restart at once.
+SERVER_MAX_REQUESTS = config("SERVER_MAX_REQUESTS", cast=int, default=10_000)
+SERVER_MAX_REQUESTS_JITTER = config("SERVER_MAX_REQUESTS_JITTER", cast=int, default=1_000)
+SERVER_GRACEFUL_TIMEOUT = config("SERVER_GRACEFUL_TIMEOUT", cast=int, default=30)
+SERVER_PRELOAD = config("SERVER_PRELOAD", cast=bool, default=True)
+
+APP = "app.main:app"
+
+# Worker states once its ready pipe has been read.
+READY = -1
+FAILED = -2
+
+log = logging.getLogger(__name__)
+
+
+def cpu_limit(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """
+    CPUs this process may use: the scheduler affinity, capped by a cgroup
+    (v2 or v1) CPU quota rounded up. A container limited to 1.5 CPUs on a
+    64-core host gets 2, not 64.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota = period = None
+    try:
+        with open(os.path.join(cgroup_root, "cpu.max")) as f:
+            quota, period = f.read().split()
+    except (OSError, ValueError):
+        try:
+            with open(os.path.join(cgroup_root, "cpu", "cpu.cfs_quota_us")) as f:
+                quota = f.read().strip()
+            with open(os.path.join(cgroup_root, "cpu", "cpu.cfs_period_us")) as f:
+                period = f.read().strip()
+        except OSError:
+            pass
+    if quota and quota not in ("max", "-1") and period:
+        cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    return max(1, cpus)
+
+
+def implementations() -> tuple[str, str]:
+    """The event loop and HTTP parser to use: uvloop and httptools if installed."""
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer(uvicorn.Server):
+    """A uvicorn server that tells the master once it is accepting requests."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets)
+        if self.started:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+def _exit_on_signal(signum, frame):
+    sys.exit(0)
+
+
+class Launcher:
+    """Forks and supervises the workers; see the module docstring."""
+
+    def __init__(
+        self,
+        app: str = APP,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        workers: int = WEB_CONCURRENCY,
+        backlog: int = SERVER_BACKLOG,
+        keepalive_timeout: int = SERVER_KEEPALIVE_TIMEOUT,
+        max_requests: int = SERVER_MAX_REQUESTS,
+        max_requests_jitter: int = SERVER_MAX_REQUESTS_JITTER,
+        graceful_timeout: int = SERVER_GRACEFUL_TIMEOUT,
+        preload: bool = SERVER_PRELOAD,
+    ):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers or cpu_limit()
+        self.backlog = backlog
+        self.keepalive_timeout = keepalive_timeout
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.preload = preload
+        self.loop, self.http = implementations()
+        # pid -> the read end of its ready pipe, then READY or FAILED
+        self._children: dict[int, int] = {}
+        self._signals: list[int] = []
+        self._sock: socket.socket | None = None
+        self._loaded = None
+
+    def run(self) -> int:
+        self._prepare_metrics()
+        self._sock = bind(self.host, self.port, self.backlog)
+        if self.preload:
+            self._loaded = uvicorn.importer.import_from_string(self.app)
+        if not self.sessions_are_shared():
+            self._sock.close()
+            return 1
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self._signals.append(signum))
+        log.info(
+            f"Serving {self.app} on {self.host}:{self.port} with {self.workers} worker(s) "
+            f"({self.loop}, {self.http}, preload={self.preload})"
+        )
+        for _ in range(self.workers):
+            self._spawn()
+        try:
+            return self._supervise()
+        finally:
+            self._sock.close()
+
+    def sessions_are_shared(self) -> bool:
+        """
+        False when SESSION_MODE=server keeps sessions in each worker's memory
+        while several workers serve: a user signed in on one worker would get
+        401s from the others.
+        """
+        # Imported here, after _prepare_metrics, like the app itself.
+        from auth import sessions
+
+        if (
+            self.workers > 1
+            and sessions.SESSION_MODE == "server"
+            and isinstance(sessions.session_store, sessions.InMemorySessionStore)
+        ):
+            log.error(
+                f"SESSION_MODE=server keeps sessions in each worker's memory, which does not "
+                f"work with {self.workers} workers. Run one worker, use SESSION_MODE=jwt, "
+                f"or give the app a shared SessionStore."
+            )
+            return False
+        return True
+
+    def _prepare_metrics(self) -> None:
+        # Workers are not the process that would serve port 8001, so their
+        # metrics always go through the multi-process directory. It is set
+        # before the app is imported, which reads it at import time.
+        directory = config("PROMETHEUS_MULTIPROC_DIR", cast=str, default="")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = directory or tempfile.mkdtemp(prefix="metrics-")
+        from metrics.multiprocess import reset_directory
+
+        reset_directory(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+    def _spawn(self) -> int:
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            self._run_worker(ready_write)
+        os.close(ready_write)
+        self._children[pid] = ready_read
+        return pid
+
+    def _run_worker(self, ready_fd: int) -> None:
+        # SIGHUP is for the master. uvicorn handles SIGTERM/SIGINT while
+        # serving and re-raises them once drained; exiting then (rather than
+        # dying of the signal) lets the atexit log and metrics flushes run.
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, _exit_on_signal)
+        config = uvicorn.Config(
+            self._loaded or self.app,
+            loop=self.loop,
+            http=self.http,
+            lifespan="on",
+            log_config=None,  # keep the app's logging pipeline
+            timeout_keep_alive=self.keepalive_timeout,
+            limit_max_requests=self.max_requests or None,
+            limit_max_requests_jitter=self.max_requests_jitter if self.max_requests else 0,
+            timeout_graceful_shutdown=self.graceful_timeout,
+        )
+        code = 0
+        try:
+            WorkerServer(config, ready_fd).run(sockets=[self._sock])
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            log.exception("Worker failed")
+            code = 1
+        # Run the atexit handlers (log and metrics flushes) but never return
+        # into the master's code. (sys.exit would not get to them: os._exit
+        # has to follow it, and it runs before the interpreter's shutdown.)
+        try:
+            atexit._run_exitfuncs()
+        finally:
+            os._exit(code)
+
+    def _wait_ready(self, pid: int, timeout: float) -> bool:
+        fd = self._children.get(pid, FAILED)
+        if fd < 0:
+            return fd == READY
+        readable, _, _ = select.select([fd], [], [], timeout)
+        if not readable:
+            return False
+        # Empty means the worker exited without ever being ready.
+        ready = os.read(fd, 1) == b"1"
+        os.close(fd)
+        self._children[pid] = READY if ready else FAILED
+        return ready
+
+    def _check_ready(self) -> None:
+        for pid, fd in list(self._children.items()):
+            if fd >= 0:
+                self._wait_ready(pid, 0)
+
+    def _reap(self) -> list[tuple[int, int, bool]]:
+        """(pid, exit code, was ready) for every worker that has exited."""
+        exited = []
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            fd = self._children.pop(pid, None)
+            if fd is None:
+                continue
+            if fd >= 0:
+                os.close(fd)
+            self._merge_metrics(pid)
+            exited.append((pid, os.waitstatus_to_exitcode(status), fd == READY))
+        return exited
+
+    def _supervise(self) -> int:
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self._rolling_restart()
+                else:
+                    return self._shutdown()
+            self._check_ready()
+            for pid, code, ready in self._reap():
+                if not ready:
+                    # Failing before it ever served means the next one will too.
+                    log.error(f"Worker {pid} exited with {code} during startup")
+                    self._shutdown()
+                    return 1
+                log.info(f"Worker {pid} exited with {code}; starting a replacement")
+                self._spawn()
+            time.sleep(0.1)
+
+    def _rolling_restart(self) -> None:
+        log.info("Rolling restart")
+        for old in list(self._children):
+            new = self._spawn()
+            if not self._wait_ready(new, self.graceful_timeout):
+                log.error(f"Replacement worker {new} did not start; keeping worker {old}")
+                continue
+            self._stop(old)
+
+    def _stop(self, pid: int) -> None:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while time.monotonic() < deadline:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if done:
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        fd = self._children.pop(pid, READY)
+        if fd >= 0:
+            os.close(fd)
+        self._merge_metrics(pid)
+
+    def _shutdown(self) -> int:
+        log.info("Shutting down")
+        pids = list(self._children)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in list(self._children):
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self._children.pop(pid)
+            self._merge_metrics(pid)
+        return 0
+
+    def _merge_metrics(self, pid: int) -> None:
+        # Recycled workers would otherwise each leave a metrics file behind.
+        from metrics.multiprocess import merge_exited
+
+        try:
+            merge_exited(os.environ["PROMETHEUS_MULTIPROC_DIR"], pid)
+        except OSError as e:
+            log.warning(f"Could not merge the metrics of worker {pid}: {e}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", default=APP, help=f"ASGI app to serve (default {APP}).")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY,
+                        help="Worker processes (default: the CPU limit).")
+    parser.add_argument("--max-requests", type=int, default=SERVER_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=SERVER_GRACEFUL_TIMEOUT)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", default=SERVER_PRELOAD)
+    args = parser.parse_args(argv)
+
+    logging_config.setup_logging()
+    launcher = Launcher(
+        app=args.app,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        preload=args.preload,
+    )
+    return launcher.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
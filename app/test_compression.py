@@ -0,0 +1,186 @@
+# app/test_compression.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from .compression import CompressionMiddleware, _GzipEncoder, negotiate
+from .main import app
+
+BODY = "x" * 1000
+
+
+def make_client(**options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return PlainTextResponse(BODY, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny", headers={"ETag": '"v2"'})
+
+    @app.get("/raw")
+    async def raw():
+        return PlainTextResponse(BODY, headers={"Cache-Control": "no-transform"})
+
+    @app.get("/binary")
+    async def binary():
+        return Response(b"\0" * 1000, media_type="application/octet-stream")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(10):
+                yield BODY
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/not-modified")
+    async def not_modified():
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return TestClient(app)
+
+
+def get(client: TestClient, path: str, accept_encoding: str = "gzip"):
+    return client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+
+# --- negotiate ---
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("GZIP;q=0.5", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+        ("*", "gzip"),
+        ("*, gzip;q=0", None),
+    ],
+)
+def test_negotiate(header, expected):
+    encoder = negotiate(header, [_GzipEncoder(6)])
+
+    assert (encoder.name if encoder else None) == expected
+
+
+def test_negotiate_prefers_higher_q_then_server_order():
+    class Brotli:
+        name = "br"
+
+    encoders = [Brotli(), _GzipEncoder(6)]
+
+    assert negotiate("gzip, br", encoders).name == "br"
+    assert negotiate("gzip, br;q=0.5", encoders).name == "gzip"
+
+
+# --- middleware ---
+
+
+def test_gzip_round_trip():
+    response = get(make_client(), "/big")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+
+def test_compressed_response_has_weak_etag():
+    response = get(make_client(), "/big")
+
+    assert response.headers["etag"] == 'W/"v1"'
+
+
+def test_uncompressed_small_response_keeps_a_strong_etag():
+    response = get(make_client(), "/small")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"v2"'
+
+
+@pytest.mark.parametrize("held", ['W/"v1"', '"v1"'])
+def test_not_modified_repeats_the_etag_the_client_holds(held):
+    response = make_client().get(
+        "/not-modified", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"v0", {held}'}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == held
+
+
+@pytest.mark.parametrize("path", ["/small", "/raw", "/binary"])
+def test_left_uncompressed(path):
+    response = get(make_client(), path)
+
+    assert "content-encoding" not in response.headers
+
+
+def test_identity_is_left_alone():
+    response = get(make_client(), "/big", accept_encoding="identity")
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+
+
+def test_minimum_size_is_configurable():
+    response = get(make_client(minimum_size=1), "/small")
+
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_excluded_paths():
+    response = get(make_client(exclude_paths=["/bi"]), "/big")
+
+    assert "content-encoding" not in response.headers
+
+
+def test_streaming_response():
+    response = get(make_client(), "/stream")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == BODY * 10
+
+
+@pytest.mark.parametrize("module, encoding", [("brotli", "br"), ("zstandard", "zstd")])
+def test_optional_encodings(module, encoding):
+    pytest.importorskip(module)
+    client = make_client()
+
+    whole = get(client, "/big", accept_encoding=encoding)
+    streamed = get(client, "/stream", accept_encoding=encoding)
+
+    assert whole.headers["content-encoding"] == encoding
+    assert streamed.headers["content-encoding"] == encoding
+    assert whole.text == BODY
+    assert streamed.text == BODY * 10
+
+
+def test_cached_paths_reuse_compressed_bytes():
+    client = make_client(cache_paths=["/big"])
+
+    first = get(client, "/big")
+    second = get(client, "/big")
+
+    middleware = client.app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+
+    assert first.content == second.content == BODY.encode()
+    assert (middleware.cache.hits, middleware.cache.misses) == (1, 1)
+
+
+def test_app_compresses_openapi_document():
+    with TestClient(app) as client:
+        response = get(client, "/openapi.json")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["info"]["title"]
@@ -0,0 +1,130 @@
+# app/test_lambda_adapter.py
+
+import base64
+import json
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+
+from .lambda_adapter import LambdaAdapter
+from .main import app
+
+EVENTS_DIR = Path(__file__).resolve().parent.parent / "bench" / "events"
+
+
+def load_event(name: str) -> dict:
+    return json.loads((EVENTS_DIR / name).read_text())
+
+
+@pytest.fixture(scope="module")
+def handler():
+    """One adapter for the module, just like one Lambda execution environment."""
+    adapter = LambdaAdapter(app)
+    yield adapter
+    adapter.shutdown()
+
+
+def test_health_event(handler: LambdaAdapter):
+    result = handler(load_event("health_v1.json"), None)
+
+    assert result["statusCode"] == 200
+    assert result["isBase64Encoded"] is False
+    assert result["headers"]["content-type"] == "application/json"
+    assert json.loads(result["body"]) == {"status": "ok"}
+
+
+def test_header_authenticated_item(handler: LambdaAdapter):
+    result = handler(load_event("item_v2_mock_header.json"), None)
+
+    assert result["statusCode"] == 200
+    body = json.loads(result["body"])
+    assert body["version"] == "v2"
+    assert body["owner_email"] == "123@mock.com"
+
+
+def test_query_string_and_redirect(handler: LambdaAdapter):
+    result = handler(load_event("login_mock.json"), None)
+
+    assert result["statusCode"] == 307
+    assert result["headers"]["location"].startswith("/auth/callback?provider=mock")
+
+
+def test_cookies_round_trip(handler: LambdaAdapter):
+    """Set-Cookie headers come back in 'cookies'; request cookies are forwarded."""
+    callback = load_event("login_mock.json")
+    callback["rawPath"] = "/auth/callback"
+    login = handler(callback, None)
+    assert login["cookies"][0].startswith("access_token=")
+
+    me = load_event("health_v1.json")
+    me["rawPath"] = "/users/me"
+    me["cookies"] = [login["cookies"][0].split(";")[0]]
+    result = handler(me, None)
+
+    assert result["statusCode"] == 200
+    assert json.loads(result["body"])["email"] == "test@mock.com"
+
+
+def test_state_is_reused_between_invocations(handler: LambdaAdapter):
+    """Warm invocations run on the loop created during the init phase."""
+    loop = handler.loop
+    handler(load_event("health_v1.json"), None)
+    handler(load_event("health_v1.json"), None)
+
+    assert handler.loop is loop
+    assert not handler._lifespan_task.done()
+
+
+def test_unhandled_route_error_returns_a_500():
+    failing = FastAPI()
+
+    @failing.get("/api/v1/health")
+    async def broken():
+        raise RuntimeError("boom")
+
+    adapter = LambdaAdapter(failing, lifespan=False)
+    try:
+        result = adapter(load_event("health_v1.json"), None)
+    finally:
+        adapter.shutdown()
+
+    assert result["statusCode"] == 500
+    assert result["body"] == "Internal Server Error"
+
+
+def test_error_before_any_response_returns_a_500():
+    async def crashing(scope, receive, send):
+        raise RuntimeError("boom")
+
+    adapter = LambdaAdapter(crashing, lifespan=False)
+    try:
+        result = adapter(load_event("health_v1.json"), None)
+    finally:
+        adapter.shutdown()
+
+    assert result["statusCode"] == 500
+
+
+def test_base64_request_body_is_decoded():
+    event = load_event("health_v1.json")
+    event["body"] = base64.b64encode(b'{"a": 1}').decode()
+    event["isBase64Encoded"] = True
+
+    _, body = LambdaAdapter.build_scope(event)
+
+    assert body == b'{"a": 1}'
+
+
+def test_binary_response_is_base64_encoded():
+    result = LambdaAdapter.build_response(
+        200, [(b"content-type", b"image/png")], b"\x89PNG"
+    )
+
+    assert result["isBase64Encoded"] is True
+    assert base64.b64decode(result["body"]) == b"\x89PNG"
+
+
+def test_unsupported_event_version_is_rejected():
+    with pytest.raises(ValueError):
+        LambdaAdapter.build_scope({"version": "1.0", "httpMethod": "GET"})
@@ -0,0 +1,122 @@
+# app/test_probes.py
+
+import json
+import os
+import subprocess
+import sys
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry
+
+from api.v1.healthcheck import HEALTHY, perform_healthcheck
+from app.main import app as main_app
+from metrics.app import ProbeMetrics
+
+from .probes import HealthProbeMiddleware, install_health_probes
+from .responses import FastJSONResponse
+
+PATHS = ["/api/v1/health", "/api/v2/health"]
+
+
+def make_app(probes: bool, **options) -> tuple[FastAPI, list[str]]:
+    """A versioned app like app.main, recording what reached its middleware."""
+    app = FastAPI(default_response_class=FastJSONResponse)
+    reached = []
+
+    @app.middleware("http")
+    async def record(request, call_next):
+        reached.append(request.url.path)
+        return await call_next(request)
+
+    for version in ("v1", "v2"):
+        router = APIRouter()
+        router.add_api_route("/health", perform_healthcheck)
+        router.add_api_route("/items", lambda: {"items": []})
+        app.include_router(router, prefix=f"/api/{version}")
+    if probes:
+        install_health_probes(app, PATHS, HEALTHY, **options)
+    return app, reached
+
+
+def test_fast_path_matches_the_routed_response():
+    routed_app, _ = make_app(probes=False)
+    fast_app, reached = make_app(probes=True)
+
+    for path in PATHS:
+        routed = TestClient(routed_app).get(path)
+        fast = TestClient(fast_app).get(path)
+
+        assert (fast.status_code, fast.content) == (routed.status_code, routed.content)
+        assert fast.headers == routed.headers
+    assert reached == []
+
+
+def test_other_paths_and_methods_reach_the_app():
+    app, reached = make_app(probes=True)
+    client = TestClient(app)
+
+    assert client.get("/api/v1/items").json() == {"items": []}
+    assert client.post("/api/v1/health").status_code == 405
+    assert reached == ["/api/v1/items", "/api/v1/health"]
+
+
+def test_head_has_headers_but_no_body():
+    app, _ = make_app(probes=True)
+
+    response = TestClient(app).head("/api/v2/health")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == str(len(b'{"status":"ok"}'))
+
+
+def test_probes_are_counted_when_metrics_are_on():
+    metrics = ProbeMetrics()
+    app, _ = make_app(probes=True, metrics=metrics)
+    client = TestClient(app)
+    for _ in range(3):
+        client.get("/api/v1/health")
+    client.get("/api/v2/health")
+    registry = CollectorRegistry()
+    registry.register(metrics)
+
+    assert registry.get_sample_value("health_probes_total", {"path": "/api/v1/health"}) == 3
+    assert registry.get_sample_value("health_probes_total", {"path": "/api/v2/health"}) == 1
+
+
+def test_main_app_answers_probes_ahead_of_its_stack():
+    with TestClient(main_app) as client:
+        assert client.get("/api/v1/health").json() == HEALTHY
+
+    assert isinstance(main_app.middleware_stack, HealthProbeMiddleware)
+
+
+def test_main_app_rate_limits_other_paths_but_not_probes(tmp_path):
+    # RATE_LIMIT is read when app.main is imported, so check it in a fresh interpreter.
+    script = (
+        "import json, sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.main import app\n"
+        "client = TestClient(app)\n"
+        "statuses = [[client.get(path).status_code for _ in range(10)]\n"
+        "            for path in ('/api/v1/health/live', '/api/v1/health')]\n"
+        "open(sys.argv[1], 'w').write(json.dumps(statuses))\n"
+    )
+    output = tmp_path / "statuses.json"
+    subprocess.run(
+        [sys.executable, "-c", script, str(output)],
+        env={
+            **os.environ,
+            "RATE_LIMIT": "5/minute",
+            "RATE_LIMIT_KEY": "ip",
+            "PROMETHEUS_MULTIPROC_DIR": str(tmp_path),
+            "LOG_FILE": str(tmp_path / "app.log"),
+        },
+        capture_output=True,
+        check=True,
+    )
+    limited, probes = json.loads(output.read_text())
+
+    assert limited == [200] * 5 + [429] * 5
+    assert probes == [200] * 10
@@ -0,0 +1,159 @@
+# app/test_profiling.py
+
+import asyncio
+import os
+import pstats
+import time
+from typing import Annotated
+
+import fastapi.dependencies.utils
+import fastapi.routing
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+from . import profiling
+from .profiling import ProfilingMiddleware, profile_token, verify_profile_token
+
+SECRET = "profile-secret"
+
+
+def sync_dependency() -> str:
+    return "user"
+
+
+def make_client(directory, **options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work(user: Annotated[str, Depends(sync_dependency)]):
+        return {"user": user}
+
+    app.add_middleware(ProfilingMiddleware, directory=str(directory), **options)
+    return TestClient(app)
+
+
+def token(path="/work", ttl=60) -> dict[str, str]:
+    return {"X-Profile-Token": profile_token(SECRET, path, int(time.time()) + ttl)}
+
+
+def profiled_functions(path) -> set[str]:
+    return {name for _, _, name in pstats.Stats(str(path)).stats}
+
+
+# --- Tokens ---
+
+
+def test_token_is_bound_to_path_expiry_and_secret():
+    valid = profile_token(SECRET, "/work", expires=1000)
+
+    assert verify_profile_token(SECRET, "/work", valid, now=999)
+    assert not verify_profile_token(SECRET, "/work", valid, now=1001)
+    assert not verify_profile_token(SECRET, "/other", valid, now=999)
+    assert not verify_profile_token("another-secret", "/work", valid, now=999)
+    assert not verify_profile_token(SECRET, "/work", "2000." + valid.partition(".")[2], now=999)
+    assert not verify_profile_token(SECRET, "/work", "garbage", now=999)
+
+
+# --- Middleware ---
+
+
+def test_signed_request_is_profiled_with_its_thread_work(tmp_path):
+    client = make_client(tmp_path, secret=SECRET)
+
+    response = client.get("/work", headers=token())
+
+    assert response.json() == {"user": "user"}
+    path = tmp_path / response.headers["X-Profile"]
+    functions = profiled_functions(path)
+    # The async route on the event loop and the sync dependency in a worker.
+    assert {"work", "sync_dependency"} <= functions
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Profile-Token": "1.bad"}])
+def test_requests_without_a_valid_token_are_not_profiled(tmp_path, headers):
+    client = make_client(tmp_path, secret=SECRET)
+
+    response = client.get("/work", headers=headers)
+
+    assert "X-Profile" not in response.headers
+    assert not tmp_path.exists() or os.listdir(tmp_path) == []
+
+
+def test_sample_rate_profiles_without_a_token(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0)
+
+    assert "X-Profile" in client.get("/work").headers
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path):
+    client = make_client(tmp_path, sample_rate=1.0, max_files=2)
+
+    names = [client.get("/work").headers["X-Profile"] for _ in range(4)]
+
+    assert sorted(os.listdir(tmp_path)) == names[2:]
+
+
+def test_concurrent_profiles_are_capped(tmp_path):
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = ProfilingMiddleware(slow_app, str(tmp_path), sample_rate=1.0, max_concurrent=1)
+
+    async def request() -> list[bytes]:
+        sent = []
+
+        async def send(message):
+            sent.extend(message.get("headers", []))
+
+        scope = {"type": "http", "method": "GET", "path": "/slow", "headers": []}
+        await middleware(scope, None, send)
+        return [name for name, _ in sent]
+
+    async def main():
+        requests = [asyncio.create_task(request()) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        release.set()
+        return await asyncio.gather(*requests)
+
+    profiled = [b"x-profile" in headers for headers in asyncio.run(main())]
+
+    assert profiled.count(True) == 1
+    assert middleware.running == 0
+
+
+def test_thread_hook_is_only_installed_during_profiled_requests(tmp_path):
+    hooked = []
+
+    def sync_work() -> bool:
+        return fastapi.routing.run_in_threadpool is not run_in_threadpool
+
+    app = FastAPI()
+
+    @app.get("/work")
+    def work():
+        hooked.append(sync_work())
+        return {}
+
+    app.add_middleware(ProfilingMiddleware, directory=str(tmp_path), secret=SECRET)
+    client = TestClient(app)
+
+    client.get("/work", headers=token())
+    client.get("/work")
+
+    assert hooked == [True, False]
+    assert fastapi.routing.run_in_threadpool is run_in_threadpool
+    assert fastapi.dependencies.utils.run_in_threadpool is run_in_threadpool
+
+
+def test_one_profile_at_a_time_where_cprofile_is_process_wide(monkeypatch):
+    monkeypatch.setattr(profiling, "_ONE_PROFILER_PER_PROCESS", True)
+
+    middleware = ProfilingMiddleware(FastAPI(), "unused", sample_rate=1.0, max_concurrent=4)
+
+    assert middleware.max_concurrent == 1
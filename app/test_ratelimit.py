@@ -0,0 +1,232 @@
+# app/test_ratelimit.py
+
+import asyncio
+
+from typing import Annotated
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.datastructures import State
+
+from .ratelimit import (
+    InMemoryRateLimitStore,
+    RateLimitMiddleware,
+    RateLimitPolicy,
+    client_ip_key,
+    provider_key,
+    user_key,
+)
+from auth.dependencies import SECRET_KEY, auth_registry, get_current_active_user, principal_cache
+from models.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_client(policy: RateLimitPolicy, **options) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    @app.get("/docs-like")
+    async def docs_like():
+        return {"status": "ok"}
+
+    app.add_middleware(RateLimitMiddleware, policy=policy, **options)
+    return TestClient(app)
+
+
+# --- RateLimitPolicy ---
+
+
+@pytest.mark.parametrize(
+    "spec, limit, period",
+    [("5/second", 5, 1.0), ("100/minute", 100, 60.0), ("2 / hours", 2, 3600.0)],
+)
+def test_parse(spec, limit, period):
+    policy = RateLimitPolicy.parse(spec)
+
+    assert (policy.limit, policy.period, policy.burst) == (limit, period, limit)
+
+
+@pytest.mark.parametrize("spec", ["5", "five/second", "5/fortnight", "0/second"])
+def test_parse_rejects(spec):
+    with pytest.raises(ValueError):
+        RateLimitPolicy.parse(spec)
+
+
+# --- InMemoryRateLimitStore ---
+
+
+def test_burst_then_steady_rate():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(clock=clock)
+    policy = RateLimitPolicy(limit=5, period=1.0)
+
+    burst = [store.take("k", policy) for _ in range(6)]
+
+    assert [d.allowed for d in burst] == [True] * 5 + [False]
+    assert [d.remaining for d in burst] == [4, 3, 2, 1, 0, 0]
+    assert burst[-1].retry_after == pytest.approx(0.2)
+
+    clock.now += 0.2
+    assert store.take("k", policy).allowed
+    assert not store.take("k", policy).allowed
+
+
+def test_keys_are_independent():
+    store = InMemoryRateLimitStore(clock=FakeClock())
+    policy = RateLimitPolicy(limit=1, period=1.0)
+
+    assert store.take("a", policy).allowed
+    assert store.take("b", policy).allowed
+    assert not store.take("a", policy).allowed
+
+
+def test_idle_buckets_are_evicted():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(shards=1, clock=clock)
+    policy = RateLimitPolicy(limit=10, period=1.0)
+    for key in ("a", "b", "c"):
+        store.take(key, policy)
+
+    clock.now += 1.0
+    store.take("d", policy)
+
+    assert len(store) == 2
+    clock.now += 1.0
+    store.take("e", policy)
+    assert len(store) == 1
+
+
+def test_max_keys_bounds_memory():
+    store = InMemoryRateLimitStore(shards=1, max_keys=3, clock=FakeClock())
+    policy = RateLimitPolicy(limit=10, period=1.0)
+
+    for key in range(10):
+        store.take(str(key), policy)
+
+    assert len(store) == 3
+
+
+def test_reset():
+    store = InMemoryRateLimitStore(clock=FakeClock())
+    policy = RateLimitPolicy(limit=1, period=60.0)
+    store.take("k", policy)
+
+    asyncio.run(store.reset("k"))
+
+    assert asyncio.run(store.acquire("k", policy)).allowed
+
+
+# --- RateLimitMiddleware ---
+
+
+def test_middleware_returns_429_with_headers():
+    client = make_client(RateLimitPolicy(limit=2, period=60.0))
+
+    responses = [client.get("/ping") for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[0].headers["ratelimit-limit"] == "2"
+    assert responses[0].headers["ratelimit-remaining"] == "1"
+    assert responses[2].headers["retry-after"] == "30"
+    assert responses[2].headers["ratelimit-remaining"] == "0"
+    assert responses[2].json() == {"detail": "Too Many Requests"}
+
+
+def test_exempt_paths():
+    client = make_client(RateLimitPolicy(limit=1, period=60.0), exempt_paths=["/docs"])
+
+    responses = [client.get("/docs-like") for _ in range(3)]
+
+    assert all(r.status_code == 200 for r in responses)
+    assert "ratelimit-limit" not in responses[0].headers
+
+
+def test_unknown_key_is_rejected():
+    with pytest.raises(ValueError):
+        RateLimitMiddleware(FastAPI(), RateLimitPolicy(1, 1.0), key="session")
+
+
+def test_user_key_separates_users():
+    client = make_client(RateLimitPolicy(limit=1, period=60.0), key="user")
+
+    alice = client.get("/ping", headers={"X-Auth-Provider": "mock", "Authorization": "mock-alice"})
+    bob = client.get("/ping", headers={"X-Auth-Provider": "mock", "Authorization": "mock-bob"})
+    alice_again = client.get(
+        "/ping", headers={"X-Auth-Provider": "mock", "Authorization": "mock-alice"}
+    )
+
+    assert (alice.status_code, bob.status_code, alice_again.status_code) == (200, 200, 429)
+
+
+def test_user_key_authenticates_each_request_once(monkeypatch):
+    mock = auth_registry.get("mock")
+    calls = []
+
+    def authenticate(token):
+        try:
+            asyncio.get_running_loop()
+            calls.append(("on the event loop", token))
+        except RuntimeError:
+            calls.append(token)
+        return type(mock).authenticate(mock, token)
+
+    monkeypatch.setattr(mock, "authenticate", authenticate)
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(user: Annotated[User, Depends(get_current_active_user)]):
+        return {"id": user.id}
+
+    app.add_middleware(RateLimitMiddleware, policy=RateLimitPolicy(limit=5, period=60.0), key="user")
+    client = TestClient(app)
+
+    response = client.get("/me", headers={"X-Auth-Provider": "mock", "Authorization": "mock-alice"})
+    rejected = client.get("/me", headers={"X-Auth-Provider": "mock", "Authorization": "bogus"})
+
+    assert response.status_code == 200
+    assert rejected.status_code == 401
+    assert calls == ["mock-alice", "bogus"]
+
+
+# --- Keys ---
+
+
+class FakeRequest:
+    def __init__(self, headers=None, cookies=None, host="10.0.0.1"):
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.client = type("Address", (), {"host": host})()
+        self.state = State()
+
+
+def test_client_ip_key():
+    assert client_ip_key(FakeRequest()) == "ip:10.0.0.1"
+
+
+def test_user_key_from_cookie():
+    principal_cache.clear()
+    token = jwt.encode(
+        {"id": "u1", "provider": "mock", "email": "u1@mock.com"}, str(SECRET_KEY), algorithm="HS256"
+    )
+
+    request = FakeRequest(cookies={"access_token": f"Bearer {token}"})
+
+    assert asyncio.run(user_key(request)) == "user:mock:u1"
+    assert asyncio.run(provider_key(request)) == "provider:mock"
+
+
+def test_anonymous_requests_fall_back_to_ip():
+    assert asyncio.run(user_key(FakeRequest())) == "ip:10.0.0.1"
+    assert asyncio.run(provider_key(FakeRequest())) == "ip:10.0.0.1"
@@ -0,0 +1,38 @@
+# app/test_responses.py
+
+import json
+
+from . import responses
+from .responses import FastJSONResponse
+from models.item import ItemDetails, ItemV2
+from models.user import User
+
+user = User(id="u1", provider="mock", email="u1@mock.com", display_name="User One")
+
+
+def test_model_is_rendered_by_pydantic():
+    item = ItemV2(
+        item_details=ItemDetails(id=1, description="An item."),
+        owner_email=user.email,
+        owner_provider=user.provider,
+        retrieved_by=user,
+    )
+
+    response = FastJSONResponse(item)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == item.model_dump(mode="json")
+
+
+def test_nested_models_in_plain_content():
+    response = FastJSONResponse({"status": "ok", "user": user})
+
+    assert json.loads(response.body) == {"status": "ok", "user": user.model_dump()}
+
+
+def test_falls_back_without_orjson(monkeypatch):
+    monkeypatch.setattr(responses, "orjson", None)
+
+    response = FastJSONResponse({"status": "ok"})
+
+    assert response.body == b'{"status":"ok"}'
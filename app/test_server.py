@@ -0,0 +1,257 @@
+# app/test_server.py
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import CollectorRegistry, Counter
+
+from auth import sessions
+from metrics.multiprocess import ProcessMetricsWriter, aggregate_registry
+
+from . import server
+from .server import cpu_limit, implementations
+
+# Served by the launcher in the tests below: reports which worker answered.
+tiny_app = FastAPI()
+
+
+@tiny_app.get("/pid")
+def pid():
+    return os.getpid()
+
+
+@asynccontextmanager
+async def write_metrics(app: FastAPI):
+    # Each worker writes its own file, as instrument_app does in the real app;
+    # with a long interval, only its final write at exit counts.
+    registry = CollectorRegistry()
+    app.state.served = Counter("served", "Requests served", registry=registry)
+    ProcessMetricsWriter(registry, os.environ["PROMETHEUS_MULTIPROC_DIR"], interval=60).start()
+    yield
+
+
+# Counts the requests it serves in the multi-process metrics directory.
+metered_app = FastAPI(lifespan=write_metrics)
+
+
+@metered_app.get("/pid")
+def metered_pid():
+    metered_app.state.served.inc()
+    return os.getpid()
+
+
+# --- Sizing and implementations ---
+
+
+def write(path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+@pytest.fixture
+def many_cpus(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(64)))
+
+
+def test_cgroup_v2_quota_rounds_up(tmp_path, many_cpus):
+    write(tmp_path / "cpu.max", "150000 100000\n")
+
+    assert cpu_limit(str(tmp_path)) == 2
+
+
+def test_cgroup_v1_quota(tmp_path, many_cpus):
+    write(tmp_path / "cpu" / "cpu.cfs_quota_us", "400000\n")
+    write(tmp_path / "cpu" / "cpu.cfs_period_us", "100000\n")
+
+    assert cpu_limit(str(tmp_path)) == 4
+
+
+@pytest.mark.parametrize("content", ["max 100000\n", None])
+def test_no_quota_uses_affinity(tmp_path, many_cpus, content):
+    if content:
+        write(tmp_path / "cpu.max", content)
+
+    assert cpu_limit(str(tmp_path)) == 64
+
+
+def test_quota_never_exceeds_affinity(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1})
+    write(tmp_path / "cpu.max", "800000 100000\n")
+
+    assert cpu_limit(str(tmp_path)) == 2
+
+
+def test_implementations_fall_back_without_extras(monkeypatch):
+    monkeypatch.setattr(server.importlib.util, "find_spec", lambda name: None)
+
+    assert implementations() == ("asyncio", "h11")
+
+
+def test_implementations_prefer_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setattr(server.importlib.util, "find_spec", lambda name: object())
+
+    assert implementations() == ("uvloop", "httptools")
+
+
+# --- Launcher ---
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RunningServer:
+    def __init__(self, tmp_path, *args: str, app: str = "app.test_server:tiny_app"):
+        self.url = f"http://127.0.0.1:{free_port()}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.server", "--app", app, "--host", "127.0.0.1",
+             "--port", self.url.rsplit(":", 1)[1], "--graceful-timeout", "5", *args],
+            env={
+                **os.environ,
+                "PROMETHEUS_MULTIPROC_DIR": str(tmp_path / "metrics"),
+                "LOG_FILE": str(tmp_path / "app.log"),
+            },
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def wait_until_serving(self, timeout: float = 20) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                self.pid_of_worker()
+                return
+            except httpx.TransportError:
+                time.sleep(0.1)
+        raise AssertionError("the launcher did not start serving")
+
+    def pid_of_worker(self) -> int:
+        # A new connection per call, so requests spread over the workers.
+        try:
+            return httpx.get(f"{self.url}/pid", headers={"Connection": "close"}).json()
+        except (httpx.RemoteProtocolError, httpx.ReadError):
+            # A recycled worker closes connections it accepted after its last
+            # request without serving them; the client retries elsewhere.
+            return httpx.get(f"{self.url}/pid", headers={"Connection": "close"}).json()
+
+    def worker_pids(self, workers: int, timeout: float = 10) -> set[int]:
+        # Which worker accepts a connection is up to the kernel, so keep asking.
+        pids = set()
+        deadline = time.monotonic() + timeout
+        while len(pids) < workers and time.monotonic() < deadline:
+            pids.add(self.pid_of_worker())
+        return pids
+
+    def stop(self) -> int:
+        self.process.send_signal(signal.SIGTERM)
+        return self.process.wait(timeout=20)
+
+
+@pytest.fixture
+def running(tmp_path):
+    servers = []
+
+    def start(*args, **kwargs):
+        started = RunningServer(tmp_path, *args, **kwargs)
+        servers.append(started)
+        return started
+
+    yield start
+    for started in servers:
+        if started.process.poll() is None:
+            started.process.kill()
+            started.process.wait()
+
+
+def test_workers_are_recycled_after_max_requests(running):
+    launcher = running("--workers", "2", "--max-requests", "5", "--max-requests-jitter", "0")
+    launcher.wait_until_serving()
+
+    pids = {launcher.pid_of_worker() for _ in range(40)}
+
+    assert len(pids) >= 4
+    assert launcher.stop() == 0
+
+
+def test_recycled_workers_keep_their_metrics_in_one_file(running, tmp_path):
+    launcher = running(
+        "--workers", "2", "--max-requests", "3", "--max-requests-jitter", "0",
+        app="app.test_server:metered_app",
+    )
+    launcher.wait_until_serving()
+    pids = {launcher.pid_of_worker() for _ in range(29)}
+    assert launcher.stop() == 0
+
+    directory = tmp_path / "metrics"
+    files = [name for name in os.listdir(directory) if name.endswith(".json")]
+    # wait_until_serving's request plus 29, about three per worker.
+    assert len(pids) >= 5
+    assert files == ["otel_exited.json"]
+    assert aggregate_registry(str(directory)).get_sample_value("served_total") == 30
+
+
+def test_rolling_restart_replaces_every_worker_without_errors(running):
+    launcher = running("--workers", "2", "--max-requests", "0")
+    launcher.wait_until_serving()
+    before = launcher.worker_pids(2)
+    failures = []
+    served = set()
+    stop = threading.Event()
+
+    def keep_requesting():
+        while not stop.is_set():
+            try:
+                served.add(launcher.pid_of_worker())
+            except httpx.HTTPError as e:
+                failures.append(e)
+
+    traffic = threading.Thread(target=keep_requesting)
+    traffic.start()
+    launcher.process.send_signal(signal.SIGHUP)
+    deadline = time.monotonic() + 20
+    after = set()
+    while time.monotonic() < deadline and (len(after) < 2 or after & before):
+        time.sleep(0.2)
+        after = launcher.worker_pids(2, timeout=1)
+    stop.set()
+    traffic.join()
+
+    assert len(before) == 2
+    assert len(after) == 2 and not after & before
+    assert failures == []
+    assert launcher.stop() == 0
+
+
+def test_in_memory_server_sessions_need_a_single_worker(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_MODE", "server")
+
+    assert not server.Launcher(workers=2).sessions_are_shared()
+    assert server.Launcher(workers=1).sessions_are_shared()
+
+    monkeypatch.setattr(sessions, "session_store", sessions.SessionStore())
+    assert server.Launcher(workers=2).sessions_are_shared()
+
+
+def test_launcher_refuses_server_sessions_with_several_workers(running, monkeypatch):
+    monkeypatch.setenv("SESSION_MODE", "server")
+
+    started = running("--workers", "2")
+
+    assert started.process.wait(timeout=20) == 1
+
+
+def test_worker_that_cannot_start_stops_the_launcher(running):
+    launcher = running("--workers", "1", "--no-preload", app="app.test_server:missing")
+
+    assert launcher.process.wait(timeout=20) == 1
@@ -1,11 +1,14 @@
-import jwt
+import logging
+
+import httpx
 from fastapi import HTTPException, Request, status, Response
 from fastapi.responses import HTMLResponse
-from fastapi_sso.sso.google import GoogleSSO
 from starlette.config import Config
 from starlette.datastructures import Secret
 
 from auth.authService import AuthService
+from auth.outbound import CachedDocument, OutboundClient
+from auth.sessions import end_session, start_session
 from models.user import User
 
 config = Config(".env")
@@ -13,19 +16,77 @@ GOOGLE_CLIENT_ID = config("GOOGLE_CLIENT_ID", cast=str, default="YOUR_GOOGLE_CLI
 GOOGLE_CLIENT_SECRET = config(
     "GOOGLE_CLIENT_SECRET", cast=Secret, default="YOUR_GOOGLE_CLIENT_SECRET"
 )
-SECRET_KEY = config("SECRET_KEY", cast=Secret, default="A_RANDOM_SECRET_KEY")
-
-google_sso = GoogleSSO(
-    client_id=GOOGLE_CLIENT_ID,
-    client_secret=str(GOOGLE_CLIENT_SECRET),
-    redirect_uri="http://localhost:8989/auth/callback?provider=google",
-    allow_insecure_http=True,
-    scope=["openid", "email", "profile"],
+GOOGLE_DISCOVERY_URL = config(
+    "GOOGLE_DISCOVERY_URL",
+    cast=str,
+    default="https://accounts.google.com/.well-known/openid-configuration",
 )
+# Used when the discovery response carries no Cache-Control max-age.
+GOOGLE_DISCOVERY_TTL = config("GOOGLE_DISCOVERY_TTL", cast=float, default=3600.0)
+GOOGLE_HTTP_TIMEOUT = config("GOOGLE_HTTP_TIMEOUT", cast=float, default=10.0)
+GOOGLE_HTTP_MAX_CONNECTIONS = config("GOOGLE_HTTP_MAX_CONNECTIONS", cast=int, default=20)
+GOOGLE_HTTP_MAX_KEEPALIVE = config("GOOGLE_HTTP_MAX_KEEPALIVE", cast=int, default=10)
+GOOGLE_HTTP_KEEPALIVE_EXPIRY = config("GOOGLE_HTTP_KEEPALIVE_EXPIRY", cast=float, default=30.0)
+
+log = logging.getLogger(__name__)
 
 
 class GoogleAuthService(AuthService):
-    """Implementation of AuthService for Google SSO."""
+    """
+    Implementation of AuthService for Google SSO.
+
+    One pooled, keep-alive client serves every login for the app's lifetime,
+    and the discovery document is fetched once per its cache lifetime; only
+    the OAuth state is per login.
+    """
+
+    def __init__(
+        self,
+        discovery_url: str = GOOGLE_DISCOVERY_URL,
+        redirect_uri: str = "http://localhost:8989/auth/callback?provider=google",
+        outbound: OutboundClient | None = None,
+    ):
+        self.redirect_uri = redirect_uri
+        self.outbound = outbound or OutboundClient(
+            "google",
+            timeout=GOOGLE_HTTP_TIMEOUT,
+            max_connections=GOOGLE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=GOOGLE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=GOOGLE_HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.discovery = CachedDocument(
+            self.outbound, discovery_url, default_ttl=GOOGLE_DISCOVERY_TTL
+        )
+
+    def sso(self):
+        """A GoogleSSO for one login flow (its SDK is imported on first use)."""
+        from auth.google_sso import PooledGoogleSSO
+
+        return PooledGoogleSSO(
+            client_id=GOOGLE_CLIENT_ID,
+            client_secret=str(GOOGLE_CLIENT_SECRET),
+            redirect_uri=self.redirect_uri,
+            allow_insecure_http=True,
+            scope=["openid", "email", "profile"],
+            outbound=self.outbound,
+            discovery=self.discovery,
+        )
+
+    async def startup(self) -> None:
+        # Pre-warming Google pays for the SDK import, the discovery document
+        # and a pooled connection up front.
+        self.sso()
+        try:
+            await self.discovery.get()
+        except (httpx.HTTPError, ValueError) as e:
+            log.warning(f"Could not prefetch the Google discovery document: {e}")
+
+    async def shutdown(self) -> None:
+        await self.outbound.aclose()
+
+    async def check_ready(self) -> None:
+        # A fresh fetch both proves Google is reachable and renews the cache.
+        await self.discovery.refresh()
 
     def authenticate(self, token: str) -> User:
         """
@@ -45,11 +106,11 @@ class GoogleAuthService(AuthService):
         )
 
     async def auth_login_redirect(self) -> Response:
-        async with google_sso:
+        async with self.sso() as google_sso:
             return await google_sso.get_login_redirect()
 
     async def auth_callback(self, request: Request) -> Response:
-        async with google_sso:
+        async with self.sso() as google_sso:
             user = await google_sso.verify_and_process(request)
         if not user:
             return HTMLResponse(
@@ -57,26 +118,22 @@ class GoogleAuthService(AuthService):
             )
 
         # Create a complete session data payload from the user object
-        session_data = {
-            "provider": user.provider,
-            "id": user.id,
-            "email": user.email,
-            "display_name": user.display_name,
-            "picture": user.picture,
-        }
-        session_token = jwt.encode(session_data, str(SECRET_KEY), algorithm="HS256")
-
+        session_user = User(
+            provider=user.provider,
+            id=user.id,
+            email=user.email,
+            display_name=user.display_name,
+            picture=user.picture,
+        )
         response = HTMLResponse(
             content=f"<p>Authenticated as {user.display_name}. <a href='/api/v1/items/1'>Test API</a> | <a href='/auth/logout?provider=google'>Logout</a></p>"
         )
-        response.set_cookie(
-            key="access_token", value=f"Bearer {session_token}", httponly=True
-        )
+        start_session(response, session_user)
         return response
 
-    async def auth_logout(self) -> Response:
+    async def auth_logout(self, request: Request) -> Response:
         response = HTMLResponse(
             content="<p>You are logged out. <a href='/'>Home</a></p>"
         )
-        response.delete_cookie("access_token")
+        end_session(request, response)
         return response
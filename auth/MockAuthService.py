@@ -1,19 +1,13 @@
 # =================================================================
 # auth/MockAuthService.py
 # =================================================================
-import jwt
 from fastapi import Request, Response, HTTPException, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from starlette.config import Config
-from starlette.datastructures import Secret
 
 from auth.authService import AuthService
+from auth.sessions import end_session, start_session
 from models.user import User
 
-# Reuse the same secret key for consistency
-config = Config(".env")
-SECRET_KEY = config("SECRET_KEY", cast=Secret, default="A_RANDOM_SECRET_KEY")
-
 
 class MockAuthService(AuthService):
     """A mock authentication service for local testing."""
@@ -53,8 +47,6 @@ class MockAuthService(AuthService):
             "display_name": "Local Test User",
             "picture": "https://example.com/mockuser",
         }
-        session_token = jwt.encode(mock_user, str(SECRET_KEY), algorithm="HS256")
-
         response = HTMLResponse(
             content=f"""<p>Authenticated as {mock_user['display_name']}. 
             <a href='/'>Home</a> |
@@ -63,15 +55,13 @@ class MockAuthService(AuthService):
             | <a href='/api/v2/items/123'>Test API v2</a>            
             | <a href='/auth/logout?provider=mock'>Logout</a></p>"""
         )
-        response.set_cookie(
-            key="access_token", value=f"Bearer {session_token}", httponly=True
-        )
+        start_session(response, User(**mock_user))
         return response
 
-    async def auth_logout(self) -> Response:
-        """Logs the user out by clearing the session cookie."""
+    async def auth_logout(self, request: Request) -> Response:
+        """Logs the user out by ending the session and clearing its cookie."""
         response = HTMLResponse(
             content="<p>You are logged out. <a href='/'>Home</a></p>"
         )
-        response.delete_cookie("access_token")
+        end_session(request, response)
         return response
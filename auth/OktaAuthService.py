@@ -1,17 +1,109 @@
 # =================================================================
-# File: auth/OktaAuthService.py (Placeholder)
+# File: auth/OktaAuthService.py
 # =================================================================
-from fastapi import Request, Response
+import asyncio
+
+import jwt
+from fastapi import HTTPException, Request, Response, status
 from fastapi.responses import JSONResponse
+from jwt.exceptions import PyJWTError
+from pydantic import ValidationError
+from starlette.config import Config
+
 from auth.authService import AuthService
+from auth.jwks import JwksCache, SigningKeyNotFound
 from models.user import User
 
+config = Config(".env")
+OKTA_ISSUER = config("OKTA_ISSUER", cast=str, default="")
+OKTA_AUDIENCE = config("OKTA_AUDIENCE", cast=str, default="api://default")
+# Taken from the issuer's discovery document when empty.
+OKTA_JWKS_URI = config("OKTA_JWKS_URI", cast=str, default="")
+OKTA_JWKS_REFRESH_INTERVAL = config("OKTA_JWKS_REFRESH_INTERVAL", cast=float, default=3600.0)
+OKTA_UNKNOWN_KID_COOLDOWN = config("OKTA_UNKNOWN_KID_COOLDOWN", cast=float, default=30.0)
+OKTA_HTTP_TIMEOUT = config("OKTA_HTTP_TIMEOUT", cast=float, default=5.0)
+OKTA_CLOCK_SKEW = config("OKTA_CLOCK_SKEW", cast=float, default=30.0)
+
+ALGORITHMS = ["RS256"]
+
 
 class OktaAuthService(AuthService):
-    """Placeholder implementation for Okta SSO."""
+    """
+    Verifies Okta access tokens sent by API clients.
+
+    Tokens must be RS256-signed by one of the issuer's published keys, and
+    carry the configured issuer and audience. Keys come from a JwksCache, so
+    verifying a token with a known `kid` never waits on Okta.
+    The browser login flow is not implemented.
+    """
+
+    def __init__(
+        self,
+        issuer: str = OKTA_ISSUER,
+        audience: str = OKTA_AUDIENCE,
+        jwks: JwksCache | None = None,
+    ):
+        self.issuer = issuer.rstrip("/")
+        self.audience = audience
+        self.jwks = jwks or JwksCache(
+            issuer=self.issuer,
+            jwks_uri=OKTA_JWKS_URI or None,
+            refresh_interval=OKTA_JWKS_REFRESH_INTERVAL,
+            unknown_kid_cooldown=OKTA_UNKNOWN_KID_COOLDOWN,
+            timeout=OKTA_HTTP_TIMEOUT,
+        )
+
+    async def startup(self) -> None:
+        """Loads the signing keys and starts refreshing them periodically."""
+        if not self.issuer:
+            return
+        await asyncio.to_thread(self.jwks.refresh)
+        self.jwks.start()
+
+    async def shutdown(self) -> None:
+        self.jwks.stop()
+
+    async def check_ready(self) -> None:
+        if not self.issuer:
+            return
+        await asyncio.to_thread(self.jwks.refresh)
+        if self.jwks.last_error is not None:
+            raise RuntimeError(f"Could not load the signing keys: {self.jwks.last_error}")
 
     def authenticate(self, token: str) -> User:
-        raise NotImplementedError("Okta authentication not implemented.")
+        """Authenticates a user from an Okta access token ('Bearer ' optional)."""
+        if not self.issuer:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Okta authentication is not configured.",
+            )
+        token = token.removeprefix("Bearer ").strip()
+        try:
+            header = jwt.get_unverified_header(token)
+            key = self.jwks.get_key(header.get("kid"))
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=ALGORITHMS,
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=OKTA_CLOCK_SKEW,
+                options={"require": ["exp", "iss", "aud", "sub"]},
+            )
+            # Okta puts the login (an email by default) in `sub` and the
+            # user's ID in `uid`.
+            return User(
+                id=claims.get("uid", claims["sub"]),
+                email=claims.get("email", claims["sub"]),
+                provider="okta",
+                display_name=claims.get("name"),
+            )
+        except (PyJWTError, SigningKeyNotFound, ValidationError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Invalid Okta token: {e}",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
     async def auth_login_redirect(self) -> Response:
         return JSONResponse(
@@ -23,7 +115,7 @@ class OktaAuthService(AuthService):
             status_code=501, content={"detail": "Okta callback not implemented."}
         )
 
-    async def auth_logout(self) -> Response:
+    async def auth_logout(self, request: Request) -> Response:
         return JSONResponse(
             status_code=501, content={"detail": "Okta logout not implemented."}
         )
@@ -10,6 +10,25 @@ from models.user import User
 class AuthService:
     """Abstract Base Class for Authentication Services."""
 
+    async def startup(self) -> None:
+        """
+        Called once when the application starts.
+        Override to open long-lived resources such as HTTP clients.
+        """
+
+    async def shutdown(self) -> None:
+        """
+        Called once when the application stops.
+        Override to release anything opened in `startup`.
+        """
+
+    async def check_ready(self) -> None:
+        """
+        Probes what the provider depends on (its identity provider's
+        endpoints) and raises if it could not serve requests. Called by the
+        readiness checks in the background, never on the request path.
+        """
+
     def authenticate(self, token: str) -> User:
         """
         Authenticates a user based on a token.
@@ -29,8 +48,8 @@ class AuthService:
         """
         raise NotImplementedError
 
-    async def auth_logout(self) -> Response:
+    async def auth_logout(self, request: Request) -> Response:
         """
-        Handles user logout.
+        Handles user logout, ending the session the request carries.
         """
         raise NotImplementedError
@@ -0,0 +1,110 @@
+# =================================================================
+# File: auth/cache.py
+# =================================================================
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from models.user import User
+
+
+class PrincipalCache:
+    """
+    A bounded, TTL-aware LRU cache of already-validated users.
+
+    Entries are keyed by a digest of the session token, so the raw token is
+    never held in memory longer than the request that presented it. An entry
+    lives for at most `ttl` seconds and never past the token's own `exp`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._entries: OrderedDict[bytes, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        """Returns the cache key for a raw token."""
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> User | None:
+        """Returns the cached user for a token, or None on a miss."""
+        key = self.key_for(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def put(self, token: str, user: User, exp: float | None = None) -> None:
+        """
+        Caches a user for a token.
+        `exp` is the token's expiry as a Unix timestamp, if it has one.
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl
+        if exp is not None:
+            ttl = min(ttl, exp - self._wall_clock())
+            if ttl <= 0:
+                return
+        key = self.key_for(token)
+        expires_at = self._clock() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, token: str) -> None:
+        """Drops the entry for a token, if any."""
+        with self._lock:
+            self._entries.pop(self.key_for(token), None)
+
+    def clear(self) -> None:
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,58 @@
+# =================================================================
+# File: auth/claims.py
+# =================================================================
+from typing import Any
+
+from models.user import User
+
+# Bump when User's fields or their validation rules change, so that sessions
+# issued under the old rules are fully validated again on first sight.
+SESSION_CLAIMS_VERSION = 1
+
+
+def session_claims(user: User) -> dict[str, Any]:
+    """
+    The JWT claims for a session cookie we issue for `user`.
+    `user` is a validated model, so everything we sign has passed validation.
+    """
+    claims = user.model_dump(exclude_defaults=True)
+    claims["ver"] = SESSION_CLAIMS_VERSION
+    return claims
+
+
+class TrustedClaims:
+    """
+    Builds Users from session claims whose HS256 signature we have verified.
+
+    Only we can sign with SECRET_KEY, and we only sign validated Users (see
+    `session_claims`), so re-validating the claims on every request proves
+    nothing new. The first token seen for each claim-set version - the `ver`
+    claim together with the set of claim names - is fully validated; later
+    ones with the same version are built with `model_construct`, which skips
+    validation (email parsing included).
+
+    Only tokens carrying the current SESSION_CLAIMS_VERSION take that path.
+    Tokens without `ver` (issued before versioning) or with an older one were
+    signed under rules we no longer know, so they are always validated.
+
+    Use this only after signature verification of a token we issued.
+    Header credentials and third-party tokens go through normal validation.
+    """
+
+    def __init__(self, model: type[User] = User):
+        self.model = model
+        self._validated_versions: set[tuple] = set()
+
+    def user_from(self, payload: dict[str, Any]) -> User:
+        if payload.get("ver") != SESSION_CLAIMS_VERSION:
+            return self.model.model_validate(payload)
+        version = (payload.get("ver"), tuple(payload))
+        if version in self._validated_versions:
+            return self.model.model_construct(**payload)
+        user = self.model.model_validate(payload)
+        self._validated_versions.add(version)
+        return user
+
+    def clear(self) -> None:
+        """Forgets every version, so the next token of each is validated again."""
+        self._validated_versions.clear()
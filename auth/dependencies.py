@@ -1,15 +1,18 @@
 import jwt
 import logging
+import time
 from jwt.exceptions import PyJWTError
 from fastapi import Depends, HTTPException, status, Header, Query, Request
 from typing import Annotated
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
-from auth.GoogleAuthService import GoogleAuthService
-from auth.OktaAuthService import OktaAuthService
-from auth.MockAuthService import MockAuthService
 from auth.authService import AuthService
+from auth.cache import PrincipalCache
+from auth.claims import TrustedClaims
+from auth.registry import AuthProviderRegistry
+from auth.sessions import SESSION_COOKIE, session_store
+from metrics.app import auth_metrics
 from models.user import User
 
 # Get a logger instance for this module. The name will be 'some_module'
@@ -17,36 +20,60 @@ log = logging.getLogger(__name__)
 
 config = Config(".env")
 SECRET_KEY = config("SECRET_KEY", cast=Secret, default="A_RANDOM_SECRET_KEY")
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", cast=int, default=4096)
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", cast=float, default=300.0)
+# Providers to build during application startup instead of on first use.
+AUTH_PREWARM_PROVIDERS = config(
+    "AUTH_PREWARM_PROVIDERS", cast=CommaSeparatedStrings, default=""
+)
+
+# One long-lived instance per provider, shared by every request.
+# Provider modules are imported lazily the first time they are needed.
+auth_registry = AuthProviderRegistry()
+auth_registry.register("google", "auth.GoogleAuthService:GoogleAuthService")
+auth_registry.register("okta", "auth.OktaAuthService:OktaAuthService")
+auth_registry.register("mock", "auth.MockAuthService:MockAuthService")
+
+# Verified users keyed by a digest of their session cookie.
+principal_cache = PrincipalCache(
+    maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL
+)
+
+# Builds users from our own verified session claims without re-validating.
+trusted_claims = TrustedClaims(User)
+
+auth_metrics.watch_principal_cache(principal_cache)
+
+# Request state attribute holding the outcome of authenticating a request:
+# the User, or the HTTPException that rejected it.
+AUTH_RESULT_STATE = "auth_result"
 
 
 def get_auth_service_from_header(
     x_auth_provider: Annotated[str | None, Header()] = None,
 ) -> AuthService:
     """Dependency that provides an auth service based on the 'X-Auth-Provider' header."""
-    if x_auth_provider == "google":
-        return GoogleAuthService()
-    elif x_auth_provider == "okta":
-        return OktaAuthService()
-    elif x_auth_provider == "mock":
-        return MockAuthService()
-    else:
+    auth_service = auth_registry.get(x_auth_provider)
+    if auth_service is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="X-Auth-Provider header is missing or invalid. Use 'google', 'okta', or 'mock'.",
+            detail=f"X-Auth-Provider header is missing or invalid. Use {auth_registry.describe_choices()}.",
         )
+    return auth_service
 
 
 def get_auth_service_from_query(
-    provider: Annotated[str, Query(enum=["google", "okta", "mock"])],
+    provider: Annotated[str, Query(enum=auth_registry.names)],
 ) -> AuthService:
-    log.info(f"get_auth_service_from_query called with provider: {provider}")
     """Dependency that provides an auth service based on the 'provider' query parameter."""
-    if provider == "google":
-        return GoogleAuthService()
-    elif provider == "okta":
-        return OktaAuthService()
-    elif provider == "mock":
-        return MockAuthService()
+    log.info(f"get_auth_service_from_query called with provider: {provider}")
+    auth_service = auth_registry.get(provider)
+    if auth_service is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown provider '{provider}'. Use {auth_registry.describe_choices()}.",
+        )
+    return auth_service
 
 
 def get_current_active_user(
@@ -57,36 +84,84 @@ def get_current_active_user(
     """
     The primary dependency for protecting endpoints.
     It authenticates a user in one of two ways, in order of priority:
-    1. From the 'access_token' cookie (for browser-based sessions).
+    1. From the 'session_id' or 'access_token' cookie (for browser-based sessions).
     2. From the 'X-Auth-Provider' and 'Authorization' headers (for API clients).
+
+    A request is authenticated once: the outcome is kept on its state, so a
+    route reuses what middleware (e.g. the per-user rate limiter) resolved.
     """
-    # 1. Try to authenticate from the cookie
-    token = request.cookies.get("access_token")
-    if token:
-        if token.startswith("Bearer "):
-            token = token.split("Bearer ")[1]
-        try:
-            payload = jwt.decode(token, str(SECRET_KEY), algorithms=["HS256"])
-            # The payload from the JWT is used to create the User model
-            return User(**payload)
-        except PyJWTError:
-            # This will be caught by the final exception handler
-            pass
-
-    # 2. Fallback to authenticating from headers for API clients
-    if x_auth_provider and authorization:
+    result = getattr(request.state, AUTH_RESULT_STATE, None)
+    if result is None:
         try:
-            auth_service = get_auth_service_from_header(x_auth_provider)
-            return auth_service.authenticate(token=authorization)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"An unexpected error occurred during header authentication: {e}",
-            )
-
-    # 3. If neither method works, deny access.
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Not authenticated. No valid cookie or authorization headers found.",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+            result = _authenticate(request, x_auth_provider, authorization)
+        except HTTPException as e:
+            result = e
+        setattr(request.state, AUTH_RESULT_STATE, result)
+    if isinstance(result, HTTPException):
+        raise result
+    return result
+
+
+def _authenticate(
+    request: Request, x_auth_provider: str | None, authorization: str | None
+) -> User:
+    started = time.perf_counter()
+    method = "none"
+    user = None
+    try:
+        # 1. Try to authenticate from a server-side session, then from the cookie JWT
+        session_id = request.cookies.get(SESSION_COOKIE)
+        if session_id:
+            method = "session"
+            user = session_store.get(session_id)
+            if user is not None:
+                return user
+
+        token = request.cookies.get("access_token")
+        if token:
+            method = "cookie"
+            if token.startswith("Bearer "):
+                token = token.split("Bearer ")[1]
+            user = principal_cache.get(token)
+            if user is not None:
+                return user
+            try:
+                payload = jwt.decode(token, str(SECRET_KEY), algorithms=["HS256"])
+                # The signature proves we issued these claims from a validated User
+                user = trusted_claims.user_from(payload)
+                principal_cache.put(token, user, exp=payload.get("exp"))
+                return user
+            except PyJWTError as e:
+                # This will be caught by the final exception handler
+                auth_metrics.jwt_failure(e)
+
+        # 2. Fallback to authenticating from headers for API clients
+        if x_auth_provider and authorization:
+            method = "header"
+            try:
+                auth_service = get_auth_service_from_header(x_auth_provider)
+                user = auth_service.authenticate(token=authorization)
+                return user
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"An unexpected error occurred during header authentication: {e}",
+                )
+
+        # 3. If neither method works, deny access.
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated. No valid cookie or authorization headers found.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    finally:
+        if user is not None:
+            provider = user.provider
+        elif method == "header" and x_auth_provider in auth_registry.names:
+            provider = x_auth_provider
+        else:
+            # Never a client-chosen value, so the label set stays bounded
+            provider = "unknown"
+        auth_metrics.record(method, provider, user is not None, time.perf_counter() - started)
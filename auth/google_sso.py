@@ -0,0 +1,132 @@
+# =================================================================
+# File: auth/google_sso.py
+# =================================================================
+import hashlib
+import inspect
+import json
+import logging
+from importlib.metadata import version
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import jwt
+from fastapi import Request
+from fastapi_sso.sso.base import SSOBase, SSOLoginError, requires_async_context
+from fastapi_sso.sso.google import GoogleSSO
+
+from auth.outbound import CachedDocument, OutboundClient
+
+log = logging.getLogger(__name__)
+
+# fastapi_sso 0.23 has no hook for the HTTP client process_login uses, so
+# PooledGoogleSSO.process_login mirrors it. This is the digest of the
+# mirrored source; any other fastapi_sso gets the library's own method.
+MIRRORED_PROCESS_LOGIN = "126b4f26bcea27f7138f20382da7c4e29fe00341d2cf83551c01b25682e3d4c2"
+
+
+def process_login_digest() -> str:
+    return hashlib.sha256(inspect.getsource(SSOBase.process_login).encode()).hexdigest()
+
+
+MIRRORS_LIBRARY = process_login_digest() == MIRRORED_PROCESS_LOGIN
+if not MIRRORS_LIBRARY:
+    log.warning(
+        f"fastapi_sso {version('fastapi-sso')} changed SSOBase.process_login; Google logins "
+        f"use its own HTTP client per login until auth/google_sso.py is updated."
+    )
+
+
+class PooledGoogleSSO(GoogleSSO):
+    """
+    GoogleSSO that talks to Google through a shared OutboundClient and reads
+    the discovery document from a shared CachedDocument.
+
+    fastapi_sso opens (and closes) a new httpx client for the discovery
+    document and again for every login. This subclass is cheap to create, so
+    GoogleAuthService makes one per login flow (keeping the per-flow OAuth
+    state apart) while the connections and the discovery document are shared.
+    """
+
+    def __init__(self, *args, outbound: OutboundClient, discovery: CachedDocument, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.outbound = outbound
+        self.discovery = discovery
+
+    async def get_discovery_document(self) -> dict:
+        return await self.discovery.get()
+
+    @requires_async_context
+    async def process_login(
+        self,
+        code: str,
+        request: Request,
+        *,
+        params: dict[str, Any] | None = None,
+        additional_headers: dict[str, Any] | None = None,
+        redirect_uri: str | None = None,
+        pkce_code_verifier: str | None = None,
+        convert_response: bool = True,
+    ):
+        """
+        SSOBase.process_login (fastapi_sso 0.23) on the shared client. The
+        access token is sent as a per-request header rather than set on the
+        client, so it cannot leak into other logins' requests.
+        """
+        if not MIRRORS_LIBRARY:
+            return await super().process_login(
+                code,
+                request,
+                params=params,
+                additional_headers=additional_headers,
+                redirect_uri=redirect_uri,
+                pkce_code_verifier=pkce_code_verifier,
+                convert_response=convert_response,
+            )
+        params = {**(params or {}), **self._extra_query_params}
+        additional_headers = {**(additional_headers or {}), **(self.additional_headers or {})}
+
+        url = request.url
+        current_url = str(url)
+        if not self.allow_insecure_http and url.scheme != "https":
+            current_url = current_url.replace("http://", "https://")
+        current_path = f"{url.scheme}://{url.netloc}{url.path}"
+        has_code_in_query = "code" in parse_qs(urlsplit(current_url).query)
+
+        if pkce_code_verifier:
+            params["code_verifier"] = pkce_code_verifier
+
+        token_url, headers, body = self.oauth_client.prepare_token_request(
+            await self.token_endpoint,
+            authorization_response=current_url if has_code_in_query else None,
+            redirect_url=redirect_uri or self.redirect_uri or current_path,
+            code=code,
+            **params,
+        )
+        if token_url is None:
+            return None
+        headers.update(additional_headers)
+        auth = httpx.BasicAuth(self.client_id, self.client_secret) if self.use_basic_auth else None
+
+        session = self.outbound.client
+        if auth is None:
+            response = await session.post(token_url, headers=headers, content=body)
+        else:
+            response = await session.post(token_url, headers=headers, content=body, auth=auth)
+        content = response.json()
+        self._refresh_token = content.get("refresh_token")
+        self._id_token = content.get("id_token")
+        self.oauth_client.parse_request_body_response(json.dumps(content))
+
+        uri, headers, _ = self.oauth_client.add_token(await self.userinfo_endpoint)
+        headers.update(additional_headers)
+        response = await session.get(uri, headers=headers)
+        content = await self.parse_userinfo_response(response, session)
+        if not convert_response:
+            return content
+        if self.use_id_token_for_user_info:
+            if not self._id_token:
+                raise SSOLoginError(401, f"Provider {self.provider!r} did not return id token.")
+            claims = jwt.decode(self._id_token, options={"verify_signature": False})
+            return await self.openid_from_token(claims, session)
+        return await self.openid_from_response(content, session)
@@ -0,0 +1,170 @@
+# =================================================================
+# File: auth/jwks.py
+# =================================================================
+import json
+import logging
+import threading
+import time
+import urllib.request
+from typing import Callable
+
+from jwt import PyJWK, PyJWKSet
+from jwt.exceptions import PyJWKSetError
+
+log = logging.getLogger(__name__)
+
+
+class SigningKeyNotFound(Exception):
+    """No key with the token's `kid` is published (or could be fetched)."""
+
+
+def fetch_json(url: str, timeout: float) -> dict:
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.load(response)
+
+
+class JwksCache:
+    """
+    Signing keys from a JWKS document, indexed by `kid`.
+
+    Lookups of a known `kid` are a dict read and never wait on the network:
+    when the keys are older than `refresh_interval` the lookup still returns
+    the cached key and starts a refresh in a background thread. Only a `kid`
+    that is not in the cache (e.g. after the issuer rotated its keys) fetches
+    on the request path, and then at most once per `unknown_kid_cooldown`, so
+    tokens with made-up kids cannot turn into a stream of fetches.
+
+    At most one fetch runs at a time; callers that need the result of a
+    running fetch wait for it instead of starting another. A failed fetch
+    keeps the previous keys, and background retries wait out the cooldown too.
+
+    The JWKS URL is taken from the issuer's OpenID discovery document unless
+    `jwks_uri` is given.
+    """
+
+    def __init__(
+        self,
+        issuer: str = "",
+        jwks_uri: str | None = None,
+        refresh_interval: float = 3600.0,
+        unknown_kid_cooldown: float = 30.0,
+        timeout: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        fetch: Callable[[str, float], dict] = fetch_json,
+    ):
+        self.issuer = issuer.rstrip("/")
+        self.jwks_uri = jwks_uri
+        self.refresh_interval = refresh_interval
+        self.unknown_kid_cooldown = unknown_kid_cooldown
+        self.timeout = timeout
+        self._clock = clock
+        self._fetch = fetch
+        self._keys: dict[str, PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._attempted_at = float("-inf")
+        self._last_unknown_refresh = float("-inf")
+        self._refresh_lock = threading.Lock()
+        self._unknown_kid_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.fetches = 0
+        self.failures = 0
+        # Why the most recent fetch failed, or None if it succeeded.
+        self.last_error: str | None = None
+
+    @property
+    def kids(self) -> frozenset[str]:
+        return frozenset(self._keys)
+
+    def get_key(self, kid: str | None) -> PyJWK:
+        """Returns the key for `kid`, raising SigningKeyNotFound if there is none."""
+        key = self._keys.get(kid)
+        if key is not None:
+            if self._is_stale() and self._clock() - self._attempted_at >= self.unknown_kid_cooldown:
+                self.refresh_in_background()
+            return key
+
+        # Unknown kids queue here, so callers that arrive while a fetch for
+        # one is running wait for its result instead of hitting the cooldown.
+        with self._unknown_kid_lock:
+            key = self._keys.get(kid)
+            now = self._clock()
+            if key is None and now - self._last_unknown_refresh >= self.unknown_kid_cooldown:
+                self._last_unknown_refresh = now
+                self.refresh()
+                key = self._keys.get(kid)
+        if key is None:
+            raise SigningKeyNotFound(f"Unknown signing key {kid!r}.")
+        return key
+
+    def _is_stale(self) -> bool:
+        return (
+            self._fetched_at is None
+            or self._clock() - self._fetched_at >= self.refresh_interval
+        )
+
+    def refresh(self) -> None:
+        """
+        Fetches the JWKS now. If a fetch is already running, waits for it to
+        finish instead of starting a second one.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            with self._refresh_lock:
+                return
+        try:
+            self._refresh_locked()
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_in_background(self) -> None:
+        """Starts a refresh in a daemon thread, unless one is running already."""
+        if self._refresh_lock.locked():
+            return
+
+        def refresh_if_stale():
+            with self._refresh_lock:
+                if self._is_stale():
+                    self._refresh_locked()
+
+        threading.Thread(target=refresh_if_stale, name="jwks-refresh", daemon=True).start()
+
+    def _refresh_locked(self) -> None:
+        self.fetches += 1
+        self._attempted_at = self._clock()
+        try:
+            if self.jwks_uri is None:
+                discovery = self._fetch(
+                    f"{self.issuer}/.well-known/openid-configuration", self.timeout
+                )
+                self.jwks_uri = discovery["jwks_uri"]
+            jwk_set = PyJWKSet.from_dict(self._fetch(self.jwks_uri, self.timeout))
+        except (OSError, ValueError, KeyError, PyJWKSetError) as e:
+            self.failures += 1
+            self.last_error = str(e) or type(e).__name__
+            log.warning(f"Could not refresh signing keys from {self.jwks_uri or self.issuer}: {e}")
+            return
+        # Swapped in whole, so lookups never see a half-updated index
+        self._keys = {key.key_id: key for key in jwk_set.keys if key.key_id}
+        self._fetched_at = self._clock()
+        self.last_error = None
+        log.info(f"Loaded {len(self._keys)} signing key(s) from {self.jwks_uri}")
+
+    def start(self) -> None:
+        """Refreshes every `refresh_interval` seconds in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.refresh_interval):
+                self.refresh()
+
+        self._thread = threading.Thread(target=run, name="jwks-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
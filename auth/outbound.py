@@ -0,0 +1,194 @@
+# =================================================================
+# File: auth/outbound.py
+# =================================================================
+import asyncio
+import logging
+import re
+import time
+import weakref
+from typing import Any, Callable
+
+import httpx
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+log = logging.getLogger(__name__)
+
+meter = metrics.get_meter(__name__)
+outbound_duration = meter.create_histogram(
+    name="outbound.request.duration",
+    description="Time from sending an identity provider request to its response headers",
+    unit="s",
+)
+
+# Every live OutboundClient, for the pool gauges below.
+_clients: "weakref.WeakSet[OutboundClient]" = weakref.WeakSet()
+
+
+def _observe_pools(options: CallbackOptions):
+    for client in list(_clients):
+        stats = client.pool_stats()
+        for state in ("active", "idle"):
+            yield Observation(stats[state], {"client": client.name, "state": state})
+
+
+meter.create_observable_gauge(
+    name="outbound.pool.connections",
+    callbacks=[_observe_pools],
+    description="Open connections in each outbound pool, by state",
+    unit="1",
+)
+
+
+class OutboundClient:
+    """
+    One pooled, keep-alive httpx.AsyncClient for an identity provider.
+
+    The client is created on first use and kept until `aclose`, so logins
+    reuse established (TLS) connections instead of opening new ones. The pool
+    and every request's timeouts are bounded. Each response is timed to its
+    headers and recorded in the `outbound.request.duration` histogram and in
+    `stats()`; open connections are reported by `outbound.pool.connections`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.name = name
+        self.timeout = httpx.Timeout(timeout, connect=min(timeout, 5.0))
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        _clients.add(self)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                transport=self._transport,
+                event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            )
+        return self._client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        request.extensions["outbound_started"] = time.perf_counter()
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        request = response.request
+        elapsed = time.perf_counter() - request.extensions["outbound_started"]
+        self.requests += 1
+        self.total_seconds += elapsed
+        if response.status_code >= 400:
+            self.errors += 1
+        outbound_duration.record(
+            elapsed,
+            {
+                "client": self.name,
+                "host": request.url.host,
+                "method": request.method,
+                "status": response.status_code,
+            },
+        )
+
+    def pool_stats(self) -> dict[str, int]:
+        """Open connections in the pool, split into active and idle."""
+        # httpx does not expose its pool; httpcore's pool lists its connections.
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {"active": len(connections) - idle, "idle": idle}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_seconds": self.total_seconds / self.requests if self.requests else 0.0,
+            **self.pool_stats(),
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def max_age(headers: httpx.Headers) -> float | None:
+    """Freshness lifetime from Cache-Control (max-age minus Age), if cacheable."""
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match is None:
+        return None
+    age = headers.get("age", "0")
+    return max(0.0, int(match.group(1)) - (int(age) if age.isdigit() else 0))
+
+
+class CachedDocument:
+    """
+    A JSON document (such as an OpenID discovery document) fetched through an
+    OutboundClient and reused for as long as its Cache-Control allows, or
+    `default_ttl` seconds when the response does not say.
+
+    Concurrent callers share one fetch. If a refresh fails and an older copy
+    exists, the older copy is served and the failure logged.
+    """
+
+    def __init__(
+        self,
+        outbound: OutboundClient,
+        url: str,
+        default_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.outbound = outbound
+        self.url = url
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._document: dict | None = None
+        self._expires_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self.fetches = 0
+
+    async def get(self) -> dict:
+        if self._document is not None and self._clock() < self._expires_at:
+            return self._document
+        async with self._lock:
+            if self._document is not None and self._clock() < self._expires_at:
+                return self._document
+            try:
+                await self._fetch()
+            except (httpx.HTTPError, ValueError) as e:
+                if self._document is None:
+                    raise
+                log.warning(f"Could not refresh {self.url}, serving the cached copy: {e}")
+            return self._document
+
+    async def refresh(self) -> dict:
+        """Fetches the document now, raising if that fails (the cached copy is kept)."""
+        async with self._lock:
+            await self._fetch()
+            return self._document
+
+    async def _fetch(self) -> None:
+        self.fetches += 1
+        response = await self.outbound.client.get(self.url)
+        response.raise_for_status()
+        self._document = response.json()
+        ttl = max_age(response.headers)
+        self._expires_at = self._clock() + (self.default_ttl if ttl is None else ttl)
@@ -0,0 +1,106 @@
+# =================================================================
+# File: auth/registry.py
+# =================================================================
+import importlib
+import logging
+import threading
+from typing import Callable, Iterable
+
+from auth.authService import AuthService
+
+log = logging.getLogger(__name__)
+
+# A provider factory is either a callable or a lazy "module:attribute" path.
+ProviderFactory = Callable[[], AuthService] | str
+
+
+class AuthProviderRegistry:
+    """
+    Holds one long-lived AuthService instance per provider name.
+
+    Providers are registered with a zero-argument factory and built once;
+    every request afterwards is a plain dict lookup. Because instances are
+    reused, a provider may keep HTTP clients, key sets or caches on `self`
+    and set them up / tear them down in its `startup` / `shutdown` hooks.
+
+    A factory given as a "module:attribute" string is imported only when
+    that provider is first needed, so unused providers (and the SDKs they
+    depend on) cost nothing at import time. Call `startup` with a list of
+    names to pre-warm selected providers before the first request.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, ProviderFactory] = {}
+        self._providers: dict[str, AuthService] = {}
+        self._started: set[str] = set()
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: ProviderFactory) -> None:
+        """Registers a provider factory under the given name."""
+        if name in self._factories:
+            raise ValueError(f"Auth provider '{name}' is already registered.")
+        self._factories[name] = factory
+
+    @property
+    def names(self) -> list[str]:
+        """The registered provider names, in registration order."""
+        return list(self._factories)
+
+    def describe_choices(self) -> str:
+        """Formats the provider names for error messages, e.g. "'a', 'b', or 'c'"."""
+        quoted = [f"'{name}'" for name in self._factories]
+        if len(quoted) <= 2:
+            return " or ".join(quoted)
+        return ", ".join(quoted[:-1]) + f", or {quoted[-1]}"
+
+    def is_built(self, name: str) -> bool:
+        """Whether the provider has been instantiated yet."""
+        return name in self._providers
+
+    def get(self, name: str | None) -> AuthService | None:
+        """Returns the provider instance for a name, or None if unknown."""
+        provider = self._providers.get(name)
+        if provider is None and name in self._factories:
+            provider = self._build(name)
+        return provider
+
+    def build(self, names: Iterable[str] | None = None) -> None:
+        """Builds the named providers (default: all) that are not built yet."""
+        for name in self._factories if names is None else names:
+            if name not in self._factories:
+                raise KeyError(f"Auth provider '{name}' is not registered.")
+            if name not in self._providers:
+                self._build(name)
+
+    def _build(self, name: str) -> AuthService:
+        # Requests resolve providers from worker threads; make sure two of
+        # them racing on a cold provider still end up sharing one instance.
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None:
+                provider = self._resolve(self._factories[name])()
+                self._providers[name] = provider
+                log.info(f"Auth provider '{name}' initialised.")
+        return provider
+
+    @staticmethod
+    def _resolve(factory: ProviderFactory) -> Callable[[], AuthService]:
+        if not isinstance(factory, str):
+            return factory
+        module_name, _, attribute = factory.partition(":")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    async def startup(self, names: Iterable[str] | None = None) -> None:
+        """Builds the named providers (default: all) and runs their startup hooks."""
+        names = self.names if names is None else list(names)
+        self.build(names)
+        for name in names:
+            if name not in self._started:
+                await self._providers[name].startup()
+                self._started.add(name)
+
+    async def shutdown(self) -> None:
+        """Runs the shutdown hook of every provider that has been built."""
+        for provider in list(self._providers.values()):
+            await provider.shutdown()
+        self._started.clear()
@@ -0,0 +1,174 @@
+# =================================================================
+# File: auth/sessions.py
+# =================================================================
+"""
+Signing users in: a signed JWT cookie (SESSION_MODE=jwt) or an opaque
+session ID whose profile stays server-side (SESSION_MODE=server).
+
+The default server-side store, InMemorySessionStore, lives in one process's
+memory. Under `python -m app.server` the launcher refuses it with several
+workers. On AWS Lambda each execution environment is its own process with
+its own store, and API Gateway spreads requests across them, so a session
+created in one would be unknown to the rest: `check_lambda_sessions` (run
+by main.py during the init phase) refuses that combination. Use
+SESSION_MODE=jwt there, or a shared SessionStore (e.g. Redis).
+"""
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import jwt
+from fastapi import Request, Response
+from starlette.config import Config
+from starlette.datastructures import Secret
+
+from auth.claims import session_claims
+from models.user import User
+
+config = Config(".env")
+SECRET_KEY = config("SECRET_KEY", cast=Secret, default="A_RANDOM_SECRET_KEY")
+# jwt: the profile is signed into the access_token cookie (the default).
+# server: the cookie carries an opaque session ID; the profile stays here.
+SESSION_MODE = config("SESSION_MODE", cast=str, default="jwt")
+SESSION_TTL = config("SESSION_TTL", cast=float, default=8 * 3600.0)
+SESSION_STORE_SIZE = config("SESSION_STORE_SIZE", cast=int, default=100_000)
+# Set by the Lambda runtime in every execution environment.
+AWS_LAMBDA_FUNCTION_NAME = config("AWS_LAMBDA_FUNCTION_NAME", cast=str, default="")
+
+SESSION_COOKIE = "session_id"
+ACCESS_TOKEN_COOKIE = "access_token"
+
+
+class SessionStore:
+    """
+    Interface for server-side sessions.
+
+    Session IDs are opaque, unguessable strings handed to the browser; a
+    store maps them to the signed-in user until they expire or are deleted.
+    The in-memory store serves one process; a shared backend (e.g. Redis)
+    can implement the same interface for multi-worker deployments.
+    """
+
+    def create(self, user: User) -> str:
+        """Starts a session for `user` and returns its ID."""
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> User | None:
+        """Returns the session's user, or None if it is unknown or expired."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        """Ends a session immediately."""
+        raise NotImplementedError
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    A bounded LRU of sessions, each living for `ttl` seconds.
+
+    Like PrincipalCache, entries are keyed by a digest of the session ID, so
+    the IDs themselves are never held server-side. When full, the least
+    recently used session is dropped (its user has to sign in again).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 100_000,
+        ttl: float = 8 * 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[float, User]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(session_id: str) -> bytes:
+        return hashlib.blake2b(session_id.encode(), digest_size=16).digest()
+
+    def create(self, user: User) -> str:
+        session_id = secrets.token_urlsafe(24)
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._entries[self.key_for(session_id)] = (expires_at, user)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return session_id
+
+    def get(self, session_id: str) -> User | None:
+        key = self.key_for(session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(self.key_for(session_id), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+session_store: SessionStore = InMemorySessionStore(
+    maxsize=SESSION_STORE_SIZE, ttl=SESSION_TTL
+)
+
+
+def check_lambda_sessions() -> None:
+    """
+    Raises RuntimeError on Lambda when SESSION_MODE=server would keep
+    sessions in the memory of each execution environment.
+    """
+    if (
+        AWS_LAMBDA_FUNCTION_NAME
+        and SESSION_MODE == "server"
+        and isinstance(session_store, InMemorySessionStore)
+    ):
+        raise RuntimeError(
+            f"SESSION_MODE=server keeps sessions in each Lambda execution environment's "
+            f"memory, so {AWS_LAMBDA_FUNCTION_NAME} would reject sessions started in "
+            f"another one. Use SESSION_MODE=jwt or give the app a shared SessionStore."
+        )
+
+
+def start_session(response: Response, user: User) -> None:
+    """Signs `user` in on `response`, according to SESSION_MODE."""
+    if SESSION_MODE == "server":
+        response.set_cookie(
+            key=SESSION_COOKIE,
+            value=session_store.create(user),
+            max_age=int(SESSION_TTL),
+            httponly=True,
+            samesite="lax",
+        )
+        return
+    session_token = jwt.encode(session_claims(user), str(SECRET_KEY), algorithm="HS256")
+    response.set_cookie(
+        key=ACCESS_TOKEN_COOKIE, value=f"Bearer {session_token}", httponly=True
+    )
+
+
+def end_session(request: Request, response: Response) -> None:
+    """
+    Signs the user out: a server-side session is deleted at once, so its ID
+    stops working even if the browser (or anyone else) replays it. Both
+    cookies are cleared.
+    """
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if session_id:
+        session_store.delete(session_id)
+    response.delete_cookie(SESSION_COOKIE)
+    response.delete_cookie(ACCESS_TOKEN_COOKIE)
@@ -0,0 +1,132 @@
+# auth/test_cache.py
+
+import time
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from .cache import PrincipalCache
+from .dependencies import SECRET_KEY, principal_cache
+from app.main import app
+from models.user import User
+
+
+fake_user = User(
+    id="mockuser123",
+    provider="mock",
+    email="test@mock.com",
+    display_name="Local Test User",
+)
+
+
+class FakeClock:
+    """A controllable stand-in for time.monotonic / time.time."""
+
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock: FakeClock):
+    return PrincipalCache(maxsize=2, ttl=60, clock=clock, wall_clock=clock)
+
+
+# --- Unit Tests for PrincipalCache ---
+
+
+def test_hit_and_miss_counters(cache: PrincipalCache):
+    assert cache.get("token-a") is None
+    cache.put("token-a", fake_user)
+
+    assert cache.get("token-a") is fake_user
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_lru_eviction(cache: PrincipalCache):
+    cache.put("token-a", fake_user)
+    cache.put("token-b", fake_user)
+    # Touch 'a' so that 'b' becomes the least recently used entry
+    cache.get("token-a")
+    cache.put("token-c", fake_user)
+
+    assert cache.get("token-b") is None
+    assert cache.get("token-a") is fake_user
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entry_expires_after_ttl(cache: PrincipalCache, clock: FakeClock):
+    cache.put("token-a", fake_user)
+    clock.now += 61
+
+    assert cache.get("token-a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_entry_never_outlives_token_exp(cache: PrincipalCache, clock: FakeClock):
+    """The token's 'exp' wins when it is sooner than the cache TTL."""
+    cache.put("token-a", fake_user, exp=clock.now + 5)
+    clock.now += 6
+
+    assert cache.get("token-a") is None
+
+
+def test_expired_token_is_not_cached(cache: PrincipalCache, clock: FakeClock):
+    cache.put("token-a", fake_user, exp=clock.now - 1)
+    assert len(cache) == 0
+
+
+def test_keys_are_digests_not_raw_tokens(cache: PrincipalCache):
+    cache.put("token-a", fake_user)
+    assert "token-a" not in cache._entries
+    assert PrincipalCache.key_for("token-a") in cache._entries
+
+
+# --- Integration Tests through get_current_active_user ---
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides = {}
+    principal_cache.clear()
+    with TestClient(app) as c:
+        yield c
+    principal_cache.clear()
+
+
+def test_cookie_session_is_served_from_cache(client: TestClient):
+    token = jwt.encode(
+        {**fake_user.model_dump(), "exp": int(time.time()) + 3600},
+        str(SECRET_KEY),
+        algorithm="HS256",
+    )
+    client.cookies.set("access_token", f"Bearer {token}")
+
+    first = client.get("/users/me")
+    second = client.get("/users/me")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["email"] == fake_user.email
+    stats = principal_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_invalid_cookie_is_not_cached(client: TestClient):
+    client.cookies.set("access_token", "Bearer not-a-jwt")
+
+    response = client.get("/users/me")
+
+    assert response.status_code == 401
+    assert principal_cache.stats()["size"] == 0
@@ -0,0 +1,84 @@
+# auth/test_claims.py
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from . import dependencies
+from .claims import SESSION_CLAIMS_VERSION, TrustedClaims, session_claims
+from .dependencies import SECRET_KEY, principal_cache
+from app.main import app
+from models.user import User
+
+claims = {"id": "u1", "provider": "mock", "email": "u1@mock.com", "ver": 1, "exp": 4102444800}
+
+
+def test_session_claims_are_versioned():
+    user = User(id="u1", provider="mock", email="u1@mock.com")
+
+    assert session_claims(user) == {
+        "id": "u1",
+        "provider": "mock",
+        "email": "u1@mock.com",
+        "ver": SESSION_CLAIMS_VERSION,
+    }
+
+
+def test_first_sight_is_validated():
+    trusted = TrustedClaims()
+
+    with pytest.raises(ValidationError):
+        trusted.user_from({**claims, "email": "not-an-email"})
+
+
+def test_later_claims_of_a_seen_version_are_constructed():
+    trusted = TrustedClaims()
+    first = trusted.user_from(claims)
+
+    # Validation is skipped: the same claim-set version was validated already
+    second = trusted.user_from({**claims, "id": "u2", "email": "not-validated"})
+
+    assert first == User(id="u1", provider="mock", email="u1@mock.com")
+    assert second.id == "u2" and second.email == "not-validated"
+    assert not hasattr(second, "exp")
+
+
+@pytest.mark.parametrize(
+    "changed", [{**claims, "ver": 2}, {**claims, "display_name": "U1"}], ids=["version", "claims"]
+)
+def test_new_versions_are_validated(changed):
+    trusted = TrustedClaims()
+    trusted.user_from(claims)
+
+    with pytest.raises(ValidationError):
+        trusted.user_from({**changed, "email": "not-an-email"})
+
+
+def test_legacy_claims_are_always_validated():
+    trusted = TrustedClaims()
+    # Issued before the `ver` claim, when `disabled` could be signed as a string
+    legacy = {"id": "u1", "provider": "mock", "email": "u1@mock.com", "disabled": "false"}
+
+    first = trusted.user_from(legacy)
+    second = trusted.user_from(legacy)
+
+    assert first.disabled is False and second.disabled is False
+    assert trusted._validated_versions == set()
+    with pytest.raises(ValidationError):
+        trusted.user_from({**legacy, "id": 1})
+
+
+def test_cookie_session_uses_trusted_claims(monkeypatch):
+    trusted = TrustedClaims()
+    monkeypatch.setattr(dependencies, "trusted_claims", trusted)
+    principal_cache.clear()
+    token = jwt.encode(claims, str(SECRET_KEY), algorithm="HS256")
+
+    with TestClient(app) as client:
+        client.cookies.set("access_token", f'"Bearer {token}"')
+        response = client.get("/users/me")
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "u1@mock.com"
+    assert trusted._validated_versions == {(1, tuple(claims))}
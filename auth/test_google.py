@@ -0,0 +1,275 @@
+# auth/test_google.py
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from . import google_sso
+from .GoogleAuthService import GoogleAuthService
+from .outbound import CachedDocument, OutboundClient, max_age
+
+
+class StubGoogle:
+    """A local stand-in for Google's discovery, token and userinfo endpoints."""
+
+    def __init__(self, cache_control: str = "public, max-age=3600"):
+        self.cache_control = cache_control
+        self.requests = []
+        self.connections = set()
+        self.userinfo_auth = []
+        google = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                google.record(self)
+                path = urlsplit(self.path).path
+                if path == "/.well-known/openid-configuration":
+                    self.reply(
+                        {
+                            "issuer": google.url,
+                            "authorization_endpoint": f"{google.url}/o/oauth2/v2/auth",
+                            "token_endpoint": f"{google.url}/token",
+                            "userinfo_endpoint": f"{google.url}/v1/userinfo",
+                        },
+                        {"Cache-Control": google.cache_control},
+                    )
+                elif path == "/v1/userinfo":
+                    google.userinfo_auth.append(self.headers.get("Authorization"))
+                    self.reply(
+                        {
+                            "sub": "1234",
+                            "email": "jane@example.com",
+                            "email_verified": True,
+                            "name": "Jane Doe",
+                        }
+                    )
+                else:
+                    self.reply({"error": "not_found"}, status=404)
+
+            def do_POST(self):
+                google.record(self)
+                body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+                code = parse_qs(body)["code"][0]
+                self.reply({"access_token": f"token-{code}", "token_type": "Bearer", "expires_in": 3600})
+
+            def reply(self, body: dict, headers: dict | None = None, status: int = 200):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def record(self, handler: BaseHTTPRequestHandler) -> None:
+        self.requests.append(urlsplit(handler.path).path)
+        self.connections.add(handler.client_address)
+
+    @property
+    def discovery_fetches(self) -> int:
+        return self.requests.count("/.well-known/openid-configuration")
+
+
+@pytest.fixture
+def google():
+    stub = StubGoogle()
+    yield stub
+    stub.server.shutdown()
+
+
+def make_client(service: GoogleAuthService) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/auth/login")
+    async def login():
+        return await service.auth_login_redirect()
+
+    @app.get("/auth/callback")
+    async def callback(request: Request):
+        return await service.auth_callback(request)
+
+    return TestClient(app)
+
+
+def sign_in(client: TestClient, code: str) -> httpx.Response:
+    redirect = client.get("/auth/login", follow_redirects=False)
+    state = parse_qs(urlsplit(redirect.headers["location"]).query)["state"][0]
+    return client.get("/auth/callback", params={"code": code, "state": state})
+
+
+def test_logins_share_connections_and_discovery(google):
+    service = GoogleAuthService(discovery_url=f"{google.url}/.well-known/openid-configuration")
+
+    with make_client(service) as client:
+        responses = [sign_in(client, f"code{i}") for i in range(5)]
+        stats = service.outbound.stats()
+
+    assert all(r.status_code == 200 for r in responses)
+    assert "Authenticated as Jane Doe" in responses[0].text
+    assert google.discovery_fetches == 1
+    assert google.requests.count("/token") == 5
+    assert len(google.connections) == 1
+    assert stats["requests"] == 11
+    assert stats["errors"] == 0
+    assert stats["idle"] == 1
+
+
+def test_access_token_is_sent_per_request(google):
+    service = GoogleAuthService(discovery_url=f"{google.url}/.well-known/openid-configuration")
+
+    with make_client(service) as client:
+        sign_in(client, "first")
+        sign_in(client, "second")
+
+    assert google.userinfo_auth == ["Bearer token-first", "Bearer token-second"]
+    assert "authorization" not in service.outbound.client.headers
+
+
+def test_process_login_mirrors_the_installed_fastapi_sso():
+    # Fails after a fastapi_sso upgrade: compare SSOBase.process_login with
+    # PooledGoogleSSO.process_login, then update MIRRORED_PROCESS_LOGIN.
+    assert google_sso.process_login_digest() == google_sso.MIRRORED_PROCESS_LOGIN
+
+
+def test_other_fastapi_sso_releases_log_in_with_the_library(google, monkeypatch):
+    monkeypatch.setattr(google_sso, "MIRRORS_LIBRARY", False)
+    service = GoogleAuthService(discovery_url=f"{google.url}/.well-known/openid-configuration")
+
+    with make_client(service) as client:
+        response = sign_in(client, "code")
+
+    assert "Authenticated as Jane Doe" in response.text
+    assert google.requests.count("/token") == 1
+    assert service.outbound.stats()["requests"] == 1  # the discovery document only
+
+
+def test_startup_prefetches_and_shutdown_closes(google):
+    service = GoogleAuthService(discovery_url=f"{google.url}/.well-known/openid-configuration")
+
+    async def lifecycle():
+        await service.startup()
+        await service.shutdown()
+
+    asyncio.run(lifecycle())
+
+    assert google.discovery_fetches == 1
+    assert service.outbound.pool_stats() == {"active": 0, "idle": 0}
+
+
+def test_startup_survives_an_unreachable_google():
+    service = GoogleAuthService(discovery_url="http://127.0.0.1:9/.well-known/openid-configuration")
+
+    asyncio.run(service.startup())
+
+
+def test_readiness_fetches_discovery_every_time(google):
+    service = GoogleAuthService(discovery_url=f"{google.url}/.well-known/openid-configuration")
+
+    async def checks():
+        await service.check_ready()
+        await service.check_ready()
+        await service.shutdown()
+
+    asyncio.run(checks())
+
+    assert google.discovery_fetches == 2
+
+
+def test_readiness_fails_when_google_is_unreachable():
+    service = GoogleAuthService(discovery_url="http://127.0.0.1:9/.well-known/openid-configuration")
+
+    with pytest.raises(httpx.HTTPError):
+        asyncio.run(service.check_ready())
+
+
+# --- CachedDocument ---
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_discovery_expires_with_its_max_age(google):
+    google.cache_control = "public, max-age=60"
+    clock = FakeClock()
+
+    async def scenario():
+        outbound = OutboundClient("test")
+        document = CachedDocument(outbound, f"{google.url}/.well-known/openid-configuration", clock=clock)
+        await document.get()
+        clock.now = 59.0
+        await document.get()
+        clock.now = 61.0
+        await document.get()
+        await outbound.aclose()
+
+    asyncio.run(scenario())
+
+    assert google.discovery_fetches == 2
+
+
+def test_concurrent_callers_share_one_fetch(google):
+    async def scenario():
+        outbound = OutboundClient("test")
+        document = CachedDocument(outbound, f"{google.url}/.well-known/openid-configuration")
+        await asyncio.gather(*(document.get() for _ in range(10)))
+        await outbound.aclose()
+
+    asyncio.run(scenario())
+
+    assert google.discovery_fetches == 1
+
+
+def test_failed_refresh_serves_the_cached_copy(google):
+    clock = FakeClock()
+
+    async def scenario():
+        outbound = OutboundClient("test")
+        document = CachedDocument(outbound, f"{google.url}/.well-known/openid-configuration", clock=clock)
+        first = await document.get()
+        document.url = f"{google.url}/missing"
+        clock.now = 7200.0
+        second = await document.get()
+        await outbound.aclose()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert second == first
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"cache-control": "public, max-age=3600"}, 3600.0),
+        ({"cache-control": "max-age=3600", "age": "600"}, 3000.0),
+        ({"cache-control": "no-store"}, 0.0),
+        ({"cache-control": "no-cache, max-age=60"}, 0.0),
+        ({}, None),
+    ],
+)
+def test_max_age(headers, expected):
+    assert max_age(httpx.Headers(headers)) == expected
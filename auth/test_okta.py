@@ -0,0 +1,252 @@
+# auth/test_okta.py
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jwt.algorithms import RSAAlgorithm
+
+from .OktaAuthService import OktaAuthService
+from .jwks import JwksCache, SigningKeyNotFound
+
+AUDIENCE = "api://default"
+
+
+class StubIssuer:
+    """A local OpenID issuer serving a discovery document and a JWKS."""
+
+    def __init__(self):
+        self.private_keys = {}
+        self.published = []
+        self.requests = []
+        self.delay = 0.0
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                issuer.requests.append(self.path)
+                time.sleep(issuer.delay)
+                if self.path == "/.well-known/openid-configuration":
+                    body = {"issuer": issuer.url, "jwks_uri": f"{issuer.url}/v1/keys"}
+                elif self.path == "/v1/keys":
+                    body = {"keys": [issuer.jwk(kid) for kid in issuer.published]}
+                else:
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def publish(self, kid: str) -> None:
+        self.private_keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.published.append(kid)
+
+    def jwk(self, kid: str) -> dict:
+        jwk = RSAAlgorithm.to_jwk(self.private_keys[kid].public_key(), as_dict=True)
+        return {**jwk, "kid": kid, "use": "sig", "alg": "RS256"}
+
+    def token(self, kid: str = "k1", **claims) -> str:
+        now = int(time.time())
+        payload = {
+            "iss": self.url,
+            "aud": AUDIENCE,
+            "sub": "okta.user@example.com",
+            "uid": "00u1",
+            "iat": now,
+            "exp": now + 300,
+            **claims,
+        }
+        return jwt.encode(payload, self.private_keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    @property
+    def key_fetches(self) -> int:
+        return self.requests.count("/v1/keys")
+
+
+@pytest.fixture
+def issuer():
+    stub = StubIssuer()
+    stub.publish("k1")
+    yield stub
+    stub.server.shutdown()
+
+
+def make_service(issuer: StubIssuer, **options) -> OktaAuthService:
+    jwks = JwksCache(issuer=issuer.url, **options)
+    return OktaAuthService(issuer=issuer.url, audience=AUDIENCE, jwks=jwks)
+
+
+# --- OktaAuthService ---
+
+
+def test_valid_token(issuer):
+    service = make_service(issuer)
+
+    user = service.authenticate(f"Bearer {issuer.token(name='Okta User')}")
+
+    assert (user.id, user.email, user.provider, user.display_name) == (
+        "00u1", "okta.user@example.com", "okta", "Okta User",
+    )
+    assert issuer.requests == ["/.well-known/openid-configuration", "/v1/keys"]
+
+
+@pytest.mark.parametrize(
+    "claims",
+    [
+        {"aud": "api://other"},
+        {"iss": "https://evil.example.com"},
+        {"exp": int(time.time()) - 3600},
+        {"sub": "not-an-email"},
+    ],
+    ids=["audience", "issuer", "expired", "email"],
+)
+def test_rejected_tokens(issuer, claims):
+    service = make_service(issuer)
+
+    with pytest.raises(HTTPException) as error:
+        service.authenticate(issuer.token(**claims))
+
+    assert error.value.status_code == 401
+
+
+def test_token_signed_by_another_key(issuer):
+    service = make_service(issuer)
+    forged = StubIssuer()
+    forged.publish("k1")
+    token = jwt.encode(
+        jwt.decode(issuer.token(), options={"verify_signature": False}),
+        forged.private_keys["k1"],
+        algorithm="RS256",
+        headers={"kid": "k1"},
+    )
+    forged.server.shutdown()
+
+    with pytest.raises(HTTPException):
+        service.authenticate(token)
+
+
+def test_unconfigured_service():
+    with pytest.raises(HTTPException) as error:
+        OktaAuthService(issuer="").authenticate("token")
+
+    assert error.value.status_code == 503
+
+
+def test_startup_prefetches_keys(issuer):
+    service = make_service(issuer)
+
+    asyncio.run(service.startup())
+    asyncio.run(service.shutdown())
+
+    assert issuer.key_fetches == 1
+    assert service.jwks.kids == {"k1"}
+
+
+def test_readiness_reflects_the_latest_key_fetch(issuer):
+    service = make_service(issuer)
+    asyncio.run(service.check_ready())
+    service.jwks.jwks_uri = f"{issuer.url}/missing"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.check_ready())
+    assert service.jwks.kids == {"k1"}
+
+
+def test_unconfigured_service_is_ready():
+    asyncio.run(OktaAuthService(issuer="").check_ready())
+
+
+# --- JwksCache ---
+
+
+def test_known_kid_never_fetches(issuer):
+    service = make_service(issuer)
+    token = issuer.token()
+    service.authenticate(token)
+
+    for _ in range(20):
+        service.authenticate(token)
+
+    assert issuer.key_fetches == 1
+
+
+def test_rotated_key_is_fetched_on_first_use(issuer):
+    service = make_service(issuer)
+    service.jwks.refresh()  # as startup() does
+    service.authenticate(issuer.token())
+
+    issuer.publish("k2")
+    user = service.authenticate(issuer.token(kid="k2"))
+
+    assert user.id == "00u1"
+    assert issuer.key_fetches == 2
+
+
+def test_unknown_kid_cooldown(issuer):
+    jwks = JwksCache(issuer=issuer.url, unknown_kid_cooldown=60)
+
+    for _ in range(5):
+        with pytest.raises(SigningKeyNotFound):
+            jwks.get_key("made-up")
+
+    assert issuer.key_fetches == 1
+
+
+def test_concurrent_unknown_kids_share_one_fetch(issuer):
+    jwks = JwksCache(issuer=issuer.url)
+    issuer.delay = 0.2
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        keys = list(pool.map(lambda _: jwks.get_key("k1"), range(8)))
+
+    assert all(key.key_id == "k1" for key in keys)
+    assert issuer.key_fetches == 1
+
+
+def test_stale_keys_refresh_in_the_background(issuer):
+    now = [0.0]
+    jwks = JwksCache(issuer=issuer.url, refresh_interval=60, clock=lambda: now[0])
+    jwks.get_key("k1")
+    issuer.delay = 0.5
+    now[0] = 61.0
+
+    started = time.perf_counter()
+    key = jwks.get_key("k1")
+    elapsed = time.perf_counter() - started
+
+    assert key.key_id == "k1"
+    assert elapsed < 0.1
+    deadline = time.monotonic() + 5
+    while issuer.key_fetches < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert issuer.key_fetches == 2
+
+
+def test_failed_refresh_keeps_the_keys(issuer):
+    jwks = JwksCache(issuer=issuer.url, jwks_uri=f"{issuer.url}/v1/keys")
+    jwks.refresh()
+    jwks.jwks_uri = f"{issuer.url}/missing"
+
+    jwks.refresh()
+
+    assert jwks.failures == 1
+    assert jwks.get_key("k1").key_id == "k1"
@@ -0,0 +1,140 @@
+# auth/test_registry.py
+
+import asyncio
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+from .authService import AuthService
+from .dependencies import auth_registry
+from .registry import AuthProviderRegistry
+from app.main import app
+
+
+class RecordingAuthService(AuthService):
+    """An AuthService that counts how often it is built and started."""
+
+    instances = 0
+
+    def __init__(self):
+        RecordingAuthService.instances += 1
+        self.started = 0
+        self.stopped = 0
+
+    async def startup(self) -> None:
+        self.started += 1
+
+    async def shutdown(self) -> None:
+        self.stopped += 1
+
+
+@pytest.fixture
+def registry():
+    RecordingAuthService.instances = 0
+    registry = AuthProviderRegistry()
+    registry.register("alpha", RecordingAuthService)
+    registry.register("beta", RecordingAuthService)
+    registry.register("gamma", RecordingAuthService)
+    return registry
+
+
+# --- Unit Tests for AuthProviderRegistry ---
+
+
+def test_providers_are_built_once(registry: AuthProviderRegistry):
+    first = registry.get("alpha")
+    second = registry.get("alpha")
+
+    assert first is second
+    assert RecordingAuthService.instances == 1
+
+
+def test_unknown_provider_returns_none(registry: AuthProviderRegistry):
+    assert registry.get("delta") is None
+    assert registry.get(None) is None
+
+
+def test_duplicate_registration_is_rejected(registry: AuthProviderRegistry):
+    with pytest.raises(ValueError):
+        registry.register("alpha", RecordingAuthService)
+
+
+def test_describe_choices(registry: AuthProviderRegistry):
+    assert registry.names == ["alpha", "beta", "gamma"]
+    assert registry.describe_choices() == "'alpha', 'beta', or 'gamma'"
+
+
+def test_startup_and_shutdown_hooks(registry: AuthProviderRegistry):
+    async def cycle():
+        await registry.startup()
+        await registry.startup()  # A second startup must not re-run the hooks
+        await registry.shutdown()
+
+    asyncio.run(cycle())
+
+    provider = registry.get("beta")
+    assert RecordingAuthService.instances == 3
+    assert provider.started == 1
+    assert provider.stopped == 1
+
+
+def test_string_factories_are_imported_lazily():
+    registry = AuthProviderRegistry()
+    registry.register("mock", "auth.MockAuthService:MockAuthService")
+    assert not registry.is_built("mock")
+
+    provider = registry.get("mock")
+
+    assert type(provider).__name__ == "MockAuthService"
+    assert registry.is_built("mock")
+
+
+def test_startup_prewarms_only_selected_providers(registry: AuthProviderRegistry):
+    asyncio.run(registry.startup(["beta"]))
+
+    assert registry.is_built("beta")
+    assert not registry.is_built("alpha")
+    assert RecordingAuthService.instances == 1
+
+
+def test_importing_app_does_not_import_provider_sdks():
+    """A cold start must not pay for fastapi_sso until Google is used."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, auth.dependencies; print('fastapi_sso' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+# --- Integration Tests through the app ---
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides = {}
+    with TestClient(app) as c:
+        yield c
+
+
+def test_app_reuses_provider_instances(client: TestClient):
+    response = client.get("/auth/login?provider=mock", follow_redirects=False)
+
+    assert response.status_code == 307
+    assert auth_registry.get("mock") is auth_registry.get("mock")
+
+
+def test_unknown_query_provider_is_rejected(client: TestClient):
+    response = client.get("/auth/login?provider=nope", follow_redirects=False)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Unknown provider 'nope'. Use 'google', 'okta', or 'mock'."
+    )
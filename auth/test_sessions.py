@@ -0,0 +1,140 @@
+# auth/test_sessions.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+from . import sessions
+from .sessions import InMemorySessionStore
+from app.main import app
+from models.user import User
+
+user = User(id="u1", provider="mock", email="u1@mock.com")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# --- InMemorySessionStore ---
+
+
+def test_create_and_get():
+    store = InMemorySessionStore()
+
+    session_id = store.create(user)
+
+    assert store.get(session_id) is user
+    assert len(session_id) < 40
+    assert store.get("unknown") is None
+
+
+def test_session_ids_are_unique():
+    store = InMemorySessionStore()
+
+    assert store.create(user) != store.create(user)
+
+
+def test_sessions_expire():
+    clock = FakeClock()
+    store = InMemorySessionStore(ttl=60, clock=clock)
+    session_id = store.create(user)
+
+    clock.now += 60
+
+    assert store.get(session_id) is None
+    assert len(store) == 0
+
+
+def test_least_recently_used_session_is_evicted():
+    store = InMemorySessionStore(maxsize=2)
+    first, second = store.create(user), store.create(user)
+    store.get(first)
+
+    store.create(user)
+
+    assert store.get(first) is user
+    assert store.get(second) is None
+    assert store.evictions == 1
+
+
+def test_delete():
+    store = InMemorySessionStore()
+    session_id = store.create(user)
+
+    store.delete(session_id)
+    store.delete(session_id)
+
+    assert store.get(session_id) is None
+
+
+@pytest.mark.parametrize(
+    "function_name, mode, refused",
+    [("api", "server", True), ("api", "jwt", False), ("", "server", False)],
+)
+def test_lambda_refuses_in_memory_sessions(monkeypatch, function_name, mode, refused):
+    monkeypatch.setattr(sessions, "AWS_LAMBDA_FUNCTION_NAME", function_name)
+    monkeypatch.setattr(sessions, "SESSION_MODE", mode)
+
+    if refused:
+        with pytest.raises(RuntimeError, match="SESSION_MODE=jwt"):
+            sessions.check_lambda_sessions()
+    else:
+        sessions.check_lambda_sessions()
+
+
+def test_lambda_accepts_a_shared_store(monkeypatch):
+    monkeypatch.setattr(sessions, "AWS_LAMBDA_FUNCTION_NAME", "api")
+    monkeypatch.setattr(sessions, "SESSION_MODE", "server")
+    monkeypatch.setattr(sessions, "session_store", sessions.SessionStore())
+
+    sessions.check_lambda_sessions()
+
+
+# --- Server-side session mode through the app ---
+
+
+@pytest.fixture
+def server_sessions(monkeypatch):
+    store = InMemorySessionStore()
+    monkeypatch.setattr(sessions, "SESSION_MODE", "server")
+    monkeypatch.setattr(sessions, "session_store", store)
+    monkeypatch.setattr("auth.dependencies.session_store", store)
+    return store
+
+
+def test_login_sets_an_opaque_session_cookie(server_sessions):
+    with TestClient(app) as client:
+        client.get("/auth/login?provider=mock")
+        profile = client.get("/users/me")
+
+    assert set(client.cookies) == {"session_id"}
+    assert "." not in client.cookies["session_id"]
+    assert len(server_sessions) == 1
+    assert profile.status_code == 200
+    assert profile.json()["id"] == "mockuser123"
+
+
+def test_logout_invalidates_the_session_immediately(server_sessions):
+    with TestClient(app) as client:
+        client.get("/auth/login?provider=mock")
+        session_id = client.cookies["session_id"]
+
+        logout = client.get("/auth/logout?provider=mock")
+        # Replaying the old cookie does not bring the session back
+        client.cookies.set("session_id", session_id)
+        profile = client.get("/users/me")
+
+    assert logout.status_code == 200
+    assert len(server_sessions) == 0
+    assert profile.status_code == 401
+
+
+def test_jwt_mode_is_the_default():
+    with TestClient(app) as client:
+        client.get("/auth/login?provider=mock")
+
+    assert set(client.cookies) == {"access_token"}
@@ -0,0 +1,246 @@
+# =================================================================
+# File: bench/auth_path.py
+# =================================================================
+"""
+Microbenchmarks for the authentication hot path, stage by stage.
+
+Each stage of `get_current_active_user` is timed on its own:
+  cookie         - Request construction and reading the access_token cookie
+  jwt_decode     - HS256 verification and decoding, per token size
+  user_model     - User(**payload), including EmailStr validation
+  user_trusted   - TrustedClaims.user_from for an already-seen claim-set
+                   version (what the cookie path now does instead)
+  header_lookup  - get_auth_service_from_header (provider registry lookup)
+  authenticate   - MockAuthService / GoogleAuthService.authenticate
+and then the whole dependency end to end: a cookie session with the
+principal cache cold and warm, header authentication, and request mixes
+where `--error-ratio` of requests carry an expired, forged or missing
+credential.
+
+Results are microseconds per call (best of `--repeat` rounds). Save them with
+`--save`; `--baseline` compares a run against a saved one and exits non-zero
+when any benchmark is slower by more than `--threshold`.
+
+    python -m bench.auth_path
+    python -m bench.auth_path --save bench/auth_baseline.json
+    python -m bench.auth_path --baseline bench/auth_baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+import jwt
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from auth import dependencies
+from auth.cache import PrincipalCache
+from auth.claims import SESSION_CLAIMS_VERSION, TrustedClaims
+from auth.dependencies import (
+    SECRET_KEY,
+    auth_registry,
+    get_auth_service_from_header,
+    get_current_active_user,
+)
+from models.user import User
+
+SECRET = str(SECRET_KEY)
+
+# Claim sets of increasing size. "typical" is what MockAuthService issues plus
+# the registered claims a real session carries; "large" adds the kind of
+# group/role lists an enterprise IdP puts into its tokens.
+CLAIMS = {
+    "small": {"id": "u1", "provider": "mock", "email": "u1@mock.com"},
+    "typical": {
+        "provider": "mock",
+        "id": "mockuser123",
+        "email": "test@mock.com",
+        "display_name": "Local Test User",
+        "picture": "https://example.com/mockuser",
+        "iat": 1_700_000_000,
+        "exp": 4_102_444_800,
+        "ver": SESSION_CLAIMS_VERSION,
+    },
+    "large": {
+        "provider": "mock",
+        "id": "mockuser123",
+        "email": "test@mock.com",
+        "display_name": "Local Test User",
+        "picture": "https://example.com/mockuser/" + "p" * 200,
+        "iat": 1_700_000_000,
+        "exp": 4_102_444_800,
+        "ver": SESSION_CLAIMS_VERSION,
+        "groups": [f"group-{n:04d}" for n in range(100)],
+        "roles": [f"role-{n:03d}" for n in range(20)],
+    },
+}
+
+
+def token_for(claims: dict, secret: str = SECRET) -> str:
+    return jwt.encode(claims, secret, algorithm="HS256")
+
+
+def scope_for(headers: dict[str, str]) -> dict:
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": "/users/me",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+
+
+def cookie_headers(token: str) -> dict[str, str]:
+    return {"Cookie": f'access_token="Bearer {token}"'}
+
+
+def time_per_call(function, number: int, repeat: int) -> float:
+    """Best-of-`repeat` microseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+@contextmanager
+def principal_cache_disabled():
+    """Swaps in a zero-size cache so every cookie request decodes its token."""
+    original = dependencies.principal_cache
+    dependencies.principal_cache = PrincipalCache(maxsize=0)
+    try:
+        yield
+    finally:
+        dependencies.principal_cache = original
+
+
+def authenticate(headers: dict[str, str]) -> User | None:
+    """Runs the dependency for one request the way FastAPI would call it."""
+    request = Request(scope_for(headers))
+    try:
+        return get_current_active_user(
+            request,
+            request.headers.get("x-auth-provider"),
+            request.headers.get("authorization"),
+        )
+    except HTTPException:
+        return None
+
+
+def request_mix(error_ratio: float, size: int = 1000, seed: int = 1) -> list[dict[str, str]]:
+    """Cookie sessions, with `error_ratio` of them replaced by failing credentials."""
+    valid = cookie_headers(token_for(CLAIMS["typical"]))
+    failures = [
+        cookie_headers(token_for({**CLAIMS["typical"], "exp": 1_000_000_000})),  # expired
+        cookie_headers(token_for(CLAIMS["typical"], secret="not-our-secret")),  # forged
+        cookie_headers("not.a.jwt"),  # malformed
+        {},  # no credentials
+        {"X-Auth-Provider": "mock", "Authorization": "bogus"},  # rejected by provider
+    ]
+    rng = random.Random(seed)
+    return [rng.choice(failures) if rng.random() < error_ratio else valid for _ in range(size)]
+
+
+def run(number: int, repeat: int, error_ratios: list[float]) -> dict[str, float]:
+    results = {}
+
+    def bench(name: str, function, calls: int = number) -> None:
+        results[name] = time_per_call(function, calls, repeat)
+
+    # --- Stages ---
+    scope = scope_for(cookie_headers(token_for(CLAIMS["typical"])))
+    bench("cookie", lambda: Request(scope).cookies.get("access_token"))
+    for size, claims in CLAIMS.items():
+        token = token_for(claims)
+        bench(f"jwt_decode[{size}]", lambda: jwt.decode(token, SECRET, algorithms=["HS256"]))
+        payload = jwt.decode(token, SECRET, algorithms=["HS256"])
+        bench(f"user_model[{size}]", lambda: User(**payload))
+        trusted = TrustedClaims()
+        trusted.user_from(payload)
+        bench(f"user_trusted[{size}]", lambda: trusted.user_from(payload))
+    bench("header_lookup", lambda: get_auth_service_from_header("mock"))
+    for provider in ("mock", "google"):
+        service = auth_registry.get(provider)
+        bench(f"authenticate[{provider}]", lambda: service.authenticate(f"{provider}-user1"))
+
+    # --- End to end ---
+    e2e_number = max(1, number // 4)
+    for size, claims in CLAIMS.items():
+        headers = cookie_headers(token_for(claims))
+        with principal_cache_disabled():
+            bench(f"e2e_cookie_cold[{size}]", lambda: authenticate(headers), e2e_number)
+        dependencies.principal_cache.clear()
+        bench(f"e2e_cookie_cached[{size}]", lambda: authenticate(headers), e2e_number)
+    for provider in ("mock", "google"):
+        headers = {"X-Auth-Provider": provider, "Authorization": f"{provider}-user1"}
+        bench(f"e2e_header[{provider}]", lambda: authenticate(headers), e2e_number)
+    for ratio in error_ratios:
+        mix = request_mix(ratio)
+        with principal_cache_disabled():
+            bench(
+                f"e2e_mix[errors={ratio:g}]",
+                lambda: [authenticate(headers) for headers in mix],
+                max(1, e2e_number // len(mix)),
+            )
+        results[f"e2e_mix[errors={ratio:g}]"] /= len(mix)
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """Names of benchmarks slower than the baseline by more than `threshold`."""
+    return [
+        name
+        for name, micros in results.items()
+        if name in baseline and micros > baseline[name] * (1 + threshold)
+    ]
+
+
+def print_report(results: dict[str, float], baseline: dict | None, regressions: list[str]) -> None:
+    print(f"  {'benchmark':<32} {'us/call':>9} {'baseline':>9} {'change':>8}")
+    for name, micros in results.items():
+        line = f"  {name:<32} {micros:9.2f}"
+        if baseline and name in baseline:
+            change = (micros / baseline[name] - 1) * 100
+            line += f" {baseline[name]:9.2f} {change:+7.1f}%"
+            if name in regressions:
+                line += "  REGRESSION"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000, help="Calls per timing round.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds; the best one counts.")
+    parser.add_argument("--error-ratio", type=float, action="append",
+                        help="Share of failing requests in an end-to-end mix (repeatable; "
+                        "default 0, 0.1 and 0.5).")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="A JSON file written by --save to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown that counts as a regression (default 0.10).")
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.repeat, args.error_ratio or [0.0, 0.1, 0.5])
+    baseline = None
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+    print_report(results, baseline, regressions)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"number": args.number, "repeat": args.repeat, "results": results}, f, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
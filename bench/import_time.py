@@ -0,0 +1,91 @@
+# =================================================================
+# File: bench/import_time.py
+# =================================================================
+"""
+Measures how long it takes to import a module, using `python -X importtime`.
+
+Each run happens in a fresh interpreter so nothing is cached between runs.
+By default it compares importing `app.main` on its own (what a cold start
+pays with lazy auth providers) against importing it together with every
+provider module (what a cold start paid when they were imported eagerly).
+
+    python -m bench.import_time
+    python -m bench.import_time --module app.main --extra auth.GoogleAuthService --runs 7
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# What `auth.dependencies` used to pull in at import time. The Google SDK is
+# listed separately because GoogleAuthService now imports it on first use.
+PROVIDER_MODULES = [
+    "auth.GoogleAuthService",
+    "fastapi_sso.sso.google",
+    "auth.OktaAuthService",
+    "auth.MockAuthService",
+]
+
+
+def parse_importtime_rows(stderr: str) -> list[tuple[str, int, int]]:
+    """Parses `-X importtime` output into (module, self us, cumulative us) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Parses `-X importtime` output into {module: cumulative microseconds}."""
+    return {module: cumulative for module, _, cumulative in parse_importtime_rows(stderr)}
+
+
+def measure(modules: list[str]) -> dict[str, int]:
+    """Imports the modules in a fresh interpreter; returns their cumulative us."""
+    statement = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = parse_importtime(result.stderr)
+    return {module: cumulative.get(module, 0) for module in modules}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument(
+        "--extra",
+        action="append",
+        help="Modules a cold start used to import eagerly (default: all auth providers).",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    extra = args.extra or PROVIDER_MODULES
+
+    # Interleave the two variants so machine noise hits both equally. The
+    # saving is taken from the eager runs themselves: whatever the extra
+    # modules cost on top of an already-imported app is what laziness avoids.
+    lazy, eager, saved = [], [], []
+    for _ in range(args.runs):
+        lazy.append(measure([args.module])[args.module] / 1000)
+        timings = measure([args.module, *extra])
+        eager.append(sum(timings.values()) / 1000)
+        saved.append(sum(timings[module] for module in extra) / 1000)
+
+    print(f"Import of {args.module}, median of {args.runs} fresh interpreters")
+    print(f"  lazy providers:  {statistics.median(lazy):8.1f} ms")
+    print(f"  eager providers: {statistics.median(eager):8.1f} ms")
+    print(f"  deferred cost:   {statistics.median(saved):8.1f} ms")
+    for module in extra:
+        print(f"    - {module}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# =================================================================
+# File: bench/lambda_replay.py
+# =================================================================
+"""
+Replays API Gateway HTTP API (v2) event files through the Lambda handler.
+
+The handler module is imported inside this process, so its import time is
+the Lambda init phase. Each event is then invoked once (the first, "cold"
+invocation for that route) followed by `--warm` repeats. With `--cold-runs`
+the init + first-invocation measurement is repeated in fresh interpreters,
+which is what a new execution environment actually pays.
+
+    python -m bench.lambda_replay bench/events
+    python -m bench.lambda_replay bench/events/health_v1.json --warm 200 --cold-runs 5
+"""
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+def load_events(paths: list[str]) -> list[tuple[str, dict]]:
+    """Loads event files; directories contribute every *.json file they contain."""
+    files: list[Path] = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    return [(file.name, json.loads(file.read_text())) for file in files]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def replay(handler_path: str, events: list[tuple[str, dict]], warm: int) -> dict:
+    """Imports the handler, then invokes every event once cold and `warm` times."""
+    module_name, _, attribute = handler_path.partition(":")
+    started = time.perf_counter()
+    handler = getattr(importlib.import_module(module_name), attribute)
+    init_ms = (time.perf_counter() - started) * 1000
+
+    results = {"handler": handler_path, "init_ms": init_ms, "events": {}}
+    for name, event in events:
+        started = time.perf_counter()
+        response = handler(event, None)
+        first_ms = (time.perf_counter() - started) * 1000
+
+        samples = []
+        for _ in range(warm):
+            started = time.perf_counter()
+            handler(event, None)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        results["events"][name] = {
+            "status": response["statusCode"],
+            "first_ms": first_ms,
+            "warm": {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 50) if samples else None,
+                "p90_ms": percentile(samples, 90) if samples else None,
+                "p99_ms": percentile(samples, 99) if samples else None,
+                "max_ms": max(samples) if samples else None,
+            },
+        }
+    return results
+
+
+def cold_runs(handler_path: str, paths: list[str], runs: int) -> list[dict]:
+    """Repeats the init + first-invocation measurement in fresh interpreters."""
+    command = [
+        sys.executable, "-m", "bench.lambda_replay", *paths,
+        "--handler", handler_path, "--warm", "0", "--json",
+    ]
+    runs_output = [
+        subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        for _ in range(runs)
+    ]
+    # The app logs to stdout too; the JSON report is always the last line.
+    return [json.loads(output.strip().splitlines()[-1]) for output in runs_output]
+
+
+def print_report(results: dict, fresh: list[dict]) -> None:
+    print(f"Handler {results['handler']}")
+    print(f"  init (import + lifespan startup): {results['init_ms']:8.1f} ms")
+    if fresh:
+        inits = [run["init_ms"] for run in fresh]
+        print(f"  init over {len(fresh)} fresh interpreters: median {statistics.median(inits):.1f} ms, max {max(inits):.1f} ms")
+    print()
+    print(f"  {'event':<32} {'status':>6} {'cold':>9} {'warm p50':>9} {'warm p90':>9} {'warm p99':>9}")
+    for name, stats in results["events"].items():
+        cold = stats["first_ms"]
+        if fresh:
+            cold = statistics.median(run["events"][name]["first_ms"] for run in fresh)
+        warm = stats["warm"]
+        columns = [
+            f"{warm[key]:8.2f}" if warm[key] is not None else f"{'-':>8}"
+            for key in ("p50_ms", "p90_ms", "p99_ms")
+        ]
+        print(f"  {name:<32} {stats['status']:>6} {cold:8.2f}  {'  '.join(columns)}  (ms)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("events", nargs="+", help="Event files or directories of *.json events.")
+    parser.add_argument("--handler", default="main:handler", help="module:attribute of the handler.")
+    parser.add_argument("--warm", type=int, default=50, help="Warm invocations per event.")
+    parser.add_argument("--cold-runs", type=int, default=0, help="Fresh-interpreter cold measurements.")
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON.")
+    args = parser.parse_args(argv)
+
+    # Fresh interpreters run first, before this process imports the app and
+    # claims process-wide resources such as the metrics port.
+    fresh = []
+    if args.cold_runs and not args.json:
+        fresh = cold_runs(args.handler, args.events, args.cold_runs)
+    results = replay(args.handler, load_events(args.events), args.warm)
+    if args.json:
+        print(json.dumps(results))
+        return 0
+    print_report(results, fresh)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
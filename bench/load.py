@@ -0,0 +1,296 @@
+# =================================================================
+# File: bench/load.py
+# =================================================================
+"""
+Asyncio load generator for the API, in-process over ASGI or against a URL.
+
+Scenarios:
+  health  - GET /api/v1/health, unauthenticated
+  me      - GET /users/me with a mock session JWT in the access_token cookie
+  item    - GET /api/v2/items/{id} with X-Auth-Provider: mock, cycling ids
+
+Modes:
+  closed  - `--concurrency` workers, each sending its next request as soon
+            as the previous one completes (measures capacity)
+  open    - requests start at a fixed `--rate` whether or not earlier ones
+            have completed; latency is measured from the scheduled start, so
+            queueing delay is included instead of hidden (measures latency
+            under a given load)
+
+    python -m bench.load health me item --duration 5
+    python -m bench.load item --mode open --rate 500 --duration 10 --output runs/item.json
+    python -m bench.load health --url http://localhost:8989 --compare runs/health.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import sys
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Callable
+
+import httpx
+import jwt
+
+MOCK_SESSION = {
+    "provider": "mock",
+    "id": "loaduser",
+    "email": "loaduser@mock.com",
+    "display_name": "Load Test User",
+    "picture": "https://example.com/loaduser",
+}
+PERCENTILES = (50, 90, 99, 99.9)
+SCENARIOS = ("health", "me", "item")
+
+
+def session_cookie(secret: str) -> str:
+    """An access_token cookie as MockAuthService's callback would set it."""
+    token = jwt.encode(MOCK_SESSION, secret, algorithm="HS256")
+    return f'access_token="Bearer {token}"'
+
+
+def build_scenarios(secret: str, item_ids: int) -> dict[str, Callable[[int], tuple[str, dict]]]:
+    """Maps scenario names to functions returning (path, headers) for request n."""
+    cookie = {"Cookie": session_cookie(secret)}
+    api_client = {"X-Auth-Provider": "mock", "Authorization": "mock-loaduser"}
+    return {
+        "health": lambda n: ("/api/v1/health", {}),
+        "me": lambda n: ("/users/me", cookie),
+        "item": lambda n: (f"/api/v2/items/{n % item_ids + 1}", api_client),
+    }
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram: O(1) record, constant memory, and
+    percentiles accurate to `precision` (relative) whatever the run length.
+    """
+
+    def __init__(self, precision: float = 0.01):
+        self._log_base = math.log1p(precision)
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        micros = max(seconds * 1e6, 1.0)
+        bucket = int(math.log(micros) / self._log_base)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """The latency (seconds) at or below which `pct` percent of requests fell."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(pct / 100 * self.count)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(math.exp((bucket + 1) * self._log_base) / 1e6, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        summary = {
+            f"p{pct:g}_ms": self.percentile(pct) * 1000 for pct in PERCENTILES
+        }
+        summary["mean_ms"] = self.total / self.count * 1000 if self.count else 0.0
+        summary["max_ms"] = self.max * 1000
+        return summary
+
+    def buckets(self) -> list[tuple[float, int]]:
+        """(upper bound in ms, count) pairs for the non-empty buckets."""
+        return [
+            (round(math.exp((bucket + 1) * self._log_base) / 1000, 4), self.counts[bucket])
+            for bucket in sorted(self.counts)
+        ]
+
+
+class Recorder:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.statuses: dict[int, int] = {}
+        self.errors: dict[str, int] = {}
+
+    async def send(self, client: httpx.AsyncClient, request, n: int, started: float) -> None:
+        path, headers = request(n)
+        try:
+            response = await client.get(path, headers=headers)
+        except httpx.HTTPError as e:
+            name = type(e).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return
+        self.histogram.record(time.perf_counter() - started)
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+
+
+async def run_closed(client, request, duration: float, concurrency: int) -> tuple[Recorder, float]:
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(sys.maxsize))
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await recorder.send(client, request, next(counter), time.perf_counter())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder, time.perf_counter() - started
+
+
+async def run_open(
+    client, request, duration: float, rate: float, max_inflight: int
+) -> tuple[Recorder, float, int]:
+    recorder = Recorder()
+    interval = 1.0 / rate
+    inflight: set[asyncio.Task] = set()
+    skipped = 0
+    started = time.perf_counter()
+    for n in range(int(duration * rate)):
+        scheduled = started + n * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(inflight) >= max_inflight:
+            # The target is saturated; count the request instead of queueing it
+            # client-side, which would only measure this generator.
+            skipped += 1
+            continue
+        task = asyncio.create_task(recorder.send(client, request, n, scheduled))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+    if inflight:
+        await asyncio.gather(*inflight)
+    return recorder, time.perf_counter() - started, skipped
+
+
+async def open_client(stack: AsyncExitStack, url: str | None, concurrency: int) -> httpx.AsyncClient:
+    """A client for `url`, or for the app in this process (with its lifespan running)."""
+    if url:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        return await stack.enter_async_context(
+            httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0)
+        )
+    from app.main import app
+
+    await stack.enter_async_context(app.router.lifespan_context(app))
+    # The client's per-request INFO logs would go through the app's log queue,
+    # adding to the measured latencies and filling its log file.
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    transport = httpx.ASGITransport(app=app)
+    return await stack.enter_async_context(
+        httpx.AsyncClient(transport=transport, base_url="http://loadtest")
+    )
+
+
+async def run(args) -> dict:
+    from auth.dependencies import SECRET_KEY
+
+    scenarios = build_scenarios(str(SECRET_KEY), args.item_ids)
+    results = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "mode": args.mode,
+        "python": platform.python_version(),
+        "duration_s": args.duration,
+        "concurrency": args.concurrency,
+        "rate": args.rate if args.mode == "open" else None,
+        "scenarios": {},
+    }
+    async with AsyncExitStack() as stack:
+        client = await open_client(stack, args.url, max(args.concurrency, args.max_inflight))
+        for name in args.scenarios:
+            request = scenarios[name]
+            if args.warmup:
+                await run_closed(client, request, args.warmup, args.concurrency)
+            skipped = 0
+            if args.mode == "open":
+                recorder, elapsed, skipped = await run_open(
+                    client, request, args.duration, args.rate, args.max_inflight
+                )
+            else:
+                recorder, elapsed = await run_closed(client, request, args.duration, args.concurrency)
+            histogram = recorder.histogram
+            results["scenarios"][name] = {
+                "requests": histogram.count,
+                "elapsed_s": elapsed,
+                "throughput_rps": histogram.count / elapsed if elapsed else 0.0,
+                "statuses": {str(code): count for code, count in sorted(recorder.statuses.items())},
+                "errors": recorder.errors,
+                "skipped": skipped,
+                **histogram.summary(),
+                "histogram_ms": histogram.buckets(),
+            }
+    return results
+
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    print(f"{results['target']}, {results['mode']} loop, {results['duration_s']}s per scenario")
+    columns = ["p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms"]
+    print(f"  {'scenario':<8} {'requests':>9} {'req/s':>9} " + " ".join(f"{c[:-3]:>8}" for c in columns) + "  statuses")
+    for name, stats in results["scenarios"].items():
+        statuses = ", ".join(f"{code}x{count}" for code, count in stats["statuses"].items())
+        if stats["errors"] or stats["skipped"]:
+            statuses += f" errors={stats['errors']} skipped={stats['skipped']}"
+        print(
+            f"  {name:<8} {stats['requests']:>9} {stats['throughput_rps']:9.0f} "
+            + " ".join(f"{stats[c]:8.2f}" for c in columns)
+            + f"  {statuses}"
+        )
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        if previous:
+            deltas = [
+                f"{(stats[c] / previous[c] - 1) * 100:+7.1f}%" if previous[c] else f"{'-':>8}"
+                for c in columns
+            ]
+            rps_delta = (
+                f"{(stats['throughput_rps'] / previous['throughput_rps'] - 1) * 100:+8.1f}%"
+                if previous["throughput_rps"]
+                else f"{'-':>9}"
+            )
+            print(f"  {'vs base':<8} {'':>9} {rps_delta} " + " ".join(deltas))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help="health, me and/or item, run in order (default: all three).")
+    parser.add_argument("--url", help="Base URL of a running server; in-process ASGI if omitted.")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario.")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before each scenario.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Workers in closed-loop mode.")
+    parser.add_argument("--rate", type=float, default=200.0, help="Requests per second in open-loop mode.")
+    parser.add_argument("--max-inflight", type=int, default=256,
+                        help="Open-loop requests outstanding before new ones are skipped.")
+    parser.add_argument("--item-ids", type=int, default=1000, help="Distinct item ids to cycle through.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="A previous --output file to compare against.")
+    args = parser.parse_args(argv)
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
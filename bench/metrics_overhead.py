@@ -0,0 +1,106 @@
+# =================================================================
+# File: bench/metrics_overhead.py
+# =================================================================
+"""
+Microbenchmark for the cost of the auth domain metrics on the request path.
+
+  record          - AuthMetrics.record for an already-bound label set, plus
+                    the two perf_counter calls that time the request
+  otel_counter    - the same counter increment through an OpenTelemetry
+                    SDK instrument (for comparison; not used on the hot path)
+  otel_histogram  - the same observation through an OpenTelemetry histogram
+  e2e_cached      - get_current_active_user for a cached cookie session,
+                    with the metrics recorded and with them switched off
+
+`record` must stay within AUTH_METRICS_BUDGET_US (metrics/app.py) or the
+benchmark exits non-zero. The end-to-end difference is reported alongside;
+it is noisier, so it informs rather than gates.
+
+    python -m bench.metrics_overhead
+    python -m bench.metrics_overhead --budget 3
+"""
+import argparse
+import sys
+import time
+from contextlib import contextmanager
+
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+from auth import dependencies
+from bench.auth_path import CLAIMS, authenticate, cookie_headers, time_per_call, token_for
+from metrics.app import AUTH_METRICS_BUDGET_US, AuthMetrics
+
+
+class NullAuthMetrics(AuthMetrics):
+    def record(self, method: str, provider: str, success: bool, seconds: float) -> None:
+        pass
+
+
+@contextmanager
+def auth_metrics(metrics: AuthMetrics):
+    original = dependencies.auth_metrics
+    dependencies.auth_metrics = metrics
+    try:
+        yield
+    finally:
+        dependencies.auth_metrics = original
+
+
+def run(number: int, repeat: int) -> dict[str, float]:
+    results = {}
+
+    def bench(name: str, function, calls: int = number) -> None:
+        results[name] = time_per_call(function, calls, repeat)
+
+    metrics = AuthMetrics()
+    metrics.record("cookie", "mock", True, 0.0)  # bind the label set
+
+    def record():
+        started = time.perf_counter()
+        metrics.record("cookie", "mock", True, time.perf_counter() - started)
+
+    bench("record", record)
+
+    meter = MeterProvider(metric_readers=[InMemoryMetricReader()]).get_meter(__name__)
+    counter = meter.create_counter("auth.results")
+    histogram = meter.create_histogram("auth.duration", unit="s")
+    attributes = {"method": "cookie", "provider": "mock", "result": "success"}
+    bench("otel_counter", lambda: counter.add(1, attributes))
+    bench("otel_histogram", lambda: histogram.record(0.00005, attributes))
+
+    headers = cookie_headers(token_for(CLAIMS["typical"]))
+    authenticate(headers)  # cache the session
+    e2e_number = max(1, number // 4)
+    with auth_metrics(NullAuthMetrics()):
+        bench("e2e_cached[off]", lambda: authenticate(headers), e2e_number)
+    with auth_metrics(metrics):
+        bench("e2e_cached[on]", lambda: authenticate(headers), e2e_number)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing round.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds; the best one counts.")
+    parser.add_argument("--budget", type=float, default=AUTH_METRICS_BUDGET_US,
+                        help="Allowed microseconds per request for recording the metrics "
+                        f"(default {AUTH_METRICS_BUDGET_US:g}).")
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.repeat)
+    print(f"  {'benchmark':<20} {'us/call':>9}")
+    for name, micros in results.items():
+        print(f"  {name:<20} {micros:9.2f}")
+    overhead = results["e2e_cached[on]"] - results["e2e_cached[off]"]
+    print(f"\n  end-to-end overhead  {overhead:9.2f} us/request")
+
+    if results["record"] > args.budget:
+        print(f"\nRecording took {results['record']:.2f} us, over the {args.budget:g} us budget.")
+        return 1
+    print(f"  within the {args.budget:g} us budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
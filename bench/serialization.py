@@ -0,0 +1,160 @@
+# =================================================================
+# File: bench/serialization.py
+# =================================================================
+"""
+Compares the cost of serializing item responses before and after typed models.
+
+"before" is what the item routes used to do: return a dict (with the whole
+User model nested under "retrieved_by" in v2), declared as response_model=dict
+and rendered by the stock JSONResponse. "after" is the typed ItemV1/ItemV2
+models, returned from the route as a FastJSONResponse (as the endpoints do).
+
+Two views are reported:
+  render  - encoding alone (jsonable_encoder + JSONResponse vs FastJSONResponse)
+  route   - a full FastAPI request cycle over raw ASGI, without network or auth
+
+    python -m bench.serialization
+    python -m bench.serialization --number 20000
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.responses import FastJSONResponse
+from models.item import ItemDetails, ItemV1, ItemV2
+from models.user import User
+
+USER = User(
+    id="mockuser123",
+    provider="mock",
+    email="test@mock.com",
+    display_name="Local Test User",
+    picture="https://example.com/mockuser",
+)
+
+
+def dict_payload(version: str, item_id: int) -> dict:
+    payload = {
+        "version": version,
+        "item_details": {"id": item_id, "description": "This is a V2 item."},
+        "owner_email": USER.email,
+        "owner_provider": USER.provider,
+        "owner_display_name": USER.display_name,
+    }
+    if version == "v2":
+        payload["retrieved_by"] = USER
+    return payload
+
+
+def model_payload(version: str, item_id: int) -> ItemV1:
+    model = ItemV2 if version == "v2" else ItemV1
+    extra = {"retrieved_by": USER} if version == "v2" else {}
+    return model(
+        item_details=ItemDetails(id=item_id, description="This is a V2 item."),
+        owner_email=USER.email,
+        owner_provider=USER.provider,
+        owner_display_name=USER.display_name,
+        **extra,
+    )
+
+
+def time_per_call(function, number: int) -> float:
+    """Best-of-five microseconds per call."""
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - started)
+    return best / number * 1e6
+
+
+def build_apps() -> tuple[FastAPI, FastAPI]:
+    before = FastAPI()
+    after = FastAPI(default_response_class=FastJSONResponse)
+
+    @before.get("/v1/{item_id}", response_model=dict)
+    async def before_v1(item_id: int):
+        return dict_payload("v1", item_id)
+
+    @before.get("/v2/{item_id}", response_model=dict)
+    async def before_v2(item_id: int):
+        return dict_payload("v2", item_id)
+
+    @after.get("/v1/{item_id}", response_model=ItemV1)
+    async def after_v1(item_id: int):
+        return FastJSONResponse(model_payload("v1", item_id))
+
+    @after.get("/v2/{item_id}", response_model=ItemV2)
+    async def after_v2(item_id: int):
+        return FastJSONResponse(model_payload("v2", item_id))
+
+    return before, after
+
+
+async def call_asgi(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [], "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+def time_route(app: FastAPI, path: str, number: int) -> float:
+    loop = asyncio.new_event_loop()
+    try:
+        async def run():
+            for _ in range(number):
+                await call_asgi(app, path)
+
+        best = float("inf")
+        for _ in range(5):
+            started = time.perf_counter()
+            loop.run_until_complete(run())
+            best = min(best, time.perf_counter() - started)
+        return best / number * 1e6
+    finally:
+        loop.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=5000, help="Calls per timing round.")
+    args = parser.parse_args(argv)
+    before_app, after_app = build_apps()
+
+    print(f"{'':<14} {'before':>10} {'after':>10} {'speedup':>8}   (us per response)")
+    for version in ("v1", "v2"):
+        payload, model = dict_payload(version, 123), model_payload(version, 123)
+        before = time_per_call(lambda: JSONResponse(jsonable_encoder(payload)), args.number)
+        after = time_per_call(lambda: FastJSONResponse(model), args.number)
+        print(f"render {version:<7} {before:10.2f} {after:10.2f} {before / after:7.1f}x")
+
+    route_number = max(1, args.number // 5)
+    for version in ("v1", "v2"):
+        path = f"/{version}/123"
+        before = time_route(before_app, path, route_number)
+        after = time_route(after_app, path, route_number)
+        print(f"route  {version:<7} {before:10.2f} {after:10.2f} {before / after:7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+# =================================================================
+# File: bench/startup.py
+# =================================================================
+"""
+Profiles application startup: import time per module, the cost of each
+startup phase and peak memory, measured in fresh interpreters.
+
+Each run imports the app and runs its lifespan startup the way the Lambda
+init phase does (see main.py). The phases are:
+
+  imports and module code  - importing app.main and its dependencies, plus
+                             its module-level code not listed below
+  logging setup            - logging_config.setup_logging
+  instrumentation          - metrics.instrument.instrument_app (OpenTelemetry,
+                             Prometheus and, in single-process mode, the
+                             metrics HTTP server)
+  middleware               - FastAPI.add_middleware
+  router inclusion         - FastAPI.include_router
+  provider construction    - building the pre-warmed auth providers
+  provider startup hooks   - the rest of the lifespan startup
+
+One extra run under `python -X importtime` lists the slowest modules and
+top-level packages; that run is not counted in the phase timings.
+
+The median init time (import + lifespan startup) must stay within
+STARTUP_BUDGET_MS and the peak RSS within --memory-budget-mb (if given),
+or the command exits non-zero.
+
+    python -m bench.startup
+    python -m bench.startup --runs 7 --providers mock,google --budget-ms 800
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from bench.import_time import parse_importtime_rows
+
+STARTUP_BUDGET_MS = 1500.0
+
+IMPORT_PHASE = "imports and module code"
+LIFESPAN_PHASE = "provider startup hooks"
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class PhaseTimer:
+    """Times calls to the functions that make up the startup phases."""
+
+    def __init__(self):
+        self.elapsed: dict[str, float] = defaultdict(float)
+        self._inside = False
+
+    @contextmanager
+    def patched(self):
+        # Imported here so that their own import time counts as imports.
+        import logging_config
+        import metrics.instrument
+        from fastapi import FastAPI
+
+        from auth.registry import AuthProviderRegistry
+
+        targets = [
+            (logging_config, "setup_logging", "logging setup"),
+            (metrics.instrument, "instrument_app", "instrumentation"),
+            (FastAPI, "add_middleware", "middleware"),
+            (FastAPI, "include_router", "router inclusion"),
+            (AuthProviderRegistry, "build", "provider construction"),
+        ]
+        originals = [(owner, name, getattr(owner, name)) for owner, name, _ in targets]
+        for owner, name, phase in targets:
+            setattr(owner, name, self._wrap(getattr(owner, name), phase))
+        try:
+            yield
+        finally:
+            for owner, name, original in originals:
+                setattr(owner, name, original)
+
+    def _wrap(self, function, phase: str):
+        def timed(*args, **kwargs):
+            # Only the outermost phase counts, so nothing is counted twice.
+            if self._inside:
+                return function(*args, **kwargs)
+            self._inside = True
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.elapsed[phase] += (time.perf_counter() - started) * 1000
+                self._inside = False
+
+        return timed
+
+    def since(self, before: dict[str, float]) -> float:
+        """Milliseconds spent in phases since the `before` snapshot."""
+        return sum(self.elapsed.values()) - sum(before.values())
+
+
+def profile(app_path: str) -> dict:
+    """Imports the app and runs its lifespan startup, timing every phase."""
+    already_imported = sorted(sys.modules)
+    rss = {"interpreter": peak_rss_mb()}
+    timer = PhaseTimer()
+    module_name, _, attribute = app_path.partition(":")
+
+    started = time.perf_counter()
+    with timer.patched():
+        from app.lambda_adapter import LambdaAdapter
+
+        app = getattr(importlib.import_module(module_name), attribute)
+        import_ms = (time.perf_counter() - started) * 1000
+        rss["import"] = peak_rss_mb()
+
+        before = dict(timer.elapsed)
+        started = time.perf_counter()
+        adapter = LambdaAdapter(app)
+        lifespan_ms = (time.perf_counter() - started) * 1000
+        rss["lifespan"] = peak_rss_mb()
+
+    phases = {IMPORT_PHASE: import_ms - sum(timer.elapsed.values()) + timer.since(before)}
+    phases.update(timer.elapsed)
+    phases[LIFESPAN_PHASE] = lifespan_ms - timer.since(before)
+    adapter.shutdown()
+    return {
+        "app": app_path,
+        "init_ms": import_ms + lifespan_ms,
+        "phases_ms": phases,
+        "peak_rss_mb": rss,
+        "already_imported": already_imported,
+    }
+
+
+def run_fresh(app_path: str, providers: str | None, importtime: bool = False) -> tuple[dict, str]:
+    """Profiles startup in a new interpreter; returns the report and its stderr."""
+    command = [
+        sys.executable, *(["-X", "importtime"] if importtime else []),
+        "-m", "bench.startup", "--app", app_path, "--json",
+    ]
+    env = dict(os.environ)
+    if providers is not None:
+        env["AUTH_PREWARM_PROVIDERS"] = providers
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, check=True, env=env)
+    process_ms = (time.perf_counter() - started) * 1000
+    # The app prints to stdout too; the JSON report is always the last line.
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["process_ms"] = process_ms
+    return report, result.stderr
+
+
+def slowest_imports(stderr: str, already_imported: list[str], top: int):
+    """The slowest modules and top-level packages imported by the app."""
+    skip = set(already_imported)
+    rows = [row for row in parse_importtime_rows(stderr) if row[0] not in skip]
+    packages = defaultdict(int)
+    for module, self_us, _ in rows:
+        packages[module.partition(".")[0]] += self_us
+    modules = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return modules, sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def print_report(runs: list[dict], modules, packages) -> None:
+    phases = {name: statistics.median(run["phases_ms"][name] for run in runs) for name in runs[0]["phases_ms"]}
+    init = statistics.median(run["init_ms"] for run in runs)
+    process = statistics.median(run["process_ms"] for run in runs)
+    print(f"Startup of {runs[0]['app']}, median of {len(runs)} fresh interpreters")
+    print(f"  {'phase':<26} {'ms':>9}")
+    for name, ms in phases.items():
+        print(f"  {name:<26} {ms:9.1f}")
+    print(f"  {'init (import + lifespan)':<26} {init:9.1f}")
+    print(f"  {'whole process':<26} {process:9.1f}")
+
+    print(f"\n  {'peak RSS after':<26} {'MB':>9}")
+    for name in runs[0]["peak_rss_mb"]:
+        print(f"  {name:<26} {statistics.median(run['peak_rss_mb'][name] for run in runs):9.1f}")
+
+    if modules:
+        print(f"\n  {'slowest modules':<44} {'self ms':>8} {'cumul ms':>9}")
+        for module, self_us, cumulative_us in modules:
+            print(f"  {module:<44} {self_us / 1000:8.1f} {cumulative_us / 1000:9.1f}")
+        print(f"\n  {'slowest packages':<44} {'self ms':>8}")
+        for package, self_us in packages:
+            print(f"  {package:<44} {self_us / 1000:8.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app", default="app.main:app", help="module:attribute of the ASGI app.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters; the median counts.")
+    parser.add_argument("--providers", help="Auth providers to pre-warm (default: AUTH_PREWARM_PROVIDERS).")
+    parser.add_argument("--top", type=int, default=15, help="Modules and packages to list (0 = none).")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Allowed median init time (default {STARTUP_BUDGET_MS:g} ms).")
+    parser.add_argument("--memory-budget-mb", type=float, default=0,
+                        help="Allowed peak RSS (default 0 = unchecked).")
+    parser.add_argument("--json", action="store_true", help="Profile this interpreter and print JSON.")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        print(json.dumps(profile(args.app)))
+        return 0
+
+    runs = [run_fresh(args.app, args.providers)[0] for _ in range(args.runs)]
+    modules, packages = [], []
+    if args.top:
+        report, stderr = run_fresh(args.app, args.providers, importtime=True)
+        modules, packages = slowest_imports(stderr, report["already_imported"], args.top)
+    print_report(runs, modules, packages)
+
+    init = statistics.median(run["init_ms"] for run in runs)
+    peak = statistics.median(run["peak_rss_mb"]["lifespan"] for run in runs)
+    failed = False
+    if init > args.budget_ms:
+        print(f"\nStartup took {init:.1f} ms, over the {args.budget_ms:g} ms budget.")
+        failed = True
+    if args.memory_budget_mb and peak > args.memory_budget_mb:
+        print(f"\nPeak RSS was {peak:.1f} MB, over the {args.memory_budget_mb:g} MB budget.")
+        failed = True
+    if failed:
+        return 1
+    print(f"\n  within the {args.budget_ms:g} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+# =================================================================
+# File: main.py (AWS Lambda entrypoint)
+# =================================================================
+# The container's CMD is "main.handler". Everything at module level here runs
+# once per execution environment during the Lambda init phase, so the app,
+# the auth provider singletons and their caches are reused by warm invocations.
+from app.lambda_adapter import LambdaAdapter
+from app.main import app
+from auth.sessions import check_lambda_sessions
+
+# Fails the init phase rather than every sign-in after it.
+check_lambda_sessions()
+handler = LambdaAdapter(app)
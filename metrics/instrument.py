@@ -1,21 +1,53 @@
 # instrument.py
 from fastapi import FastAPI
-from prometheus_client import start_http_server
+from prometheus_client import REGISTRY, CollectorRegistry, start_http_server
 from opentelemetry import metrics
 from opentelemetry.exporter.prometheus import PrometheusMetricReader
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.sdk.metrics import MeterProvider
 
+from metrics.app import auth_metrics, probe_metrics
+from metrics.multiprocess import (
+    METRICS_FLUSH_INTERVAL,
+    METRICS_PATH,
+    PROMETHEUS_MULTIPROC_DIR,
+    ProcessMetricsWriter,
+    make_metrics_endpoint,
+)
+
 
 def instrument_app(app: FastAPI):
     """Configures OpenTelemetry instrumentation for the FastAPI app."""
 
-    # Start a Prometheus client server to expose metrics.
-    # This is the endpoint Prometheus will scrape.
-    start_http_server(port=8001, addr="0.0.0.0")
+    if PROMETHEUS_MULTIPROC_DIR:
+        # Several workers: each writes its metrics to the shared directory
+        # and any of them serves the merged view from the app itself.
+        registry = CollectorRegistry()
+        reader = PrometheusMetricReader(registry=registry)
+        writer = ProcessMetricsWriter(
+            registry, PROMETHEUS_MULTIPROC_DIR, interval=METRICS_FLUSH_INTERVAL
+        )
+        writer.start()
+        app.add_route(
+            METRICS_PATH,
+            make_metrics_endpoint(PROMETHEUS_MULTIPROC_DIR, writer),
+            include_in_schema=False,
+        )
+        endpoint = f"{METRICS_PATH} on the app (merged across workers)"
+    else:
+        # Start a Prometheus client server to expose metrics.
+        # This is the endpoint Prometheus will scrape.
+        start_http_server(port=8001, addr="0.0.0.0")
+        registry = REGISTRY
+        reader = PrometheusMetricReader(registry=registry)
+        endpoint = "http://localhost:8001/metrics"
+
+    # Domain metrics are recorded outside OpenTelemetry (see AuthMetrics)
+    # and served from the same registry.
+    registry.register(auth_metrics)
+    registry.register(probe_metrics)
 
     # Set up the OpenTelemetry Metrics provider.
-    reader = PrometheusMetricReader()
     provider = MeterProvider(metric_readers=[reader])
     metrics.set_meter_provider(provider)
 
@@ -24,4 +56,4 @@ def instrument_app(app: FastAPI):
     FastAPIInstrumentor.instrument_app(app)
 
     print("✅ FastAPI application successfully instrumented with OpenTelemetry.")
-    print("📈 Metrics available at: http://localhost:8001/metrics")
+    print(f"📈 Metrics available at: {endpoint}")
@@ -0,0 +1,296 @@
+# multiprocess.py
+"""
+Prometheus metrics for deployments with more than one worker process.
+
+Each worker keeps its OpenTelemetry metrics in a private registry and a
+ProcessMetricsWriter writes them, every few seconds and at exit, to its own
+file in PROMETHEUS_MULTIPROC_DIR. MultiProcessCollector reads every worker's
+file and merges them into one view: counters and histograms are summed
+across workers (including workers that have exited, so totals never go
+backwards), gauges keep one series per live worker with a `pid` label.
+
+When the process that supervises the workers reaps one, `merge_exited`
+folds its counters and histograms into a single file for all exited
+workers and removes the worker's own file, so recycled workers do not
+grow the directory, or the work of every scrape, without bound.
+
+The merged view is served at METRICS_PATH on the app itself, or by a single
+standalone endpoint:
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/metrics python -m metrics.multiprocess --port 8001
+
+The directory must be emptied (see `reset_directory`) before the workers
+start, as with prometheus_client's own multiprocess mode.
+"""
+import argparse
+import atexit
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.metrics_core import Metric
+from starlette.config import Config
+from starlette.requests import Request
+from starlette.responses import Response
+
+config = Config(".env")
+# Empty keeps the single-process exporter on port 8001 (the default).
+PROMETHEUS_MULTIPROC_DIR = config("PROMETHEUS_MULTIPROC_DIR", cast=str, default="")
+METRICS_FLUSH_INTERVAL = config("METRICS_FLUSH_INTERVAL", cast=float, default=5.0)
+METRICS_PATH = config("METRICS_PATH", cast=str, default="/metrics")
+
+log = logging.getLogger(__name__)
+
+FILE_PATTERN = "otel_*.json"
+# The merged counters and histograms of every worker that has exited.
+EXITED_FILE = "otel_exited.json"
+LOCK_FILE = ".otel.lock"
+# Sample values are summed across workers for these metric types.
+SUMMED_TYPES = {"counter", "histogram", "gaugehistogram", "summary"}
+
+
+def _file_for(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"otel_{pid}.json")
+
+
+def reset_directory(directory: str) -> None:
+    """Creates `directory` or removes the files left in it by earlier workers."""
+    os.makedirs(directory, exist_ok=True)
+    # *.db are prometheus_client's own per-process files, written when
+    # PROMETHEUS_MULTIPROC_DIR is set in the environment.
+    for pattern in (FILE_PATTERN, "*.db"):
+        for path in glob.glob(os.path.join(directory, pattern)):
+            os.remove(path)
+
+
+class ProcessMetricsWriter:
+    """
+    Writes one process's metrics to its file in the multiprocess directory.
+
+    Files are replaced atomically, so readers never see a partial write. The
+    background thread is restarted in forked children (e.g. gunicorn with
+    --preload), which then write under their own pid.
+    """
+
+    def __init__(self, registry: CollectorRegistry, directory: str, interval: float = 5.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def write(self) -> None:
+        families = [
+            {
+                "name": family.name,
+                "documentation": family.documentation,
+                "type": family.type,
+                "unit": family.unit,
+                "samples": [[s.name, s.labels, s.value] for s in family.samples],
+            }
+            for family in self.registry.collect()
+        ]
+        path = _file_for(self.directory, os.getpid())
+        temporary = f"{path}.tmp"
+        with self._lock:
+            with open(temporary, "w") as file:
+                json.dump(families, file)
+            os.replace(temporary, path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                log.warning(f"Could not write metrics to {self.directory}: {e}")
+
+    def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._start_thread()
+        os.register_at_fork(after_in_child=self._start_thread)
+        atexit.register(self.stop)
+
+    def _start_thread(self) -> None:
+        self._stop.clear()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the thread and writes the final values."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        self.write()
+
+
+@contextmanager
+def _locked(directory: str, exclusive: bool):
+    # Readers share the lock; merging a worker's file into EXITED_FILE holds
+    # it alone, so no scrape sees the worker's values twice or not at all.
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _merge_family(families: dict, values: dict, family: dict, pid: int | None, alive: bool) -> None:
+    name = family["name"]
+    families.setdefault(name, family)
+    merged = values[name]
+    for sample_name, labels, value in family["samples"]:
+        if sample_name.endswith("_created"):
+            # A timestamp: the earliest worker's start stands for all
+            key = (sample_name, tuple(sorted(labels.items())))
+            merged[key] = min(merged.get(key, value), value)
+        elif family["type"] in SUMMED_TYPES:
+            key = (sample_name, tuple(sorted(labels.items())))
+            merged[key] = merged.get(key, 0.0) + value
+        elif family["type"] == "info":
+            merged[(sample_name, tuple(sorted(labels.items())))] = value
+        elif alive:
+            labels = {**labels, "pid": str(pid)}
+            merged[(sample_name, tuple(sorted(labels.items())))] = value
+
+
+def merge_exited(directory: str, pid: int) -> None:
+    """
+    Folds the metrics file of exited worker `pid` into EXITED_FILE and
+    removes it. Gauges of an exited worker are dropped, as on a scrape.
+    """
+    path = _file_for(directory, pid)
+    if not os.path.exists(path):
+        return
+    exited = os.path.join(directory, EXITED_FILE)
+    with _locked(directory, exclusive=True):
+        families: dict[str, dict] = {}
+        values: dict[str, dict] = defaultdict(dict)
+        for source in (exited, path):
+            try:
+                with open(source) as file:
+                    process_families = json.load(file)
+            except FileNotFoundError:
+                continue
+            except ValueError as e:
+                log.warning(f"Skipping unreadable metrics file {source}: {e}")
+                continue
+            for family in process_families:
+                _merge_family(families, values, family, None, alive=False)
+        merged = [
+            {
+                **family,
+                "samples": [
+                    [sample_name, dict(labels), value]
+                    for (sample_name, labels), value in values[name].items()
+                ],
+            }
+            for name, family in families.items()
+        ]
+        temporary = f"{exited}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(merged, file)
+        os.replace(temporary, exited)
+        os.remove(path)
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MultiProcessCollector:
+    """Merges every worker's metrics file into one set of metric families."""
+
+    def __init__(self, directory: str, writer: ProcessMetricsWriter | None = None):
+        self.directory = directory
+        # The serving worker's own values are written fresh on every scrape.
+        self.writer = writer
+
+    def _read(self) -> list[tuple[int | None, list]]:
+        """(pid, families) of every file; the pid is None for EXITED_FILE."""
+        processes = []
+        with _locked(self.directory, exclusive=False):
+            for path in glob.glob(os.path.join(self.directory, FILE_PATTERN)):
+                name = os.path.basename(path)
+                pid = None if name == EXITED_FILE else int(name[len("otel_"):-len(".json")])
+                try:
+                    with open(path) as file:
+                        processes.append((pid, json.load(file)))
+                except (OSError, ValueError) as e:
+                    log.warning(f"Skipping unreadable metrics file {path}: {e}")
+        return processes
+
+    def collect(self):
+        if self.writer is not None:
+            self.writer.write()
+        families: dict[str, dict] = {}
+        values: dict[str, dict] = defaultdict(dict)
+        for pid, process_families in self._read():
+            alive = pid is not None and _is_alive(pid)
+            for family in process_families:
+                _merge_family(families, values, family, pid, alive)
+
+        for name, family in families.items():
+            metric = Metric(name, family["documentation"], family["type"], family["unit"])
+            for (sample_name, labels), value in values[name].items():
+                metric.add_sample(sample_name, dict(labels), value)
+            yield metric
+
+
+def aggregate_registry(directory: str, writer: ProcessMetricsWriter | None = None) -> CollectorRegistry:
+    registry = CollectorRegistry()
+    registry.register(MultiProcessCollector(directory, writer))
+    return registry
+
+
+def make_metrics_endpoint(directory: str, writer: ProcessMetricsWriter | None = None):
+    """A route endpoint serving every worker's metrics from the main app."""
+    registry = aggregate_registry(directory, writer)
+
+    # Sync, so the file reads run in the threadpool rather than on the loop.
+    def metrics_endpoint(request: Request) -> Response:
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+    return metrics_endpoint
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the merged metrics of all workers.")
+    parser.add_argument("--dir", default=PROMETHEUS_MULTIPROC_DIR)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--addr", default="0.0.0.0")
+    args = parser.parse_args()
+    if not args.dir:
+        parser.error("set PROMETHEUS_MULTIPROC_DIR or pass --dir")
+
+    start_http_server(port=args.port, addr=args.addr, registry=aggregate_registry(args.dir))
+    print(f"📈 Merged metrics from {args.dir} at: http://localhost:{args.port}/metrics")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()
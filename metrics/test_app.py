@@ -0,0 +1,140 @@
+# metrics/test_app.py
+
+from typing import Annotated
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry
+from starlette.requests import Request
+
+from app.ratelimit import RateLimitMiddleware, RateLimitPolicy
+from auth import dependencies
+from auth.cache import PrincipalCache
+from auth.dependencies import SECRET_KEY, get_current_active_user
+from models.user import User
+
+from .app import AuthMetrics
+
+
+@pytest.fixture
+def auth_metrics(monkeypatch):
+    """A fresh AuthMetrics, swapped in for the dependency's."""
+    fresh = AuthMetrics(buckets=["0.001", "0.01"])
+    monkeypatch.setattr(dependencies, "auth_metrics", fresh)
+    return fresh
+
+
+def value(metrics: AuthMetrics, name: str, **labels) -> float | None:
+    registry = CollectorRegistry()
+    registry.register(metrics)
+    return registry.get_sample_value(name, labels)
+
+
+def authenticate(headers: dict[str, str]):
+    request = Request(
+        {
+            "type": "http",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        }
+    )
+    return get_current_active_user(
+        request, request.headers.get("x-auth-provider"), request.headers.get("authorization")
+    )
+
+
+def test_record_binds_each_label_set_once(auth_metrics):
+    for _ in range(3):
+        auth_metrics.record("cookie", "mock", True, 0.0005)
+    auth_metrics.record("cookie", "mock", False, 0.005)
+
+    assert len(auth_metrics._bound) == 2
+    assert value(auth_metrics, "auth_results_total", method="cookie", provider="mock", result="success") == 3
+    assert value(auth_metrics, "auth_results_total", method="cookie", provider="mock", result="failure") == 1
+
+
+def test_configured_buckets(auth_metrics):
+    auth_metrics.record("header", "mock", True, 0.0005)
+    auth_metrics.record("header", "mock", True, 0.005)
+    auth_metrics.record("header", "mock", True, 0.5)
+
+    bucket = "auth_current_user_duration_seconds_bucket"
+    labels = {"method": "header", "result": "success"}
+    assert value(auth_metrics, bucket, le="0.001", **labels) == 1
+    assert value(auth_metrics, bucket, le="0.01", **labels) == 2
+    assert value(auth_metrics, bucket, le="+Inf", **labels) == 3
+    assert value(auth_metrics, bucket, le="0.1", **labels) is None
+
+
+def test_principal_cache_lookups(auth_metrics):
+    cache = PrincipalCache()
+    auth_metrics.watch_principal_cache(cache)
+    cache.hits, cache.misses = 3, 1
+
+    assert value(auth_metrics, "auth_principal_cache_lookups_total", result="hit") == 3
+    assert value(auth_metrics, "auth_principal_cache_lookups_total", result="miss") == 1
+    assert value(auth_metrics, "auth_principal_cache_hit_ratio") == 0.75
+
+
+# --- get_current_active_user ---
+
+
+def test_header_results(auth_metrics):
+    authenticate({"X-Auth-Provider": "mock", "Authorization": "mock-u1"})
+    with pytest.raises(HTTPException):
+        authenticate({"X-Auth-Provider": "mock", "Authorization": "bogus"})
+
+    assert value(auth_metrics, "auth_results_total", method="header", provider="mock", result="success") == 1
+    assert value(auth_metrics, "auth_results_total", method="header", provider="mock", result="failure") == 1
+    assert value(auth_metrics, "auth_current_user_duration_seconds_count", method="header", result="success") == 1
+
+
+def test_client_chosen_provider_is_not_a_label(auth_metrics):
+    with pytest.raises(HTTPException):
+        authenticate({"X-Auth-Provider": "made-up", "Authorization": "x"})
+
+    assert value(auth_metrics, "auth_results_total", method="header", provider="unknown", result="failure") == 1
+
+
+def test_cookie_results_and_jwt_failures(auth_metrics):
+    claims = {"provider": "mock", "id": "u1", "email": "u1@mock.com", "ver": 1}
+    valid = jwt.encode(claims, str(SECRET_KEY), algorithm="HS256")
+    expired = jwt.encode({**claims, "exp": 1_000_000_000}, str(SECRET_KEY), algorithm="HS256")
+    forged = jwt.encode(claims, "not-our-secret-but-long-enough-for-hs256", algorithm="HS256")
+
+    authenticate({"Cookie": f'access_token="Bearer {valid}"'})
+    for token in (expired, forged, "not.a.jwt"):
+        with pytest.raises(HTTPException):
+            authenticate({"Cookie": f'access_token="Bearer {token}"'})
+    with pytest.raises(HTTPException):
+        authenticate({})
+
+    assert value(auth_metrics, "auth_results_total", method="cookie", provider="mock", result="success") == 1
+    assert value(auth_metrics, "auth_results_total", method="cookie", provider="unknown", result="failure") == 3
+    assert value(auth_metrics, "auth_results_total", method="none", provider="unknown", result="failure") == 1
+    for reason in ("expired", "signature", "malformed"):
+        assert value(auth_metrics, "auth_jwt_decode_failures_total", reason=reason) == 1
+
+
+def test_rate_limited_route_counts_one_authentication_per_request(auth_metrics):
+    dependencies.principal_cache.clear()
+    auth_metrics.watch_principal_cache(dependencies.principal_cache)
+    app = FastAPI()
+
+    @app.get("/me")
+    def me(user: Annotated[User, Depends(get_current_active_user)]):
+        return {"id": user.id}
+
+    app.add_middleware(RateLimitMiddleware, policy=RateLimitPolicy(limit=5, period=60.0), key="user")
+    client = TestClient(app)
+    token = jwt.encode({"provider": "mock", "id": "u1", "email": "u1@mock.com"}, str(SECRET_KEY), algorithm="HS256")
+
+    client.get("/me", headers={"X-Auth-Provider": "mock", "Authorization": "mock-u1"})
+    client.get("/me", cookies={"access_token": f"Bearer {token}"})
+
+    assert value(auth_metrics, "auth_results_total", method="header", provider="mock", result="success") == 1
+    assert value(auth_metrics, "auth_current_user_duration_seconds_count", method="header", result="success") == 1
+    assert value(auth_metrics, "auth_results_total", method="cookie", provider="mock", result="success") == 1
+    assert value(auth_metrics, "auth_principal_cache_lookups_total", result="miss") == 1
+    assert value(auth_metrics, "auth_principal_cache_lookups_total", result="hit") == 0
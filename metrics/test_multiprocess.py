@@ -0,0 +1,175 @@
+# metrics/test_multiprocess.py
+
+import json
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.exporter.prometheus import PrometheusMetricReader
+from opentelemetry.sdk.metrics import MeterProvider
+from prometheus_client import CollectorRegistry, Counter, generate_latest
+
+from .multiprocess import (
+    MultiProcessCollector,
+    ProcessMetricsWriter,
+    aggregate_registry,
+    make_metrics_endpoint,
+    merge_exited,
+    reset_directory,
+)
+
+DEAD_PID = 2**22 + 1  # above the default pid_max, so never a live process
+SCOPE = {"otel_scope_name": "test", "otel_scope_schema_url": "", "otel_scope_version": ""}
+
+
+def series(**labels) -> tuple:
+    return tuple(sorted({**SCOPE, **labels}.items()))
+
+
+class Worker:
+    """One worker's metrics, written as if by process `pid`."""
+
+    def __init__(self, directory, pid: int):
+        self.registry = CollectorRegistry()
+        provider = MeterProvider(metric_readers=[PrometheusMetricReader(registry=self.registry)])
+        meter = provider.get_meter("test")
+        self.requests = meter.create_counter("requests", unit="1")
+        self.latency = meter.create_histogram("latency", unit="s")
+        self.in_flight = meter.create_up_down_counter("in_flight", unit="1")
+        self.writer = ProcessMetricsWriter(self.registry, str(directory))
+        self.pid = pid
+
+    def write(self) -> None:
+        # Written aside first, as every Worker here shares the test's pid.
+        directory = self.writer.directory
+        private = os.path.join(directory, str(self.pid))
+        os.makedirs(private, exist_ok=True)
+        ProcessMetricsWriter(self.registry, private).write()
+        os.replace(
+            os.path.join(private, f"otel_{os.getpid()}.json"),
+            os.path.join(directory, f"otel_{self.pid}.json"),
+        )
+
+
+def samples(registry: CollectorRegistry) -> dict:
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in registry.collect()
+        for sample in family.samples
+    }
+
+
+def test_counters_and_histograms_are_summed(tmp_path):
+    first, second = Worker(tmp_path, os.getpid()), Worker(tmp_path, DEAD_PID)
+    first.requests.add(3, {"route": "/a"})
+    second.requests.add(4, {"route": "/a"})
+    second.requests.add(1, {"route": "/b"})
+    first.latency.record(0.1)
+    second.latency.record(0.2)
+    first.write()
+    second.write()
+
+    merged = samples(aggregate_registry(str(tmp_path)))
+
+    assert merged[("requests_total", series(route="/a"))] == 7
+    assert merged[("requests_total", series(route="/b"))] == 1
+    assert merged[("latency_seconds_count", series())] == 2
+    assert abs(merged[("latency_seconds_sum", series())] - 0.3) < 1e-9
+
+
+def test_gauges_are_per_live_worker(tmp_path):
+    live, dead = Worker(tmp_path, os.getpid()), Worker(tmp_path, DEAD_PID)
+    live.in_flight.add(2)
+    dead.in_flight.add(5)
+    live.write()
+    dead.write()
+
+    merged = samples(aggregate_registry(str(tmp_path)))
+
+    gauges = {dict(labels)["pid"]: value for (name, labels), value in merged.items() if name == "in_flight"}
+    assert gauges == {str(os.getpid()): 2}
+
+
+def test_created_timestamps_are_not_summed(tmp_path):
+    workers = [Worker(tmp_path, os.getpid()), Worker(tmp_path, DEAD_PID)]
+    for worker in workers:
+        Counter("logins", "Logins", registry=worker.registry).inc()
+        worker.write()
+
+    merged = samples(aggregate_registry(str(tmp_path)))
+
+    assert merged[("logins_total", ())] == 2
+    assert merged[("logins_created", ())] <= time.time()
+
+
+def test_serving_worker_writes_fresh_values(tmp_path):
+    worker = Worker(tmp_path, os.getpid())
+    worker.writer.write()
+    worker.requests.add(1)
+
+    output = generate_latest(aggregate_registry(str(tmp_path), worker.writer)).decode()
+
+    assert "requests_total" in output
+    assert 'requests_total{otel_scope_name="test",otel_scope_schema_url="",otel_scope_version=""} 1.0' in output
+
+
+def test_unreadable_files_are_skipped(tmp_path):
+    (tmp_path / "otel_123.json").write_text("{not json")
+    worker = Worker(tmp_path, os.getpid())
+    worker.requests.add(1)
+    worker.write()
+
+    merged = samples(aggregate_registry(str(tmp_path)))
+
+    assert any(name == "requests_total" for name, _ in merged)
+
+
+def test_metrics_endpoint_on_fastapi(tmp_path):
+    worker = Worker(tmp_path, os.getpid())
+    worker.requests.add(2)
+    app = FastAPI()
+    app.add_route("/metrics", make_metrics_endpoint(str(tmp_path), worker.writer))
+
+    response = TestClient(app).get("/metrics", follow_redirects=False)
+
+    assert response.status_code == 200
+    assert "requests_total" in response.text
+
+
+def test_reset_directory(tmp_path):
+    (tmp_path / "otel_1.json").write_text(json.dumps([]))
+    (tmp_path / "keep.txt").write_text("")
+
+    reset_directory(str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["keep.txt"]
+    assert list(MultiProcessCollector(str(tmp_path)).collect()) == []
+
+
+def test_exited_workers_are_merged_into_one_file(tmp_path):
+    live = Worker(tmp_path, os.getpid())
+    live.requests.add(1, {"route": "/a"})
+    live.write()
+    for pid in range(DEAD_PID, DEAD_PID + 5):
+        recycled = Worker(tmp_path, pid)
+        recycled.requests.add(2, {"route": "/a"})
+        recycled.latency.record(0.1)
+        recycled.in_flight.add(1)
+        recycled.write()
+        merge_exited(str(tmp_path), pid)
+
+    merged = samples(aggregate_registry(str(tmp_path)))
+
+    files = {name for name in os.listdir(tmp_path) if name.endswith(".json")}
+    assert files == {"otel_exited.json", f"otel_{os.getpid()}.json"}
+    assert merged[("requests_total", series(route="/a"))] == 11
+    assert merged[("latency_seconds_count", series())] == 5
+    # Gauges of exited workers are dropped.
+    assert not any(name == "in_flight" for name, _ in merged)
+
+
+def test_merging_an_unknown_worker_is_a_no_op(tmp_path):
+    merge_exited(str(tmp_path), DEAD_PID)
+
+    assert not (tmp_path / "otel_exited.json").exists()
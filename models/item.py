@@ -0,0 +1,46 @@
+# =================================================================
+# File: models/item.py
+# =================================================================
+from pydantic import BaseModel, Field
+from starlette.config import Config
+
+from models.user import User
+
+config = Config(".env")
+# Most item IDs a single batch request may ask for.
+ITEM_BATCH_MAX = config("ITEM_BATCH_MAX", cast=int, default=100)
+
+
+class ItemDetails(BaseModel):
+    id: int = Field(..., description="The item's ID.")
+    description: str = Field(..., description="A short description of the item.")
+
+
+class ItemV1(BaseModel):
+    version: str = Field("v1", description="The API version that served the item.")
+    item_details: ItemDetails
+    owner_email: str = Field(..., description="The owner's email address.")
+    owner_provider: str = Field(..., description="The owner's auth provider.")
+    owner_display_name: str | None = Field(None, description="The owner's display name.")
+
+
+class ItemV2(ItemV1):
+    version: str = Field("v2", description="The API version that served the item.")
+    retrieved_by: User = Field(..., description="The user who retrieved the item.")
+
+
+class ItemBatchRequest(BaseModel):
+    # Bounded here so that an oversized body is rejected while it is parsed.
+    ids: list[int] = Field(
+        ..., max_length=ITEM_BATCH_MAX, description="The IDs of the items to fetch."
+    )
+
+
+class ItemBatchV1(BaseModel):
+    items: list[ItemV1] = Field(..., description="The items that were found, in request order.")
+    missing: list[int] = Field(default_factory=list, description="Requested IDs that were not found.")
+
+
+class ItemBatchV2(BaseModel):
+    items: list[ItemV2] = Field(..., description="The items that were found, in request order.")
+    missing: list[int] = Field(default_factory=list, description="Requested IDs that were not found.")
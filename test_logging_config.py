@@ -0,0 +1,262 @@
+# test_logging_config.py
+
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+import pytest
+from pythonjsonlogger.json import JsonFormatter
+
+import logging_config
+from logging_config import (
+    BatchingQueueListener,
+    BoundedQueueHandler,
+    BufferedRotatingFileHandler,
+    FastJsonFormatter,
+    RateLimitFilter,
+    SamplingFilter,
+)
+
+
+class RecordingHandler(logging.Handler):
+    """Collects formatted messages and counts flushes."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+    def flush(self):
+        self.flushes += 1
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def test_listener_writes_every_record_and_flushes_per_batch():
+    log_queue = queue.Queue(maxsize=1000)
+    recorder = RecordingHandler()
+    listener = BatchingQueueListener(log_queue, recorder, batch_size=100)
+    logger = make_logger("test.batching", BoundedQueueHandler(log_queue))
+
+    # Fill the queue before the writer starts so it sees full batches.
+    for i in range(250):
+        logger.info("message %d", i)
+    listener.start()
+    listener.stop()
+
+    assert recorder.messages == [f"message {i}" for i in range(250)]
+    # Three full-or-partial batches, plus possibly one for the stop sentinel.
+    assert recorder.flushes in (3, 4)
+
+
+class GatedHandler(RecordingHandler):
+    """Holds every record until `gate` is set."""
+
+    def __init__(self, gate: threading.Event):
+        super().__init__()
+        self.gate = gate
+
+    def emit(self, record):
+        self.gate.wait()
+        super().emit(record)
+
+
+def test_stop_waits_for_room_in_a_full_queue():
+    log_queue = queue.Queue(maxsize=5)
+    gate = threading.Event()
+    recorder = GatedHandler(gate)
+    listener = BatchingQueueListener(log_queue, recorder, batch_size=2)
+    logger = make_logger("test.full", BoundedQueueHandler(log_queue))
+    listener.start()
+    # The writer holds one record at the gate while five more fill the queue.
+    for i in range(6):
+        logger.info("message %d", i)
+        while i == 0 and not log_queue.empty():
+            time.sleep(0.001)
+    assert log_queue.full()
+
+    threading.Timer(0.1, gate.set).start()
+    listener.stop()
+
+    assert recorder.messages == [f"message {i}" for i in range(6)]
+
+
+def test_stop_gives_up_on_a_stuck_writer():
+    log_queue = queue.Queue(maxsize=2)
+    gate = threading.Event()
+    recorder = GatedHandler(gate)
+    listener = BatchingQueueListener(log_queue, recorder, stop_timeout=0.1)
+    logger = make_logger("test.stuck", BoundedQueueHandler(log_queue))
+    listener.start()
+    for i in range(3):
+        logger.info("message %d", i)
+        while i == 0 and not log_queue.empty():
+            time.sleep(0.001)
+
+    writer = listener._thread
+    started = time.monotonic()
+    listener.stop()
+    assert time.monotonic() - started < 1
+
+    # Once unstuck, the writer drains what is left and exits.
+    gate.set()
+    writer.join(1)
+    assert not writer.is_alive()
+    assert recorder.messages == [f"message {i}" for i in range(3)]
+
+
+def test_drop_policy_counts_overflow():
+    log_queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, overflow="drop")
+    logger = make_logger("test.drop", handler)
+
+    for i in range(5):
+        logger.info("message %d", i)
+
+    assert log_queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_block_policy_waits_for_room():
+    log_queue = queue.Queue(maxsize=1)
+    handler = BoundedQueueHandler(log_queue, overflow="block", block_timeout=5)
+    logger = make_logger("test.block", handler)
+    logger.info("first")
+
+    # Free the slot shortly after the second call starts waiting.
+    threading.Timer(0.05, log_queue.get).start()
+    logger.info("second")
+
+    assert handler.dropped == 0
+    assert log_queue.get_nowait().getMessage() == "second"
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), overflow="sometimes")
+
+
+def test_file_handler_buffers_until_flushed(tmp_path):
+    path = tmp_path / "app.log"
+    handler = BufferedRotatingFileHandler(path, maxBytes=1024 * 1024, encoding="utf-8")
+    handler.emit(logging.makeLogRecord({"msg": "buffered"}))
+
+    assert path.read_text() == ""
+    handler.flush()
+    assert path.read_text() == "buffered\n"
+    handler.close()
+
+
+def test_setup_logging_routes_root_through_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_FILE", str(tmp_path / "app.log"))
+    root = logging.getLogger()
+    try:
+        logging_config.setup_logging()
+
+        assert [type(h) for h in root.handlers] == [BoundedQueueHandler]
+        assert logging_config.log_queue_stats()["running"] is True
+        logging.getLogger("test.setup").warning("drained on shutdown")
+        logging_config.shutdown_logging()
+
+        assert "drained on shutdown" in (tmp_path / "app.log").read_text()
+    finally:
+        # Put the application's own pipeline back for the other tests.
+        monkeypatch.undo()
+        logging_config.setup_logging()
+
+
+def test_forked_child_gets_its_own_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(logging_config, "LOG_FILE", str(tmp_path / "app.log"))
+    try:
+        logging_config.setup_logging()
+        parent_listener = logging_config._listener
+
+        pid = os.fork()
+        if pid == 0:
+            ok = logging_config._listener is not parent_listener and logging_config.log_queue_stats()["running"]
+            logging.getLogger("test.fork").warning("written by the child")
+            logging_config.shutdown_logging()
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert "written by the child" in (tmp_path / "app.log").read_text()
+    finally:
+        monkeypatch.undo()
+        logging_config.setup_logging()
+
+
+# --- FastJsonFormatter ---
+
+
+def make_record(msg="lookup %s", args=("mock",), name="auth.dependencies", **extra):
+    record = logging.LogRecord(name, logging.INFO, "/app/auth/dependencies.py", 42, msg, args, None, "lookup")
+    record.__dict__.update(extra)
+    return record
+
+
+def test_fast_json_matches_python_json_logger():
+    """The fast formatter must be a drop-in replacement for the file format."""
+    slow = JsonFormatter(
+        "%(asctime)s %(levelname)s %(name)s %(module)s %(funcName)s %(lineno)d %(message)s"
+    )
+    record = make_record(request_id="abc")
+
+    assert json.loads(FastJsonFormatter().format(record)) == json.loads(slow.format(record))
+
+
+def test_fast_json_includes_exceptions():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+
+    document = json.loads(FastJsonFormatter().format(record))
+
+    assert document["message"] == "failed"
+    assert "ValueError: boom" in document["exc_info"]
+
+
+# --- Sampling and rate limiting ---
+
+
+def test_sampling_keeps_one_in_n():
+    sampler = SamplingFilter(SamplingFilter.parse("auth.dependencies=10, other=1"))
+    kept = [sampler.filter(make_record()) for _ in range(100)]
+
+    assert kept.count(True) == 10
+    assert sampler.suppressed == {"auth.dependencies": 90}
+    # Loggers without a rate (or with a rate of 1) are never sampled.
+    assert sampler.filter(make_record(name="other")) is True
+    assert sampler.filter(make_record(name="unrelated")) is True
+
+
+def test_rate_limit_caps_identical_messages_per_second():
+    limiter = RateLimitFilter(per_second=3)
+    first_second = [make_record(args=(str(i),)) for i in range(5)]
+    for record in first_second:
+        record.created = 100.2
+
+    kept = [limiter.filter(record) for record in first_second]
+    different = make_record(msg="something else")
+    different.created = 100.5
+    next_second = make_record()
+    next_second.created = 101.0
+
+    assert kept == [True, True, True, False, False]
+    assert limiter.filter(different) is True
+    assert limiter.filter(next_second) is True
+    assert limiter.suppressed == {"auth.dependencies": 2}
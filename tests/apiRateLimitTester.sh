@@ -6,7 +6,7 @@ RED='\033[0;31m'
 NC='\033[0m' # No Color
 
 # Test Parameters
-API_URL="http://localhost:8989/api/v1/health"
+API_URL="http://localhost:8989/api/v1/health/live"
 REQUESTS=10
 DELAY=0.001
 